@@ -18,6 +18,8 @@
     blockmesh
     control_dict
     fields
+    polymesh
+    geometry_cache
     fv_schemes
     constant_files
     fv_options
@@ -25,6 +27,7 @@
     util
 
 """
+import gzip
 from abc import ABC, abstractmethod
 
 from inflection import underscore
@@ -120,19 +123,24 @@ DEFAULT_HEADER = DEFAULT_HEADER[1:-1]
 def read_header(path):
     """Read the header ("FoamFile" entry) of an OpenFOAM file"""
     lines_header = []
-    with open(path) as file:
+    # binary mode because the file can contain binary data
+    if str(path).endswith(".gz"):
+        open_file = gzip.open
+    else:
+        open_file = open
+    with open_file(path, "rb") as file:
         # reach header
         for line in file:
-            if line.startswith("FoamFile\n"):
+            if line.startswith(b"FoamFile\n"):
                 lines_header.append(line)
                 break
         for line in file:
             lines_header.append(line)
-            if line.startswith("}"):
+            if line.startswith(b"}"):
                 break
         if not lines_header:
             raise ValueError("No FoamFile entry found")
-        code_header = "".join(lines_header)
+        code_header = b"".join(lines_header).decode()
         tree = parse(code_header)
         return tree.value
 
@@ -1,6 +1,8 @@
 """Abstract Syntax Trees for OpenFOAM input files"""
 
+import io
 import re
+import sys
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from numbers import Number
@@ -12,6 +14,12 @@ from inflection import underscore
 
 symbols = ["kg", "m", "s", "K", "kmol", "A", "cd"]
 
+# architecture of the binary files written by fluidsimfoam (native byte order,
+# 32 bits labels and 64 bits scalars)
+ARCH_BINARY = (
+    f'"{"LSB" if sys.byteorder == "little" else "MSB"};label=32;scalar=64"'
+)
+
 
 def str2foam_units(units):
     result = [0] * 7
@@ -65,7 +73,8 @@ def _compute_spaces_to_align(data, max_length=20):
             max(
                 len(key)
                 for key, value in data.items()
-                if value is not None and not isinstance(value, (Dict, List))
+                if value is not None
+                and not isinstance(value, (Dict, List, NonuniformList))
             ),
         )
     except ValueError:
@@ -75,12 +84,49 @@ def _compute_spaces_to_align(data, max_length=20):
     return max_length + default_space
 
 
+def _make_write(file):
+    """Make a function writing str and bytes-like objects in a file object"""
+    if isinstance(file, io.TextIOBase):
+
+        def write(part):
+            if not isinstance(part, str):
+                raise ValueError(
+                    "Binary data cannot be written in a text file "
+                    "(open the file in binary mode)"
+                )
+            file.write(part)
+
+    else:
+
+        def write(part):
+            if isinstance(part, str):
+                part = part.encode()
+            file.write(part)
+
+    return write
+
+
 class Node:
     def __eq__(self, other):
         if type(other) is type(self):
             return self.__dict__ == other.__dict__
         return False
 
+    def _iter_parts(self, indent=0, binary=False):
+        """Iterate over the parts of the dumped code"""
+        yield self.dump(indent)
+
+    def dump_to(self, file, indent=0):
+        """Write the dumped code in a file object (text or binary)
+
+        The code is written part by part so that large lists are never fully
+        formatted in memory.
+
+        """
+        write = _make_write(file)
+        for part in self._iter_parts(indent):
+            write(part)
+
 
 class NodeLikePyDict(ABC):
     def init_from_py_objects(
@@ -138,21 +184,21 @@ class NodeLikePyDict(ABC):
         elif isinstance(child, np.ndarray):
             shape = child.shape
             ndim = child.ndim
-            child.tolist()
             dtype = None
             if ndim == 2:
                 if shape[1] == 9:
                     dtype = "tensor"
+                elif shape[1] == 6:
+                    dtype = "symmTensor"
                 elif shape[1] == 3:
                     dtype = "vector"
                 else:
                     raise NotImplementedError
-                child = [List(sequence) for sequence in child]
             elif ndim == 1:
                 dtype = "scalar"
             else:
                 raise NotImplementedError
-            child = List(child, name=key, dtype=dtype)
+            child = NonuniformList(child, name=key, dtype=dtype)
         elif isinstance(child, Node):
             pass
         else:
@@ -187,24 +233,67 @@ class FoamInputFile(Node, NodeLikePyDict):
         return "".join(tmp)
 
     def dump(self):
-        tmp = []
+        parts = list(self._iter_parts())
+        if all(isinstance(part, str) for part in parts):
+            return "".join(parts)
+        return b"".join(
+            part.encode() if isinstance(part, str) else part for part in parts
+        )
+
+    def _iter_parts(self, indent=0, binary=None):
+        """Iterate over the parts of the dumped file
+
+        The parts are str, except for binary files, for which the data of the
+        nonuniform lists are bytes-like objects.
+
+        """
+        if binary is None:
+            binary = self.info is not None and self.info.get("format") == "binary"
+
+        if self.header is not None:
+            yield self.header + "\n"
+
+        part = None
         if self.info is not None:
+            info = self.info
+            if binary:
+                # the binary data is always written with ARCH_BINARY
+                info = {}
+                for key, node in self.info.items():
+                    if key != "arch":
+                        info[key] = node
+                    if key == "format":
+                        info["arch"] = ARCH_BINARY
             tmp1 = ["FoamFile\n{"]
-            for key, node in self.info.items():
+            for key, node in info.items():
                 s = (12 - len(key)) * " "
                 tmp1.append(f"    {key}{s}{node};")
             tmp1.append("}")
-            tmp.append("\n".join(tmp1))
+            part = "\n".join(tmp1)
+            yield part
 
         num_spaces = _compute_spaces_to_align(self.children, max_length=14)
-        for key, node in self.children.items():
+        for index, (key, node) in enumerate(self.children.items()):
+            if index or self.info is not None:
+                yield "\n\n"
+            if self.comments is not None and key in self.comments:
+                comment = self.comments[key]
+                if isinstance(comment, str):
+                    yield "// " + comment.replace("\n", "\n// ") + "\n"
             if hasattr(node, "dump"):
-                code_node = node.dump()
+                if isinstance(node, Node):
+                    for part in node._iter_parts(binary=binary):
+                        yield part
+                else:
+                    part = node.dump()
+                    yield part
                 # special for isolated list
                 if key is None and isinstance(node, List):
-                    code_node += ";"
+                    part = ";"
+                    yield part
+                continue
             elif node is None:
-                code_node = f"{key}"
+                part = f"{key}"
             else:
                 if hasattr(node, "dump_without_assignment"):
                     node_dumped = node.dump_without_assignment()
@@ -214,25 +303,29 @@ class FoamInputFile(Node, NodeLikePyDict):
                     s = ""
                 else:
                     s = max(2, (num_spaces - len(key))) * " "
-                code_node = f"{key}{s}{node_dumped};"
-            if self.comments is not None and key in self.comments:
-                comment = self.comments[key]
-                if isinstance(comment, str):
-                    comment = "// " + comment.replace("\n", "\n// ")
-                    code_node = comment + "\n" + code_node
-            tmp.append(code_node)
-        result = "\n\n".join(tmp)
-        if self.header is not None:
-            result = self.header + "\n" + result
-        if result[-1] != "\n":
-            result += "\n"
-        return result
+                part = f"{key}{s}{node_dumped};"
+            yield part
+
+        if part is None:
+            raise ValueError("Nothing to dump")
+
+        if not isinstance(part, str) or not part.endswith("\n"):
+            yield "\n"
+
+    def dump_to(self, file, indent=0):
+        """Write the dumped file in a file object
+
+        Binary files (``format binary``) have to be written in file objects
+        opened in binary mode.
+
+        """
+        super().dump_to(file)
 
     def overwrite(self):
         if self.path is None:
             raise ValueError("self.path is None")
-        with open(self.path, "w") as file:
-            file.write(self.dump())
+        with open(self.path, "wb") as file:
+            self.dump_to(file)
 
     def _set_item(self, key, value):
         self.children[key] = value
@@ -342,7 +435,9 @@ class Dict(dict, Node, NodeLikePyDict):
         return super().__repr__()
 
     def dump(self, indent=0):
-        tmp = []
+        return "".join(self._iter_parts(indent))
+
+    def _iter_parts(self, indent=0, binary=False):
         indentation = indent * " "
         if self._name is not None:
             star = indentation + self._name
@@ -351,19 +446,23 @@ class Dict(dict, Node, NodeLikePyDict):
             star += "\n"
         else:
             star = ""
-        tmp.append(star + indentation + "{")
+        yield star + indentation + "{"
 
         num_spaces = _compute_spaces_to_align(self)
         for key, node in self.items():
             if self.comments is not None and key in self.comments:
                 comment = self.comments[key]
                 if isinstance(comment, str):
-                    tmp.append("    // " + comment.replace("\n", "\n    // "))
+                    yield "\n    // " + comment.replace("\n", "\n    // ")
 
+            yield "\n"
             if hasattr(node, "dump"):
-                tmp.append(node.dump(indent + 4))
+                if isinstance(node, Node):
+                    yield from node._iter_parts(indent + 4, binary)
+                else:
+                    yield node.dump(indent + 4)
             elif node is None:
-                tmp.append(indentation + f"    {key}")
+                yield indentation + f"    {key}"
             else:
                 if hasattr(node, "dump_without_assignment"):
                     code_node = node.dump_without_assignment()
@@ -373,14 +472,13 @@ class Dict(dict, Node, NodeLikePyDict):
                     s = ""
                 else:
                     s = max(2, (num_spaces - len(key))) * " "
-                tmp.append(indentation + f"    {key}{s}{code_node};")
-        tmp.append(indentation + "}")
+                yield indentation + f"    {key}{s}{code_node};"
 
         # because OpenFOAM inconsistency
         if isinstance(self, CodeStream):
-            tmp[-1] += ";"
-
-        return "\n".join(tmp)
+            yield "\n" + indentation + "};"
+        else:
+            yield "\n" + indentation + "}"
 
     def _set_item(self, key, value):
         self[key] = value
@@ -389,6 +487,8 @@ class Dict(dict, Node, NodeLikePyDict):
 class List(list, Node):
     """Represents an OpenFoam list"""
 
+    _chunk_size = 10_000
+
     def __init__(self, iterable=None, name=None, dtype=None):
         self._name = name
         self._dtype = dtype
@@ -410,48 +510,152 @@ class List(list, Node):
             return indent * " " + str(item)
 
     def dump(self, indent=0):
-        tmp = []
+        return "".join(self._iter_parts(indent))
+
+    def _iter_parts(self, indent=0, binary=False):
         indentation = indent * " "
         if self._name is None:
-            tmp.extend(self._make_list_strings(indent=0))
-            return indentation + "(" + " ".join(tmp) + ")"
-        else:
-            header = self._name
-            if self._dtype is not None:
-                header += (
-                    f"   nonuniform List<{self._dtype}>\n"
-                    f"{indentation}{len(self)}"
+            tmp = self._make_list_strings(indent=0)
+            yield indentation + "(" + " ".join(tmp) + ")"
+            return
+
+        header = self._name
+        if self._dtype is not None:
+            header += (
+                f"   nonuniform List<{self._dtype}>\n" f"{indentation}{len(self)}"
+            )
+
+        yield indentation + header + f"\n{indentation}" + "("
+        special_keyss = {
+            "blocks": ("hex",),
+            "edges": ("spline", "arc", "polyLine", "BSpline", "line"),
+        }
+        if self._name not in special_keyss.keys():
+            yield "\n"
+            for start in range(0, len(self), self._chunk_size):
+                if start:
+                    yield "\n"
+                yield "\n".join(
+                    self._dump_item(item, indent + 4)
+                    for item in self[start : start + self._chunk_size]
                 )
+        elif self:
+            special_keys = special_keyss[self._name]
+            if not self[0] in special_keys:
+                raise ValueError(self)
+            special_key = self[0]
+            lines = []
+            items_line = None
+            for item in self:
+                if item == special_key:
+                    if items_line is not None:
+                        lines.append(items_line)
+                    items_line = [item]
+                else:
+                    items_line.append(item)
+            lines.append(items_line)
+            lines = [
+                " ".join(self._dump_item(_item) for _item in items_line)
+                for items_line in lines
+            ]
+            yield "\n" + "\n".join((indent + 4) * " " + line for line in lines)
+        yield "\n" + indentation + ");"
+
+
+class NonuniformList(Node):
+    """Represents an OpenFoam nonuniform list stored in a Numpy array
+
+    The array is not copied so that it can be a (read-only) view of the data of
+    a file.
+    """
+
+    _chunk_size = 10_000
+
+    def __init__(self, array, name=None, dtype=None):
+        self.array = array
+        self._name = name
+        self._dtype = dtype
+
+    def get_name(self):
+        return self._name
+
+    def __repr__(self):
+        return (
+            f"NonuniformList(<{self._dtype}>, shape={self.array.shape}, "
+            f"name={self._name})"
+        )
 
-            tmp.append(indentation + header + f"\n{indentation}" + "(")
-            special_keyss = {
-                "blocks": ("hex",),
-                "edges": ("spline", "arc", "polyLine", "BSpline", "line"),
-            }
-            if self._name not in special_keyss.keys():
-                tmp.append("\n".join(self._make_list_strings(indent + 4)))
-            elif self:
-                special_keys = special_keyss[self._name]
-                if not self[0] in special_keys:
-                    raise ValueError(self)
-                special_key = self[0]
-                lines = []
-                items_line = None
-                for item in self:
-                    if item == special_key:
-                        if items_line is not None:
-                            lines.append(items_line)
-                        items_line = [item]
-                    else:
-                        items_line.append(item)
-                lines.append(items_line)
-                lines = [
-                    " ".join(self._dump_item(_item) for _item in items_line)
-                    for items_line in lines
-                ]
-                tmp.extend((indent + 4) * " " + line for line in lines)
-            tmp.append(indentation + ");")
-            return "\n".join(tmp)
+    def __len__(self):
+        return len(self.array)
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return False
+        return (
+            self._name == other._name
+            and self._dtype == other._dtype
+            and np.array_equal(self.array, other.array)
+        )
+
+    def __array__(self, dtype=None, copy=None):
+        if dtype is None:
+            return self.array
+        return self.array.astype(dtype)
+
+    def _iter_lines_chunks(self, indent):
+        """Iterate over chunks of formatted lines
+
+        One format string is applied to a whole chunk of numbers (converted to
+        Python numbers, for which %r gives the shortest exact representation).
+
+        """
+        indentation = indent * " "
+        if self.array.ndim == 1:
+            format_elem = indentation + "%r"
+        else:
+            format_elem = (
+                indentation + "(" + " ".join(["%r"] * self.array.shape[1]) + ")"
+            )
+        chunk_size = self._chunk_size
+        for start in range(0, len(self.array), chunk_size):
+            chunk = self.array[start : start + chunk_size]
+            format_chunk = "\n".join([format_elem] * len(chunk))
+            yield format_chunk % tuple(chunk.ravel().tolist())
+
+    def dump(self, indent=0):
+        return "".join(self._iter_parts(indent))
+
+    def _iter_parts(self, indent=0, binary=False):
+        if binary:
+            yield from self.make_parts_binary(indent)
+            return
+        indentation = indent * " "
+        yield (
+            f"{indentation}{self._name}   nonuniform List<{self._dtype}>\n"
+            f"{indentation}{len(self)}\n{indentation}("
+        )
+        for chunk in self._iter_lines_chunks(indent + 4):
+            yield "\n"
+            yield chunk
+        yield "\n" + indentation + ");"
+
+    def make_parts_binary(self, indent=0):
+        """Make the parts of the list dumped in binary format
+
+        The data (native byte order, double precision or 32 bits labels, see
+        ``ARCH_BINARY``) is not copied if the array is already contiguous with
+        this dtype.
+
+        """
+        indentation = indent * " "
+        dtype = np.int32 if self._dtype == "label" else np.float64
+        arr = np.ascontiguousarray(self.array, dtype=dtype)
+        return [
+            f"{indentation}{self._name}   nonuniform List<{self._dtype}>\n"
+            f"{indentation}{len(self)}\n{indentation}(",
+            memoryview(arr.reshape(-1)).cast("B"),
+            ")\n" + indentation + ";",
+        ]
 
 
 class CodeStream(Dict):
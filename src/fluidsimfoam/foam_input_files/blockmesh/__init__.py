@@ -489,6 +489,16 @@ $mergepatchpairs
             mergepatchpairs=self.format_mergepatchpairs_section(),
         )
 
+    def write_polymesh(self, path_dir="constant/polyMesh"):
+        """Write the polyMesh files without blockMesh (single-block meshes)
+
+        See :func:`fluidsimfoam.foam_input_files.blockmesh.mesher.write_polymesh`.
+
+        """
+        from .mesher import write_polymesh
+
+        return write_polymesh(self, path_dir)
+
 
 class BlockMeshDictRectilinear(BlockMeshDict):
     def __init__(self, lx, ly, lz, nx, ny, nz, scale):
@@ -0,0 +1,519 @@
+"""Python replacement of blockMesh for single-block rectilinear meshes
+
+For a blockMeshDict containing only one hexahedral block whose vertices form a
+box aligned with the axes (no curved edges, no ``mergePatchPairs``,
+``simpleGrading`` with expansion ratios or multi-grading, patches defined with
+``boundary`` or with the deprecated ``patches`` syntax), the ``polyMesh``
+files (``points``, ``faces``, ``owner``, ``neighbour`` and ``boundary``) can be
+computed with Numpy (index arithmetic, no loop over the cells) and written in
+binary format without OpenFOAM.
+
+The numbering of the points, the cells and the internal faces is the same as
+for blockMesh (internal faces in upper-triangular order). The faces of 2
+cyclic patches are written in the same order so that they match.
+
+The mesh can be described by a
+:class:`fluidsimfoam.foam_input_files.blockmesh.BlockMeshDict` object, by the
+parsed tree of a blockMeshDict file or by the path of such a file.
+:class:`NotImplementedError` is raised for unsupported blockMeshDicts, which
+have to be processed by blockMesh.
+
+"""
+
+from collections.abc import Iterable
+from pathlib import Path
+
+import numpy as np
+from lark.exceptions import LarkError
+
+from fluidsimfoam.foam_input_files import DEFAULT_HEADER, parse
+
+# vertices of the 6 sides of a hex block (w, e, s, n, b, t), see
+# HexBlock.face
+_sides_vertices = [
+    (0, 4, 7, 3),
+    (1, 2, 6, 5),
+    (0, 1, 5, 4),
+    (2, 3, 7, 6),
+    (0, 3, 2, 1),
+    (4, 5, 6, 7),
+]
+
+# keywords of the blockMeshDicts that can be processed (for the other ones,
+# for example geometry, projected faces or variables, blockMesh is needed)
+_supported_keys = {
+    "scale",
+    "convertToMeters",
+    "vertices",
+    "blocks",
+    "edges",
+    "boundary",
+    "patches",
+    "defaultPatch",
+    "mergePatchPairs",
+}
+
+_header_polymesh = (
+    DEFAULT_HEADER
+    + """
+FoamFile
+{{
+    version     2.0;
+    format      {format};
+    arch        "LSB;label={label_size};scalar=64";
+    class       {cls};{note}
+    location    "constant/polyMesh";
+    object      {name};
+}}
+// * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * //
+
+"""
+)
+
+
+def _get_data_from_object(block_mesh_dict):
+    if block_mesh_dict.edges:
+        raise NotImplementedError("edges are not supported")
+    if block_mesh_dict.merge_patch_pairs:
+        raise NotImplementedError("mergePatchPairs are not supported")
+    if len(block_mesh_dict.blocks) != 1:
+        raise NotImplementedError("Only one block is supported")
+    block = next(iter(block_mesh_dict.blocks.values()))
+    grading = block.grading
+    if not hasattr(grading, "x"):
+        raise NotImplementedError("Only simpleGrading is supported")
+    vertices = block_mesh_dict.vertices
+    names_block = [vertices[vname].name for vname in block.vnames]
+    boundaries = []
+    for boundary in block_mesh_dict.boundaries.values():
+        faces = [
+            [names_block.index(vertices[vname].name) for vname in face.vnames]
+            for face in boundary.faces
+        ]
+        info = {}
+        if boundary.neighbour is not None:
+            info["neighbourPatch"] = boundary.neighbour
+        boundaries.append((boundary.name, boundary.type_, faces, info))
+    return dict(
+        corners=[
+            (vertices[vname].x, vertices[vname].y, vertices[vname].z)
+            for vname in block.vnames
+        ],
+        cells=block.cells,
+        grading=(grading.x.d, grading.y.d, grading.z.d),
+        boundaries=boundaries,
+        scale=block_mesh_dict.convert_to_meters,
+        default_patch=("defaultFaces", "empty"),
+    )
+
+
+def _get_patches_old_syntax(patches):
+    """Convert the deprecated ``patches (type name (faces) ...)`` syntax"""
+    items = list(patches)
+    if len(items) % 3:
+        raise NotImplementedError(f"Unsupported patches {items}")
+    result = []
+    for type_, name, faces in zip(items[::3], items[1::3], items[2::3]):
+        if not (
+            isinstance(type_, str)
+            and isinstance(name, str)
+            and isinstance(faces, list)
+        ):
+            raise NotImplementedError(f"Unsupported patch {name}")
+        result.append((name, type_, faces))
+    return result
+
+
+def _get_data_from_tree(tree):
+    children = tree.children
+    unsupported = set(children) - _supported_keys
+    if unsupported:
+        raise NotImplementedError(f"Unsupported keywords {sorted(unsupported)}")
+    if children.get("edges"):
+        raise NotImplementedError("edges are not supported")
+    if children.get("mergePatchPairs"):
+        raise NotImplementedError("mergePatchPairs are not supported")
+    blocks = list(children["blocks"])
+    if blocks.count("hex") != 1:
+        raise NotImplementedError("Only one hex block is supported")
+    if "simpleGrading" not in blocks:
+        raise NotImplementedError("Only simpleGrading is supported")
+    # hex (0 1 2 3 4 5 6 7) [zone name] (nx ny nz) simpleGrading (gx gy gz)
+    lists = [item for item in blocks if isinstance(item, list)]
+    if len(lists) != 3:
+        raise NotImplementedError(f"Unsupported block definition {blocks}")
+    indices_block, cells, grading = lists
+    try:
+        vertices = np.array(children["vertices"], dtype=float)
+        corners = vertices[np.array(indices_block, dtype=int)]
+    except (ValueError, TypeError, IndexError) as error:
+        raise NotImplementedError("Unsupported vertices") from error
+    indices_block = list(indices_block)
+    patches = []
+    for assignment in children.get("boundary", []):
+        info = dict(assignment.value)
+        faces = info.pop("faces", [])
+        type_ = info.pop("type")
+        patches.append((assignment.name, type_, faces, info))
+    patches.extend(
+        (name, type_, faces, {})
+        for name, type_, faces in _get_patches_old_syntax(
+            children.get("patches", [])
+        )
+    )
+    boundaries = []
+    for name, type_, faces, info in patches:
+        try:
+            faces = [
+                [indices_block.index(index) for index in face] for face in faces
+            ]
+        except (ValueError, TypeError) as error:
+            raise NotImplementedError(
+                f"Unsupported faces for patch {name}"
+            ) from error
+        boundaries.append((name, type_, faces, info))
+    default_patch = children.get("defaultPatch", {})
+    scale = children.get("scale", children.get("convertToMeters", 1.0))
+    return dict(
+        corners=corners,
+        cells=cells,
+        grading=grading,
+        boundaries=boundaries,
+        scale=scale,
+        default_patch=(
+            default_patch.get("name", "defaultFaces"),
+            default_patch.get("type", "empty"),
+        ),
+    )
+
+
+def _get_data(block_mesh_dict):
+    if isinstance(block_mesh_dict, (str, Path)):
+        path = Path(block_mesh_dict)
+        try:
+            block_mesh_dict = parse(path.read_text())
+        except LarkError as error:
+            raise NotImplementedError(f"Cannot parse {path}") from error
+    if hasattr(block_mesh_dict, "blocks"):
+        data = _get_data_from_object(block_mesh_dict)
+    else:
+        data = _get_data_from_tree(block_mesh_dict)
+    try:
+        data["scale"] = float(data["scale"])
+        data["cells"] = tuple(int(number) for number in data["cells"])
+    except (ValueError, TypeError) as error:
+        raise NotImplementedError(
+            "Unsupported scale or number of cells"
+        ) from error
+    return data
+
+
+def compute_grading_nodes(nb_cells, grading):
+    """Compute the relative positions of the nodes along one direction
+
+    Parameters
+    ----------
+
+    nb_cells : int
+        Number of cells.
+    grading : number or sequence
+        Expansion ratio (size of the last cell over size of the first cell) or
+        multi-grading list of ``(direction fraction, cells fraction, expansion
+        ratio)``.
+
+    Returns an array of ``nb_cells + 1`` increasing positions from 0 to 1.
+
+    """
+    if isinstance(grading, Iterable):
+        sections = [tuple(float(number) for number in item) for item in grading]
+    else:
+        sections = [(1.0, 1.0, float(grading))]
+    if not sections or any(len(section) != 3 for section in sections):
+        raise NotImplementedError(f"Unsupported grading {grading}")
+    lengths, fractions, ratios = (np.array(column) for column in zip(*sections))
+    lengths /= lengths.sum()
+    fractions /= fractions.sum()
+    # like blockMesh: rounding and remaining cells in the last section
+    nbs_cells = np.floor(fractions * nb_cells + 0.5).astype(int)
+    nbs_cells[-1] = nb_cells - nbs_cells[:-1].sum()
+    if (nbs_cells < 0).any():
+        raise NotImplementedError(f"Unsupported grading {grading}")
+
+    sizes = []
+    for length, nb, ratio in zip(lengths, nbs_cells, ratios):
+        if nb == 0:
+            continue
+        if nb > 1 and ratio != 1.0:
+            sizes_section = (ratio ** (1.0 / (nb - 1))) ** np.arange(nb)
+        else:
+            sizes_section = np.ones(nb)
+        sizes.append(length * sizes_section / sizes_section.sum())
+    nodes = np.concatenate([[0.0], np.cumsum(np.concatenate(sizes))])
+    nodes[-1] = 1.0
+    return nodes
+
+
+def _get_box(corners):
+    corners = np.asarray(corners, dtype=float)
+    origin = corners[0]
+    lengths = corners[6] - origin
+    if (lengths <= 0).any():
+        raise NotImplementedError("The block is not a box aligned with the axes")
+    expected = origin + lengths * np.array(
+        [
+            (0, 0, 0),
+            (1, 0, 0),
+            (1, 1, 0),
+            (0, 1, 0),
+            (0, 0, 1),
+            (1, 0, 1),
+            (1, 1, 1),
+            (0, 1, 1),
+        ]
+    )
+    if not np.allclose(corners, expected, rtol=1e-10, atol=1e-12 * lengths.max()):
+        raise NotImplementedError("The block is not a box aligned with the axes")
+    return origin, lengths
+
+
+def _side_faces(shape_cells, axis, index_nodes, shift_cells, flip):
+    """Faces normal to ``axis`` at the nodes ``index_nodes`` along ``axis``
+
+    Returns ``(points, cells)`` where ``points`` has shape ``(nb_faces, 4)``
+    (oriented towards increasing coordinate if ``flip`` is False) and ``cells``
+    are the cells on the side ``index_nodes - shift_cells``.
+
+    """
+    nx, ny, nz = shape_cells
+    ranges = [np.arange(nx), np.arange(ny), np.arange(nz)]
+    ranges[axis] = np.atleast_1d(index_nodes)
+    k, j, i = np.meshgrid(ranges[2], ranges[1], ranges[0], indexing="ij")
+    ijk = [i.ravel(), j.ravel(), k.ravel()]
+
+    def index_point(offset):
+        ii, jj, kk = (arr + delta for arr, delta in zip(ijk, offset))
+        return ii + (nx + 1) * (jj + (ny + 1) * kk)
+
+    # the 2 other axes such that (axis, axis_b, axis_c) is direct
+    axis_b = (axis + 1) % 3
+    axis_c = (axis + 2) % 3
+    e_b = np.zeros(3, dtype=int)
+    e_b[axis_b] = 1
+    e_c = np.zeros(3, dtype=int)
+    e_c[axis_c] = 1
+    offsets = [np.zeros(3, dtype=int), e_b, e_b + e_c, e_c]
+    if flip:
+        offsets = offsets[:1] + offsets[:0:-1]
+    points = np.stack([index_point(offset) for offset in offsets], axis=1)
+
+    ijk[axis] = ijk[axis] - shift_cells
+    cells = ijk[0] + nx * (ijk[1] + ny * ijk[2])
+    return points, cells
+
+
+def create_polymesh(block_mesh_dict):
+    """Compute the polyMesh lists of a single-block rectilinear mesh
+
+    Parameters
+    ----------
+
+    block_mesh_dict :
+        :class:`fluidsimfoam.foam_input_files.blockmesh.BlockMeshDict` object,
+        parsed blockMeshDict or path of a blockMeshDict file.
+
+    Returns a dict with the keys ``points`` (shape ``(nb_points, 3)``),
+    ``faces`` (shape ``(nb_faces, 4)``), ``owner``, ``neighbour`` and
+    ``patches`` (list of ``(name, type, nb_faces, info)``, in the order of the
+    faces).
+
+    """
+    data = _get_data(block_mesh_dict)
+    origin, lengths = _get_box(data["corners"])
+    shape_cells = data["cells"]
+    if min(shape_cells) < 1:
+        raise ValueError(f"Bad number of cells {shape_cells}")
+    nodes = [
+        origin[axis]
+        + lengths[axis] * compute_grading_nodes(shape_cells[axis], grading)
+        for axis, grading in enumerate(data["grading"])
+    ]
+    z, y, x = np.meshgrid(nodes[2], nodes[1], nodes[0], indexing="ij")
+    points = data["scale"] * np.stack([x.ravel(), y.ravel(), z.ravel()], axis=1)
+
+    # internal faces
+    strides = (1, shape_cells[0], shape_cells[0] * shape_cells[1])
+    faces_internal = []
+    owner = []
+    neighbour = []
+    for axis in range(3):
+        nb = shape_cells[axis]
+        if nb == 1:
+            continue
+        faces_axis, cells = _side_faces(
+            shape_cells, axis, np.arange(1, nb), 0, False
+        )
+        faces_internal.append(faces_axis)
+        neighbour.append(cells)
+        owner.append(cells - strides[axis])
+    if faces_internal:
+        faces_internal = np.concatenate(faces_internal)
+        owner = np.concatenate(owner)
+        neighbour = np.concatenate(neighbour)
+        order = np.lexsort((neighbour, owner))
+        faces_internal = faces_internal[order]
+        owner = owner[order]
+        neighbour = neighbour[order]
+    else:
+        faces_internal = np.empty((0, 4), dtype=int)
+        owner = np.empty(0, dtype=int)
+        neighbour = np.empty(0, dtype=int)
+
+    # boundary faces
+    sides = {}
+    for index_side, vertices_side in enumerate(_sides_vertices):
+        axis, is_max = divmod(index_side, 2)
+        sides[frozenset(vertices_side)] = _side_faces(
+            shape_cells,
+            axis,
+            shape_cells[axis] if is_max else 0,
+            1 if is_max else 0,
+            not is_max,
+        )
+
+    faces_boundary = []
+    owner_boundary = []
+    patches = []
+    for name, type_, faces_patch, info in data["boundaries"]:
+        nb_faces = 0
+        for face in faces_patch:
+            try:
+                faces_side, cells = sides.pop(frozenset(face))
+            except KeyError:
+                raise NotImplementedError(
+                    f"Face {face} of patch {name} is not a side of the block "
+                    "(or is used twice)"
+                ) from None
+            faces_boundary.append(faces_side)
+            owner_boundary.append(cells)
+            nb_faces += cells.size
+        patches.append((name, type_, nb_faces, info))
+    if sides:
+        name, type_ = data["default_patch"]
+        nb_faces = 0
+        for faces_side, cells in sides.values():
+            faces_boundary.append(faces_side)
+            owner_boundary.append(cells)
+            nb_faces += cells.size
+        patches.append((name, type_, nb_faces, {}))
+
+    return dict(
+        points=points,
+        faces=np.concatenate([faces_internal] + faces_boundary),
+        owner=np.concatenate([owner] + owner_boundary),
+        neighbour=neighbour,
+        patches=patches,
+    )
+
+
+def _format_boundary(patches, start_face, header):
+    lines = [header, f"{len(patches)}", "("]
+    for name, type_, nb_faces, info in patches:
+        entries = {"type": type_}
+        if type_ != "patch":
+            entries["inGroups"] = f"1({type_})"
+        entries.update(nFaces=nb_faces, startFace=start_face)
+        if type_ == "cyclic":
+            entries.update(matchTolerance=0.0001, transform="unknown")
+        entries.update(info)
+        lines.extend([f"    {name}", "    {"])
+        lines.extend(
+            f"        {key:16s}{value};" for key, value in entries.items()
+        )
+        lines.append("    }")
+        start_face += nb_faces
+    lines.append(")")
+    lines.append("")
+    lines.append(
+        "// *************************************************************"
+        "************ //"
+    )
+    return "\n".join(lines) + "\n"
+
+
+def write_polymesh(block_mesh_dict, path_dir="constant/polyMesh"):
+    """Write the polyMesh files (binary) of a single-block rectilinear mesh
+
+    Parameters
+    ----------
+
+    block_mesh_dict :
+        :class:`fluidsimfoam.foam_input_files.blockmesh.BlockMeshDict` object,
+        parsed blockMeshDict or path of a blockMeshDict file.
+    path_dir : str or Path
+        The polyMesh directory (created if needed).
+
+    Raises :class:`NotImplementedError` if the mesh is not supported.
+
+    """
+    mesh = create_polymesh(block_mesh_dict)
+    path_dir = Path(path_dir)
+    path_dir.mkdir(parents=True, exist_ok=True)
+
+    points = mesh["points"]
+    faces = mesh["faces"]
+    owner = mesh["owner"]
+    neighbour = mesh["neighbour"]
+    nb_cells = int(owner.max()) + 1
+
+    label_size = 32 if 4 * faces.shape[0] < 2**31 - 1 else 64
+    dtype_label = f"<i{label_size // 8}"
+
+    def format_header(cls, name, format="binary", note=""):
+        if note:
+            note = f'\n    note        "{note}";'
+        return _header_polymesh.format(
+            format=format, label_size=label_size, cls=cls, name=name, note=note
+        )
+
+    def write_list(file, arr, dtype):
+        arr = np.ascontiguousarray(arr, dtype=dtype)
+        file.write(f"{arr.shape[0]}\n(".encode())
+        file.write(memoryview(arr).cast("B"))
+        file.write(b")\n")
+
+    end = (
+        b"\n\n// *************************************************************"
+        b"************ //\n"
+    )
+
+    # the arrays are written directly in the files (no copy in memory)
+    with open(path_dir / "points", "wb") as file:
+        file.write(format_header("vectorField", "points").encode())
+        write_list(file, points, "<f8")
+        file.write(end)
+
+    with open(path_dir / "faces", "wb") as file:
+        file.write(format_header("faceCompactList", "faces").encode())
+        write_list(file, 4 * np.arange(faces.shape[0] + 1), dtype_label)
+        file.write(b"\n")
+        write_list(file, faces.ravel(), dtype_label)
+        file.write(end)
+
+    note = (
+        f"nPoints:{points.shape[0]}  nCells:{nb_cells}  "
+        f"nFaces:{faces.shape[0]}  nInternalFaces:{neighbour.size}"
+    )
+    for name, arr in (("owner", owner), ("neighbour", neighbour)):
+        with open(path_dir / name, "wb") as file:
+            file.write(format_header("labelList", name, note=note).encode())
+            write_list(file, arr, dtype_label)
+            file.write(end)
+
+    (path_dir / "boundary").write_text(
+        _format_boundary(
+            mesh["patches"],
+            neighbour.size,
+            format_header("polyBoundaryMesh", "boundary", format="ascii"),
+        )
+    )
+    return mesh
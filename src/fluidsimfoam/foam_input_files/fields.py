@@ -2,24 +2,29 @@
 
 """
 
+import gzip
+import mmap
+import os
 import re
-import struct
+import zlib
 from abc import ABC, abstractmethod
-from io import BytesIO
+from dataclasses import dataclass, field
 from numbers import Number
 from pathlib import Path
-from typing import Union
+from typing import Optional, Union
 
 import numpy as np
 
 from fluidsimfoam.foam_input_files import parse, parse_header, read_header
 from fluidsimfoam.foam_input_files.ast import (
+    ARCH_BINARY,
     Code,
     CodeStream,
     Dict,
     DimensionSet,
     FoamInputFile,
     List,
+    NonuniformList,
     Value,
 )
 
@@ -57,99 +62,581 @@ dcode_types = {
     64: "d",
 }
 
+dcode_types_label = {
+    32: "i4",
+    64: "i8",
+}
+
+
+def get_nb_numbers_per_elem(type_name: str):
+    """Get the number of numbers per element from a class or a list type name"""
+    type_name = type_name.lower()
+    if "symmtensor" in type_name:
+        return 6
+    elif "sphericaltensor" in type_name:
+        return 1
+    elif "tensor" in type_name:
+        return 9
+    elif "vector" in type_name:
+        return 3
+    return 1
+
+
+def get_dtype(endianess: str, scalar_precision: int, is_label=False):
+    """Get the Numpy dtype corresponding to the architecture of a file
+
+    For labels (integers), ``scalar_precision`` has to be the label width.
+
+    """
+    codes = dcode_types_label if is_label else dcode_types
+    return np.dtype(byte_order_codes[endianess] + codes[scalar_precision])
+
+
+def is_label_type(type_name: str):
+    """Check if a list type name corresponds to integers (``label``)"""
+    return type_name in ("label", "labelList")
+
+
+def get_element_width(header, type_name: str):
+    """Get the number of bits of one number of a binary list"""
+    endianess, label_width, scalar_precision = get_arch(header)
+    if is_label_type(type_name):
+        return label_width
+    return scalar_precision
+
 
 def create_array_from_bin_data(
-    bin_data: bytes,
+    bin_data,
     cls_name: str,
     endianess: str,
     nb_elems: int,
     scalar_precision: int,
+    offset: int = 0,
+    copy: bool = False,
+    cells=None,
 ):
-    nb_numbers_per_elem = 1
-    if "Vector" in cls_name:
-        nb_numbers_per_elem = 3
-    elif "SymmTensor" in cls_name:
-        nb_numbers_per_elem = 6
-    elif "Tensor" in cls_name:
-        nb_numbers_per_elem = 9
-
-    fmt = (
-        byte_order_codes[endianess]
-        + f"{nb_elems*nb_numbers_per_elem:d}"
-        + dcode_types[scalar_precision]
+    """Create an array from binary data
+
+    Without copy, the returned array is a read-only view of ``bin_data`` (which
+    can be a ``bytes`` or a ``mmap.mmap`` object).
+
+    ``cells`` (a slice or an array of indices) can be used to get only some
+    elements. For a slice, only the bytes between the first and the last
+    selected elements are mapped. For an array of indices, only the selected
+    elements are copied (and only the corresponding pages of a memory mapped
+    file are read).
+
+    """
+    nb_numbers_per_elem = get_nb_numbers_per_elem(cls_name)
+    dtype = get_dtype(endianess, scalar_precision, is_label_type(cls_name))
+    shape = (nb_elems,)
+    if isinstance(cells, slice):
+        indices = range(*cells.indices(nb_elems))
+        if indices:
+            index_min = min(indices[0], indices[-1])
+            index_max = max(indices[0], indices[-1])
+        else:
+            index_min = index_max = 0
+            indices = range(0)
+        size_elem = nb_numbers_per_elem * dtype.itemsize
+        offset += index_min * size_elem
+        nb_elems = index_max - index_min + (1 if indices else 0)
+        shape = (nb_elems,)
+    arr = np.frombuffer(
+        bin_data,
+        dtype=dtype,
+        count=nb_elems * nb_numbers_per_elem,
+        offset=offset,
     )
+    if nb_numbers_per_elem > 1:
+        shape += (nb_numbers_per_elem,)
+    arr = arr.reshape(shape)
+    if isinstance(cells, slice):
+        arr = arr[indices[0] - index_min :: indices.step] if indices else arr
+    elif cells is not None:
+        # fancy indexing: copy of the selected elements
+        return arr[cells].astype(dtype.newbyteorder("="), copy=False)
+    if copy:
+        arr = arr.astype(dtype.newbyteorder("="))
+    else:
+        arr.flags.writeable = False
+    return arr
+
+
+def resolve_path(path):
+    """Get the path of a file, possibly compressed by OpenFOAM (``.gz``)"""
+    path = Path(path)
+    if not path.exists():
+        path_gz = path.with_name(path.name + ".gz")
+        if path_gz.exists():
+            return path_gz
+    return path
+
+
+def read_gz_file(path, chunk_size=2**22):
+    """Decompress a gzip file in one buffer
+
+    The file is decompressed by chunks (streaming) directly in a bytearray
+    allocated with the size stored at the end of the gzip file.
+
+    """
+    with open(path, "rb") as file:
+        file.seek(0, os.SEEK_END)
+        if file.tell() < 4:
+            return b""
+        file.seek(-4, os.SEEK_END)
+        # size modulo 2**32
+        size = int.from_bytes(file.read(4), "little")
+        file.seek(0)
+        buffer = bytearray(size)
+        decompressor = zlib.decompressobj(wbits=31)
+        index = 0
+        while chunk := file.read(chunk_size):
+            while chunk:
+                data = decompressor.decompress(chunk)
+                # extends the buffer for files larger than 4 GiB
+                buffer[index : index + len(data)] = data
+                index += len(data)
+                if decompressor.eof:
+                    # concatenated gzip members
+                    chunk = decompressor.unused_data
+                    decompressor = zlib.decompressobj(wbits=31)
+                else:
+                    chunk = b""
+    del buffer[index:]
+    return buffer
 
-    arr = np.array(struct.unpack(fmt, bin_data))
+
+def map_file(path):
+    """Memory map a file (read-only)
+
+    Compressed files (``.gz``) are decompressed in memory.
+
+    """
+    if str(path).endswith(".gz"):
+        return read_gz_file(path)
+    with open(path, "rb") as file:
+        try:
+            return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # empty file
+            return b""
+
+
+_pattern_internal_field_nonuniform = re.compile(
+    rb"internalField\s+(?P<nonuniform>nonuniform)\s+List<(?P<dtype>\w+)>"
+    rb"\s*(?P<size>\d+)\s*\("
+)
+# end of an ASCII list: closing parenthesis followed by ";", a comment or the
+# end of the file
+_pattern_end_ascii_list = re.compile(rb"\)\s*(?:;|//|\Z)")
+
+_table_remove_parentheses = bytes.maketrans(b"()", b"  ")
+
+
+def create_array_from_ascii_data(ascii_data, type_name: str, nb_elems: int):
+    """Create an array from the ASCII data of a list
+
+    ``ascii_data`` is the content of the list without the outer parentheses.
+    The numbers are decoded in one pass (without regular expression and without
+    ``np.loadtxt``).
+
+    """
+    nb_numbers_per_elem = get_nb_numbers_per_elem(type_name)
+    # note: bytes.translate makes a copy, which is needed for mmap objects
+    ascii_data = bytes(ascii_data)
+    if nb_numbers_per_elem > 1:
+        ascii_data = ascii_data.translate(_table_remove_parentheses)
+    dtype = np.int64 if is_label_type(type_name) else float
+    if nb_elems == 0:
+        arr = np.empty(0, dtype=dtype)
+    else:
+        arr = np.fromstring(ascii_data, dtype=dtype, sep=" ")
+    if arr.size != nb_elems * nb_numbers_per_elem:
+        raise ValueError(
+            f"Bad number of values in ASCII list ({arr.size}, "
+            f"expected {nb_elems} elements of {nb_numbers_per_elem} numbers)"
+        )
     if nb_numbers_per_elem > 1:
         arr = arr.reshape((nb_elems, nb_numbers_per_elem))
     return arr
 
 
+def locate_list_data(code, index_start, type_name: str, nb_elems: int, header):
+    """Get the index of the closing parenthesis of a list
+
+    ``index_start`` is the index just after the opening parenthesis of the
+    list. For binary files, the data is not read.
+
+    """
+    nb_numbers = nb_elems * get_nb_numbers_per_elem(type_name)
+    format = header["format"]
+    if format == "binary":
+        index_stop = (
+            index_start + nb_numbers * get_element_width(header, type_name) // 8
+        )
+        if code[index_stop : index_stop + 1] != b")":
+            raise ValueError("Binary data not followed by ')'")
+    elif format == "ascii":
+        if nb_numbers == 0:
+            index_stop = code.find(b")", index_start)
+        else:
+            match = _pattern_end_ascii_list.search(code, index_start)
+            if match is None:
+                raise ValueError("End of ASCII list not found")
+            index_stop = match.start()
+    else:
+        raise ValueError(f"Unknown format {format!r}")
+    return index_stop
+
+
+def decode_list_data(
+    code,
+    index_start,
+    type_name: str,
+    nb_elems: int,
+    header,
+    copy=False,
+    index_stop=None,
+    cells=None,
+):
+    """Decode the data of a list starting at ``index_start``
+
+    ``index_start`` is the index just after the opening parenthesis of the
+    list. Returns the array and the index of the closing parenthesis.
+
+    ``cells`` (a slice or an array of indices) can be used to get only some
+    elements. For binary data, only the selected elements are read.
+
+    """
+    if index_stop is None:
+        index_stop = locate_list_data(
+            code, index_start, type_name, nb_elems, header
+        )
+    if header["format"] == "binary":
+        endianess, _, _ = get_arch(header)
+        arr = create_array_from_bin_data(
+            code,
+            type_name,
+            endianess,
+            nb_elems,
+            get_element_width(header, type_name),
+            offset=index_start,
+            copy=copy,
+            cells=cells,
+        )
+    else:
+        arr = create_array_from_ascii_data(
+            code[index_start:index_stop], type_name, nb_elems
+        )
+        if cells is not None:
+            arr = arr[cells]
+    return arr, index_stop
+
+
+@dataclass
+class ListLocation:
+    """Location of a nonuniform list in the code of a file"""
+
+    dtype: str
+    size: int
+    # index of the word "nonuniform"
+    index_nonuniform: int
+    # index just after the opening parenthesis
+    start: int
+    # index of the closing parenthesis
+    stop: int
+    # name of the entry (only for lists directly in a patch dictionary)
+    key: Optional[str] = None
+
+
+@dataclass
+class EntryLocation:
+    """Location of an entry (for example a patch of the boundaryField)"""
+
+    start: int
+    stop: int
+    lists: list = field(default_factory=list)
+
+
+@dataclass
+class FieldFileLayout:
+    """Byte offsets of the main parts of a field file"""
+
+    internal_field: EntryLocation
+    boundary_field: Optional[EntryLocation]
+    patches: dict
+
+
+_pattern_internal_field = re.compile(
+    rb"^[ \t]*(?P<key>internalField)\s", re.MULTILINE
+)
+_pattern_boundary_field = re.compile(
+    rb"^[ \t]*(?P<key>boundaryField)\s*\{", re.MULTILINE
+)
+_pattern_list_start = re.compile(
+    rb"nonuniform\s+List<(?P<dtype>\w+)>\s*(?P<size>\d+)\s*\("
+)
+_pattern_skip = re.compile(rb"(?:\s+|//[^\n]*|/\*.*?\*/)*", re.DOTALL)
+_pattern_name = re.compile(rb'"[^"]*"|[^\s{};]+')
+_pattern_key_before = re.compile(rb"(?P<key>[^\s{};]+)\s+\Z")
+_pattern_dict_tokens = re.compile(
+    rb"[{}]|//[^\n]*|/\*.*?\*/|" + _pattern_list_start.pattern, re.DOTALL
+)
+
+
+def _locate_list(code, match, header):
+    dtype = match.group("dtype").decode()
+    size = int(match.group("size"))
+    stop = locate_list_data(code, match.end(), dtype, size, header)
+    return ListLocation(dtype, size, match.start(), match.end(), stop)
+
+
+def _scan_dict_body(code, index, header):
+    """Find the end of a dictionary (``index`` is just after "{")
+
+    The data of the nonuniform lists are skipped (and located).
+
+    """
+    depth = 1
+    lists = []
+    while True:
+        match = _pattern_dict_tokens.search(code, index)
+        if match is None:
+            raise ValueError("End of dictionary not found")
+        token = match.group()
+        if token == b"{":
+            depth += 1
+        elif token == b"}":
+            depth -= 1
+            if depth == 0:
+                return match.end(), lists
+        elif token.startswith(b"nonuniform"):
+            location = _locate_list(code, match, header)
+            if depth == 1:
+                index_nonuniform = location.index_nonuniform
+                match_key = _pattern_key_before.search(
+                    code, max(index, index_nonuniform - 256), index_nonuniform
+                )
+                if match_key is not None:
+                    location.key = match_key.group("key").decode()
+            lists.append(location)
+            index = location.stop + 1
+            continue
+        index = match.end()
+
+
+def scan_field_code(code, header=None):
+    """Scan the code of a field file to get the offsets of its main parts
+
+    The data of the nonuniform lists are not decoded.
+
+    """
+    index_end_header = code.find(b"\n}")
+    if header is None:
+        header = parse_header(bytes(code[: index_end_header + 3]).decode())
+
+    match = _pattern_internal_field.search(code, index_end_header)
+    if match is None:
+        raise ValueError("No internalField entry")
+    start = match.start("key")
+    match = _pattern_list_start.match(
+        code, _pattern_skip.match(code, match.end()).end()
+    )
+    if match is None:
+        stop = code.find(b";", start) + 1
+        internal_field = EntryLocation(start, stop)
+    else:
+        location = _locate_list(code, match, header)
+        stop = code.find(b";", location.stop) + 1
+        internal_field = EntryLocation(start, stop, [location])
+
+    patches = {}
+    match = _pattern_boundary_field.search(code, internal_field.stop)
+    if match is None:
+        return FieldFileLayout(internal_field, None, patches)
+
+    start_boundary_field = match.start("key")
+    index = match.end()
+    while True:
+        index = _pattern_skip.match(code, index).end()
+        char = code[index : index + 1]
+        if char == b"}":
+            break
+        if not char:
+            raise ValueError("End of boundaryField not found")
+        if char == b"#":
+            # directive like #includeEtc
+            index = code.find(b"\n", index)
+            continue
+        match = _pattern_name.match(code, index)
+        name = match.group().decode()
+        start = index
+        index = _pattern_skip.match(code, match.end()).end()
+        if code[index : index + 1] != b"{":
+            # entry which is not a dictionary
+            index = code.find(b";", index) + 1
+            continue
+        stop, lists = _scan_dict_body(code, index + 1, header)
+        patches[name] = EntryLocation(start, stop, lists)
+        index = stop
+
+    boundary_field = EntryLocation(start_boundary_field, index + 1)
+    return FieldFileLayout(internal_field, boundary_field, patches)
+
+
+def cut_lists(code, start, stop, lists, header, copy=False):
+    """Cut the nonuniform lists out of a part of the code and decode them
+
+    The lists with a key are replaced by a short placeholder so that the
+    returned code (bytes) can be parsed quickly. Returns the code and a list of
+    tuples ``(location, array)``.
+
+    """
+    pieces = []
+    arrays = []
+    index = start
+    for location in lists:
+        if location.key is None:
+            continue
+        arr, _ = decode_list_data(
+            code,
+            location.start,
+            location.dtype,
+            location.size,
+            header,
+            copy=copy,
+            index_stop=location.stop,
+        )
+        arrays.append((location, arr))
+        pieces.append(code[index : location.index_nonuniform])
+        pieces.append(b"uniform 0")
+        # the parser does not accept a newline before the semicolon
+        index = _pattern_skip.match(code, location.stop + 1).end()
+    pieces.append(code[index:stop])
+    return b"".join(pieces), arrays
+
+
+def attach_lists(dict_patch, arrays):
+    """Attach decoded lists (see :func:`cut_lists`) to a patch dictionary"""
+    for location, arr in arrays:
+        dict_patch[location.key] = NonuniformList(
+            arr, name=location.key, dtype=location.dtype
+        )
+
+
 class FieldABC(ABC):
     cls_name: str
 
     @classmethod
     def from_code(
-        cls, code: Union[bytes, str], skip_boundary_field=False, header=None
+        cls,
+        code: Union[bytes, str],
+        skip_boundary_field=False,
+        header=None,
+        copy=False,
+        cells=None,
     ):
-        if header is None:
-            if isinstance(code, bytes):
-                code_for_header = code.split(b"\n}\n")[0].decode() + "\n}\n"
-            else:
-                code_for_header = code
-            header = parse_header(code_for_header)
+        """Create a field object from code
 
+        ``code`` can also be a ``mmap.mmap`` object (see :meth:`from_path`). For
+        binary files, the values of the internalField are then not loaded in
+        memory (except if ``copy`` is True).
+
+        ``cells`` (a slice or an array of indices) can be used to get only the
+        values of some cells. Such partial fields cannot be overwritten.
+
+        """
         if isinstance(code, str):
             code = code.encode()
 
-        if b"nonuniform" not in code:
-            tree = parse(code)
-            return cls(None, None, tree=tree)
-
-        index_nonuniform = code.index(b"nonuniform")
-        try:
-            index_boundaryField = code.rindex(b"boundaryField", index_nonuniform)
-        except ValueError:
-            index_boundaryField = len(code)
+        if header is None:
+            index_end_header = code.find(b"\n}")
+            header = parse_header(bytes(code[: index_end_header + 3]).decode())
 
-        index_opening_par = code.index(
-            b"(", index_nonuniform, index_boundaryField
-        )
-        index_closing_par = code.rindex(
-            b")", index_nonuniform, index_boundaryField
-        )
+        layout = scan_field_code(code, header)
+        internal_field = layout.internal_field
+        patches = layout.patches
+        if skip_boundary_field or layout.boundary_field is None:
+            patches = {}
+        patches = {
+            name: patch
+            for name, patch in patches.items()
+            if any(location.key is not None for location in patch.lists)
+        }
 
-        code_to_parse = code[:index_nonuniform] + b";\n"
-        if not skip_boundary_field:
-            code_to_parse += b"\n" + code[index_boundaryField:]
+        if not internal_field.lists and not patches:
+            tree = parse(bytes(code))
+            return cls(None, None, tree=tree)
 
-        tree = parse(code_to_parse.decode())
-        code_data = code[index_opening_par + 1 : index_closing_par].strip()
-
-        format = header["format"]
-        if format == "ascii":
-            if code_data.startswith(b"("):
-                code_data = re.sub(b"[()]", b"", code_data)
-            data = np.loadtxt(BytesIO(code_data))
-        elif format == "binary":
-            endianess, label_width, scalar_precision = get_arch(header)
-            nb_elems = int(
-                code[index_nonuniform:index_opening_par].split(b">")[1].strip()
+        data = None
+        if internal_field.lists:
+            location = internal_field.lists[0]
+            data, _ = decode_list_data(
+                code,
+                location.start,
+                location.dtype,
+                location.size,
+                header,
+                copy=copy,
+                index_stop=location.stop,
+                cells=cells,
             )
-            data = create_array_from_bin_data(
-                code_data, cls.cls_name, endianess, nb_elems, scalar_precision
+            code_to_parse = code[: location.index_nonuniform] + b";\n"
+        else:
+            code_to_parse = code[: internal_field.stop] + b"\n"
+
+        arrays = []
+        if not skip_boundary_field and layout.boundary_field is not None:
+            lists = [
+                location for patch in patches.values() for location in patch.lists
+            ]
+            code_boundary_field, arrays = cut_lists(
+                code, layout.boundary_field.start, len(code), lists, header, copy
             )
+            code_to_parse += b"\n" + code_boundary_field
 
+        tree = parse(code_to_parse.decode())
+
+        if arrays:
+            boundary_field = tree["boundaryField"]
+            for name, patch in patches.items():
+                attach_lists(
+                    boundary_field[name],
+                    [(loc, arr) for loc, arr in arrays if loc in patch.lists],
+                )
+
+        if data is None:
+            return cls(None, None, tree=tree)
         tree.data = data
-        return cls("", "", tree=tree, values=data)
+        field = cls("", "", tree=tree, values=data)
+        if cells is not None:
+            field.cells = cells
+        return field
 
     @classmethod
-    def from_path(cls, path: str or Path, skip_boundary_field=False, header=None):
+    def from_path(
+        cls,
+        path: str or Path,
+        skip_boundary_field=False,
+        header=None,
+        copy=False,
+        cells=None,
+    ):
+        """Create a field object from a file
+
+        The file is memory mapped so that for binary files, the values of the
+        internalField are a read-only view of the file data (``copy=True`` to
+        get a standard array).
+
+        """
         path = Path(path)
         field = cls.from_code(
-            path.read_bytes(),
+            map_file(path),
             skip_boundary_field=skip_boundary_field,
             header=header,
+            copy=copy,
+            cells=cells,
         )
         field.path = path
         return field
@@ -178,15 +665,85 @@ class FieldABC(ABC):
             self.set_values(values)
 
         self.path = None
+        # not None for fields read partially
+        self.cells = None
+        # sim.oper object (set by sim.output.fields), used by as_grid
+        self.oper = None
+
+    def set_format(self, format):
+        """Set the format ("ascii" or "binary") used to dump the field
+
+        Binary files are written with the native byte order, 32 bits labels and
+        64 bits scalars.
 
-    def dump(self):
+        """
+        if format not in ("ascii", "binary"):
+            raise ValueError(f"Unknown format {format!r}")
+        info = self.tree.info
+        info["format"] = format
+        if format == "binary":
+            internal_field = self.tree.children.get("internalField")
+            if isinstance(internal_field, List):
+                # values set from a Python list
+                self.set_values(np.array(internal_field))
+            # arch should be just after format
+            items = [(key, value) for key, value in info.items() if key != "arch"]
+            info.clear()
+            for key, value in items:
+                info[key] = value
+                if key == "format":
+                    info["arch"] = ARCH_BINARY
+
+    def dump(self, format=None):
+        """Dump the field (bytes for binary format, else str)"""
+        if format is not None:
+            self.set_format(format)
         return self.tree.dump()
 
-    def overwrite(self):
+    def overwrite(self, format=None, compress=None):
+        """Write the field in the file ``self.path``
+
+        With ``compress=True``, the file is compressed with gzip (and the
+        suffix ``.gz`` is added to the path, as OpenFOAM does with
+        ``writeCompression on``). By default, the file is compressed only if
+        ``self.path`` ends with ``.gz``.
+
+        """
         if self.path is None:
             raise ValueError("self.path is None")
-        with open(self.path, "w") as file:
-            file.write(self.dump())
+        if self.cells is not None:
+            raise ValueError("Cannot overwrite a field read partially")
+        if format is not None:
+            self.set_format(format)
+        path = self.path
+        is_compressed = path.name.endswith(".gz")
+        if compress is None:
+            compress = is_compressed
+        if compress and not is_compressed:
+            path = path.with_name(path.name + ".gz")
+        elif not compress and is_compressed:
+            path = path.with_name(path.name[: -len(".gz")])
+        # the values can be a view of a memory mapped file so we cannot
+        # truncate self.path before writing
+        path_tmp = path.with_name(path.name + ".tmp")
+        open_file = gzip.open if compress else open
+        with open_file(path_tmp, "wb") as file:
+            self.dump_to(file)
+        os.replace(path_tmp, path)
+        if path != self.path:
+            # OpenFOAM would read the old file
+            self.path.unlink(missing_ok=True)
+            self.path = path
+
+    def dump_to(self, file):
+        """Write the field in a file object
+
+        The values are written by chunks (ASCII) or directly from the array
+        buffer (binary), so that the whole file is never built in memory.
+        Binary fields have to be written in file objects opened in binary mode.
+
+        """
+        self.tree.dump_to(file)
 
     @abstractmethod
     def set_values(self, values):
@@ -222,16 +779,47 @@ class FieldABC(ABC):
     def set_name(self, name):
         self.tree.info["object"] = name
 
-    def get_array(self):
-        return np.array(self.tree.children["internalField"])
+    def get_array(self, copy=False):
+        """Get the values of the internalField as a Numpy array
 
+        For fields read from binary files, the array can be a read-only view
+        of the file data (use ``copy=True`` to get a writable array).
 
-class VolScalarField(FieldABC):
-    cls_name = "volScalarField"
+        """
+        internal_field = self.tree.children["internalField"]
+        if isinstance(internal_field, NonuniformList):
+            if copy:
+                return internal_field.array.copy()
+            return internal_field.array
+        if isinstance(internal_field, Value):
+            value = internal_field.value
+            if isinstance(value, str):
+                # uniform vector or tensor set in Python, e.g. "(1.0 2.0 3.0)"
+                value = value.strip().strip("()").split()
+            return np.array(value, dtype=float)
+        return np.array(internal_field)
+
+    def as_grid(self):
+        """Get the values as a structured array ``(nz, ny, nx[, ncomp])``
+
+        Only for fields read with ``sim.output.fields`` on structured
+        rectilinear meshes (see
+        :meth:`fluidsimfoam.operators.Operators.as_grid`).
+
+        """
+        if self.cells is not None:
+            raise ValueError("as_grid cannot be used for fields read partially")
+        uniform = not isinstance(self.tree["internalField"], NonuniformList)
+        return _as_grid(self.oper, self.get_array(), uniform)
 
+
+class ScalarFieldABC(FieldABC):
     def set_values(self, values):
         if isinstance(values, Number):
             value = Value(values, name="uniform")
+        elif isinstance(values, np.ndarray):
+            self.tree.set_child("internalField", values)
+            return
         else:
             value = List(
                 list(values),
@@ -240,9 +828,7 @@ class VolScalarField(FieldABC):
         self.tree.children["internalField"] = value
 
 
-class VolVectorField(FieldABC):
-    cls_name = "volVectorField"
-
+class VectorFieldABC(FieldABC):
     def set_values(self, values, vy=None, vz=None):
         if vy is not None:
             if vz is None:
@@ -269,32 +855,254 @@ class VolVectorField(FieldABC):
         return arr[:, 0], arr[:, 1], arr[:, 2]
 
 
-class VolTensorField(FieldABC):
-    cls_name = "volTensorField"
+class TensorFieldABC(FieldABC):
+    nb_components = 9
 
     def set_values(self, values):
         if not isinstance(values, np.ndarray) or values.ndim != 2:
             raise NotImplementedError(
                 "not isinstance(values, np.ndarray) or values.ndim != 2"
             )
-
+        if values.shape[1] != self.nb_components:
+            raise ValueError(f"{values.shape[1] = } != {self.nb_components = }")
         self.tree.set_child("internalField", values)
 
 
+class SymmTensorFieldABC(TensorFieldABC):
+    nb_components = 6
+
+
+class VolScalarField(ScalarFieldABC):
+    cls_name = "volScalarField"
+
+
+class VolVectorField(VectorFieldABC):
+    cls_name = "volVectorField"
+
+
+class VolTensorField(TensorFieldABC):
+    cls_name = "volTensorField"
+
+
+class VolSymmTensorField(SymmTensorFieldABC):
+    cls_name = "volSymmTensorField"
+
+
+class SurfaceScalarField(ScalarFieldABC):
+    cls_name = "surfaceScalarField"
+
+
+class SurfaceVectorField(VectorFieldABC):
+    cls_name = "surfaceVectorField"
+
+
+class SurfaceTensorField(TensorFieldABC):
+    cls_name = "surfaceTensorField"
+
+
+class SurfaceSymmTensorField(SymmTensorFieldABC):
+    cls_name = "surfaceSymmTensorField"
+
+
+class PointScalarField(ScalarFieldABC):
+    cls_name = "pointScalarField"
+
+
+class PointVectorField(VectorFieldABC):
+    cls_name = "pointVectorField"
+
+
+class PointTensorField(TensorFieldABC):
+    cls_name = "pointTensorField"
+
+
+class PointSymmTensorField(SymmTensorFieldABC):
+    cls_name = "pointSymmTensorField"
+
+
 classes = {
-    cls.cls_name: cls for cls in (VolScalarField, VolVectorField, VolTensorField)
+    cls.cls_name: cls
+    for cls in (
+        VolScalarField,
+        VolVectorField,
+        VolTensorField,
+        VolSymmTensorField,
+        SurfaceScalarField,
+        SurfaceVectorField,
+        SurfaceTensorField,
+        SurfaceSymmTensorField,
+        PointScalarField,
+        PointVectorField,
+        PointTensorField,
+        PointSymmTensorField,
+    )
 }
 
 
-def read_field_file(path, skip_boundary_field=True):
+_pattern_type = re.compile(rb"^\s*type\s+(?P<type>[^\s;]+)\s*;", re.MULTILINE)
+
+
+def _as_grid(oper, arr, uniform):
+    if oper is None:
+        raise ValueError(
+            "as_grid needs the object sim.oper (fields read with "
+            "sim.output.fields)"
+        )
+    if uniform:
+        shape = oper.get_grid_indices().shape
+        return np.broadcast_to(arr, shape + arr.shape)
+    return oper.as_grid(arr)
+
+
+class LazyField:
+    """Field read from a file whose parts are decoded only when accessed
+
+    The file is memory mapped and scanned once to get the byte offsets of the
+    internalField and of the entries of the boundaryField (see
+    :func:`scan_field_code`). The values are decoded on first access and then
+    cached.
+
+    """
+
+    def __init__(self, path, header=None, copy=False):
+        self.path = Path(path)
+        if header is None:
+            header = read_header(path)
+        self.header = header
+        self.copy = copy
+        self.time = None
+        self.oper = None
+        self._code = map_file(self.path)
+        self.layout = scan_field_code(self._code, header)
+        self._internal_field = None
+        self._boundaries = {}
+
+    def __repr__(self):
+        return f"{type(self).__name__}({str(self.path)!r})"
+
+    @property
+    def cls_name(self):
+        return self.header["class"]
+
+    @property
+    def boundary_names(self):
+        return list(self.layout.patches)
+
+    def _get_code(self, location):
+        return bytes(self._code[location.start : location.stop])
+
+    def get_array(self, copy=False):
+        """Get the values of the internalField as a Numpy array"""
+        if self._internal_field is None:
+            location = self.layout.internal_field
+            if location.lists:
+                list_location = location.lists[0]
+                self._internal_field, _ = decode_list_data(
+                    self._code,
+                    list_location.start,
+                    list_location.dtype,
+                    list_location.size,
+                    self.header,
+                    copy=self.copy,
+                    index_stop=list_location.stop,
+                )
+            else:
+                # uniform internalField
+                value = parse(self._get_code(location).decode()).value
+                if isinstance(value, Value):
+                    value = value.value
+                self._internal_field = np.array(value, dtype=float)
+        if copy:
+            return self._internal_field.copy()
+        return self._internal_field
+
+    def as_grid(self):
+        """Get the values as a structured array (see :meth:`FieldABC.as_grid`)"""
+        uniform = not self.layout.internal_field.lists
+        return _as_grid(self.oper, self.get_array(), uniform)
+
+    def get_boundary_type(self, name):
+        """Get the type of a patch without parsing its entry"""
+        match = _pattern_type.search(self._get_code(self.layout.patches[name]))
+        if match is None:
+            return None
+        return match.group("type").decode()
+
+    def get_boundary_types(self):
+        return {
+            name: self.get_boundary_type(name) for name in self.layout.patches
+        }
+
+    def get_boundary(self, name):
+        """Get the entry of a patch of the boundaryField (a Dict)"""
+        try:
+            return self._boundaries[name]
+        except KeyError:
+            pass
+        location = self.layout.patches[name]
+        code, arrays = cut_lists(
+            self._code,
+            location.start,
+            location.stop,
+            location.lists,
+            self.header,
+            self.copy,
+        )
+        boundary = parse(code.decode()).value
+        attach_lists(boundary, arrays)
+        self._boundaries[name] = boundary
+        return boundary
+
+    def load(self, skip_boundary_field=False):
+        """Decode the whole file and return a standard field object"""
+        field = classes[self.cls_name].from_code(
+            self._code,
+            skip_boundary_field=skip_boundary_field,
+            header=self.header,
+            copy=self.copy,
+        )
+        field.path = self.path
+        field.time = self.time
+        field.oper = self.oper
+        return field
+
+
+def read_field_file(
+    path, skip_boundary_field=True, copy=False, lazy=False, cells=None
+):
+    """Read a field file
+
+    For binary files, the values of the internalField are a read-only view of
+    the memory mapped file (except if ``copy`` is True).
+
+    Files compressed by OpenFOAM are also read: if ``path`` does not exist,
+    ``path`` + ``".gz"`` is used.
+
+    With ``lazy=True``, a :class:`LazyField` is returned and the file is only
+    scanned; the values are decoded when they are accessed.
+
+    ``cells`` (a slice or an array of indices) can be used to read only the
+    values of some cells. For binary files, only the corresponding bytes are
+    read so that the cost scales with the selection and not with the mesh.
+
+    """
+    path = resolve_path(path)
     header = read_header(path)
     try:
         cls_name = header["class"]
     except KeyError:
         raise RuntimeError(f"no class found for file {path}")
+    if lazy:
+        if cells is not None:
+            raise ValueError("cells cannot be used with lazy=True")
+        return LazyField(path, header=header, copy=copy)
     cls = classes[cls_name]
     return cls.from_path(
-        path, skip_boundary_field=skip_boundary_field, header=header
+        path,
+        skip_boundary_field=skip_boundary_field,
+        header=header,
+        copy=copy,
+        cells=cells,
     )
 
 
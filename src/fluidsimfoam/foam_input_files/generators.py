@@ -1,5 +1,6 @@
 """Internal machinery to generate the OpenFOAM input files"""
 
+import os
 from abc import ABC, abstractmethod
 from inspect import getmodule
 from pathlib import Path
@@ -9,6 +10,7 @@ from inflection import camelize, underscore
 
 from fluiddyn.util import import_class
 from fluidsimfoam.foam_input_files import FileHelper, parse, read_field_file
+from fluidsimfoam.foam_input_files.fields import FieldABC
 
 
 class InputFiles:
@@ -48,13 +50,35 @@ class FileGeneratorABC(ABC):
         if params is None:
             params = self.output.sim.params
 
+        path = self.output.path_run / self.rel_path
+
+        tree = self.generate_tree(params)
+        if tree is False:
+            return
+        if tree is not None:
+            path.parent.mkdir(exist_ok=True)
+            # the tree is directly written in the file (without building the
+            # whole code in memory)
+            with open(path, "wb") as file:
+                tree.dump_to(file)
+            return
+
         code = self.generate_code(params)
         if code is False:
             return
 
-        path = self.output.path_run / self.rel_path
         path.parent.mkdir(exist_ok=True)
-        path.write_text(code)
+        if isinstance(code, bytes):
+            path.write_bytes(code)
+        else:
+            path.write_text(code)
+
+    def generate_tree(self, params=None):
+        """Generate the tree of the file
+
+        Return None if the file is not produced from a tree.
+        """
+        return None
 
     @abstractmethod
     def generate_code(self):
@@ -72,7 +96,12 @@ class FileGeneratorABC(ABC):
             return read_field_file(path)
 
     def overwrite(self, dumpable):
-        (self.output.path_run / self.rel_path).write_text(dumpable.dump())
+        path = self.output.path_run / self.rel_path
+        # dumpable can contain views of the memory mapped file
+        path_tmp = path.with_name(path.name + ".tmp")
+        with open(path_tmp, "wb") as file:
+            dumpable.dump_to(file)
+        os.replace(path_tmp, path)
 
 
 class FileGenerator(FileGeneratorABC):
@@ -81,47 +110,22 @@ class FileGenerator(FileGeneratorABC):
     def __init__(self, output):
         super().__init__(output)
 
-    def generate_code(self, params=None):
-        """Generate the code of the file from ...
+    def _get_make_code(self):
+        return getattr(self.output, "_make_code_" + self._name, None)
 
-        - a method named like `sim.output._make_code_block_mesh_dict`,
-        - or a Jinja template.
-        """
-        if params is None:
-            params = self.output.sim.params
-
-        try:
-            make_code = getattr(self.output, "_make_code_" + self._name)
-        except AttributeError:
-            make_code = None
-
-        if make_code is None:
+    def _get_make_tree(self):
+        make_tree = getattr(self.output, "_make_tree_" + self._name, None)
+        if make_tree is None:
             try:
-                make_tree = getattr(self.output, "_make_tree_" + self._name)
+                helper = getattr(self.output, "_helper_" + self._name)
             except AttributeError:
-                make_tree = None
-
-            if make_tree is None:
-                try:
-                    helper = getattr(self.output, "_helper_" + self._name)
-                except AttributeError:
-                    pass
-                else:
-                    if isinstance(helper, FileHelper):
-                        make_tree = helper.make_tree
-
-            if make_tree is not None:
-
-                def make_code(params_):
-                    tree = make_tree(params_)
-                    if tree is False:
-                        return False
-                    return tree.dump()
-
-        if make_code is None:
-            template = self.input_files.get_template(self.template_name)
-            return template.render(params=params)
+                pass
+            else:
+                if isinstance(helper, FileHelper):
+                    make_tree = helper.make_tree
+        return make_tree
 
+    def _check_no_template(self):
         if (self.input_files.templates_dir / self.template_name).exists():
             raise RuntimeError(
                 "Fluidsimfoam solver issue: "
@@ -131,6 +135,56 @@ class FileGenerator(FileGeneratorABC):
                 "Remove the file or the function (or make it equal to None)."
             )
 
+    def generate_tree(self, params=None):
+        """Generate the tree of the file from ...
+
+        - a method named like `sim.output._make_tree_u`,
+        - or a helper object (like `sim.output._helper_control_dict`).
+
+        Return None if the file is produced from code or from a Jinja template.
+        """
+        if params is None:
+            params = self.output.sim.params
+
+        if self._get_make_code() is not None:
+            return None
+
+        make_tree = self._get_make_tree()
+        if make_tree is None:
+            return None
+
+        self._check_no_template()
+        tree = make_tree(params)
+        if isinstance(tree, FieldABC):
+            try:
+                write_format = params.control_dict.write_format
+            except AttributeError:
+                pass
+            else:
+                tree.set_format(write_format)
+        return tree
+
+    def generate_code(self, params=None):
+        """Generate the code of the file from ...
+
+        - a method named like `sim.output._make_code_block_mesh_dict`,
+        - a tree (see :meth:`generate_tree`),
+        - or a Jinja template.
+        """
+        if params is None:
+            params = self.output.sim.params
+
+        make_code = self._get_make_code()
+        if make_code is None:
+            tree = self.generate_tree(params)
+            if tree is None:
+                template = self.input_files.get_template(self.template_name)
+                return template.render(params=params)
+            if tree is False:
+                return False
+            return tree.dump()
+
+        self._check_no_template()
         return make_code(params)
 
     @classmethod
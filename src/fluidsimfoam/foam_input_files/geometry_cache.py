@@ -0,0 +1,149 @@
+"""Cache of arrays computed from mesh files
+
+The arrays (for example cell centres and volumes) are keyed on the paths, the
+modification times and the sizes of the files from which they are computed, so
+that they are recomputed when a file changes. The arrays are kept in memory
+(least recently used arrays are evicted when the memory limit is reached) and
+can be saved as ``.npy`` files (for example in ``.data_fluidsim/mesh``), which
+are memory mapped when a simulation is loaded again.
+
+"""
+
+import json
+import os
+from collections import OrderedDict
+from pathlib import Path
+from threading import Lock
+
+import numpy as np
+
+from fluidsimfoam.foam_input_files.fields import resolve_path
+
+
+def get_signature(paths):
+    """Get the paths, modification times and sizes of files
+
+    The compressed files (``path.gz``) are used if needed.
+
+    """
+    signature = []
+    for path in paths:
+        path = resolve_path(Path(path))
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            signature.append((str(path), None, None))
+        else:
+            signature.append((str(path), stat.st_mtime_ns, stat.st_size))
+    return tuple(signature)
+
+
+class GeometryCache:
+    """LRU cache of arrays computed from files
+
+    Parameters
+    ----------
+
+    max_nbytes : int
+        Maximum memory used by the arrays kept in memory.
+
+    """
+
+    def __init__(self, max_nbytes=2**30):
+        self.max_nbytes = max_nbytes
+        self.nbytes = 0
+        self._arrays = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self):
+        return len(self._arrays)
+
+    def clear(self):
+        with self._lock:
+            self._arrays.clear()
+            self.nbytes = 0
+
+    def _get_from_memory(self, key):
+        with self._lock:
+            try:
+                arr = self._arrays[key]
+            except KeyError:
+                return None
+            self._arrays.move_to_end(key)
+            return arr
+
+    def _add_to_memory(self, key, arr):
+        with self._lock:
+            if key in self._arrays:
+                return
+            self._arrays[key] = arr
+            self.nbytes += arr.nbytes
+            while self.nbytes > self.max_nbytes and len(self._arrays) > 1:
+                _, arr_old = self._arrays.popitem(last=False)
+                self.nbytes -= arr_old.nbytes
+
+    def get(self, name, paths, compute, path_dir=None):
+        """Get an array (computed only if needed)
+
+        Parameters
+        ----------
+
+        name : str
+            Name of the array.
+        paths : sequence of paths
+            Files used to compute the array.
+        compute : callable
+            Function (without argument) computing the array.
+        path_dir : str or Path
+            Directory where the array is saved (``name.npy``). If None, the
+            array is only kept in memory.
+
+        """
+        signature = get_signature(paths)
+        key = (name, None if path_dir is None else str(path_dir), signature)
+        arr = self._get_from_memory(key)
+        if arr is not None:
+            return arr
+        arr = None
+        if path_dir is not None:
+            arr = _load(Path(path_dir), name, signature)
+        if arr is None:
+            arr = np.asarray(compute())
+            if path_dir is not None:
+                _save(Path(path_dir), name, signature, arr)
+        self._add_to_memory(key, arr)
+        return arr
+
+
+def _load(path_dir, name, signature):
+    path_info = path_dir / f"{name}.json"
+    path_data = path_dir / f"{name}.npy"
+    try:
+        info = json.loads(path_info.read_text())
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    if [tuple(source) for source in info["sources"]] != list(signature):
+        return None
+    try:
+        return np.load(path_data, mmap_mode="r")
+    except (OSError, ValueError):
+        return None
+
+
+def _save(path_dir, name, signature, arr):
+    try:
+        path_dir.mkdir(parents=True, exist_ok=True)
+        path_data = path_dir / f"{name}.npy"
+        path_tmp = path_dir / f"{name}.tmp.npy"
+        np.save(path_tmp, arr)
+        os.replace(path_tmp, path_data)
+        path_info = path_dir / f"{name}.json"
+        path_tmp = path_dir / f"{name}.json.tmp"
+        path_tmp.write_text(json.dumps({"sources": signature}))
+        os.replace(path_tmp, path_info)
+    except OSError:
+        # for example read-only directory
+        pass
+
+
+geometry_cache = GeometryCache()
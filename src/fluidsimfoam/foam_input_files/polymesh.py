@@ -1,46 +1,417 @@
 """Read information on the mesh from the polyMesh directory
 
+The files ``points``, ``faces``, ``owner``, ``neighbour`` and ``boundary`` can
+be read (ASCII and binary, possibly compressed) and the geometry of the faces
+and cells (centres, areas and volumes) is computed with Numpy (see
+:class:`PolyMesh`).
+
 """
 
 import re
-from functools import lru_cache
-from io import StringIO
+from dataclasses import dataclass, field
+from functools import cached_property, partial
+from pathlib import Path
 
 import numpy as np
 
+from fluidsimfoam.foam_input_files import parse_header
+from fluidsimfoam.foam_input_files.fields import (
+    decode_list_data,
+    map_file,
+    resolve_path,
+)
+from fluidsimfoam.foam_input_files.geometry_cache import geometry_cache
+
+_pattern_list_start = re.compile(rb"^(?P<size>\d+)\s*\(", re.MULTILINE)
+
+
+def _read_code_header(path):
+    path = resolve_path(path)
+    code = map_file(path)
+    index_end_header = code.find(b"\n}")
+    header = parse_header(bytes(code[: index_end_header + 3]).decode())
+    return code, header, index_end_header
+
+
+def read_list_file(path, type_name):
+    """Read a file containing only a list (like ``polyMesh/points``)
+
+    If ``path`` does not exist, the compressed file (``path.gz``) is read.
+
+    """
+    code, header, index_end_header = _read_code_header(path)
+    match = _pattern_list_start.search(code, index_end_header)
+    if match is None:
+        raise ValueError(f"No list found in file {path}")
+    arr, _ = decode_list_data(
+        code, match.end(), type_name, int(match.group("size")), header
+    )
+    return arr
+
+
+_pattern_patch = re.compile(rb"(?P<name>[^\s{}();]+)\s*\{(?P<body>[^{}]*)\}")
+_pattern_keyword = re.compile(rb"(?P<key>\w+)\s+(?P<value>[^;]*);")
+
+
+def read_boundary_file(path):
+    """Read a ``polyMesh/boundary`` file
+
+    Returns a dict ``{patch_name: dict}`` (in the order of the file). The
+    integer values (like ``nFaces`` and ``startFace``) are converted to ``int``
+    and the other values are kept as strings.
+
+    """
+    path = resolve_path(path)
+    code = map_file(path)
+    index_end_header = code.find(b"\n}")
+    match = _pattern_list_start.search(code, index_end_header)
+    if match is None:
+        raise ValueError(f"No list found in file {path}")
+    patches = {}
+    for match_patch in _pattern_patch.finditer(code, match.end()):
+        patch = {}
+        for match_keyword in _pattern_keyword.finditer(match_patch["body"]):
+            value = match_keyword["value"].strip().decode()
+            if value.lstrip("-").isdigit():
+                value = int(value)
+            patch[match_keyword["key"].decode()] = value
+        patches[match_patch["name"].decode()] = patch
+    return patches
+
+
+@dataclass
+class Patch:
+    """Descriptor of a boundary patch (entry of ``polyMesh/boundary``)"""
+
+    name: str
+    type: str
+    nb_faces: int
+    start_face: int
+    # other entries (for example inGroups or neighbourPatch)
+    info: dict = field(default_factory=dict)
+
+    @property
+    def faces(self):
+        """Slice of the faces of the patch in the global lists of faces"""
+        return slice(self.start_face, self.start_face + self.nb_faces)
+
+
+def read_patches(path):
+    """Read a ``polyMesh/boundary`` file and return a dict ``{name: Patch}``"""
+    patches = {}
+    for name, entries in read_boundary_file(path).items():
+        info = dict(entries)
+        patches[name] = Patch(
+            name,
+            info.pop("type"),
+            int(info.pop("nFaces")),
+            int(info.pop("startFace")),
+            info,
+        )
+    return patches
+
 
-@lru_cache(maxsize=1)
 def get_points_coords(path):
-    """Get points coordinates"""
-
-    with open(path) as file:
-        for line in file:
-            if line == "FoamFile\n":
-                break
-        for line in file:
-            if line == "}\n":
-                break
-        for line in file:
-            line = line[:-1]
-            if line.isdigit():
-                nb_cells = int(line)
-                break
-        assert file.readline() == "(\n"
-        txt = file.read()
-
-    if txt.startswith("("):
-        txt = re.sub("[()]", "", txt)
-
-    txt = txt.strip()
-
-    index_last_comment = txt.rfind("\n//")
-    txt = txt[:index_last_comment].strip()
-
-    coords = np.loadtxt(StringIO(txt))
+    """Get points coordinates
+
+    The array is cached (see
+    :mod:`fluidsimfoam.foam_input_files.geometry_cache`) and read again only
+    if the file has been modified.
+
+    """
+    coords = geometry_cache.get(
+        "points", [path], partial(read_list_file, path, "vector")
+    )
     x = coords[:, 0]
     y = coords[:, 1]
     z = coords[:, 2]
+    return x, y, z
 
-    assert x.size == nb_cells
 
-    return x, y, z
+_table_parentheses = bytes.maketrans(b"()", b"  ")
+
+
+def read_faces_file(path):
+    """Read a ``polyMesh/faces`` file
+
+    Both ``faceList`` (ASCII) and ``faceCompactList`` (ASCII or binary) files
+    are supported. Returns the compact representation ``(offsets, labels)``:
+    the points of the face ``i`` are ``labels[offsets[i]:offsets[i+1]]``.
+
+    """
+    code, header, index_end_header = _read_code_header(path)
+    match = _pattern_list_start.search(code, index_end_header)
+    if match is None:
+        raise ValueError(f"No list found in file {path}")
+
+    if header.get("class") == "faceCompactList":
+        offsets, index_stop = decode_list_data(
+            code, match.end(), "label", int(match["size"]), header, copy=True
+        )
+        match = _pattern_list_start.search(code, index_stop + 1)
+        if match is None:
+            raise ValueError(f"No list of labels found in file {path}")
+        labels, _ = decode_list_data(
+            code, match.end(), "label", int(match["size"]), header, copy=True
+        )
+        return offsets.astype(np.int64), labels.astype(np.int64)
+
+    if header["format"] != "ascii":
+        raise ValueError(f"Unsupported faces file {path}")
+
+    # faceList: n(p0 p1 ... pn-1) for each face
+    nb_faces = int(match["size"])
+    index_stop = code.rfind(b")")
+    data = bytes(code[match.end() : index_stop]).translate(_table_parentheses)
+    numbers = np.fromstring(data, dtype=np.int64, sep=" ")
+    sizes = None
+    if numbers.size:
+        # fast path: all faces have the same number of points
+        size = int(numbers[0])
+        if numbers.size == nb_faces * (size + 1):
+            table = numbers.reshape(nb_faces, size + 1)
+            if np.all(table[:, 0] == size):
+                sizes = np.full(nb_faces, size)
+                labels = table[:, 1:].ravel()
+    if sizes is None:
+        sizes = np.empty(nb_faces, dtype=np.int64)
+        mask = np.ones(numbers.size, dtype=bool)
+        index = 0
+        for index_face in range(nb_faces):
+            size = int(numbers[index])
+            sizes[index_face] = size
+            mask[index] = False
+            index += size + 1
+        if index != numbers.size:
+            raise ValueError(f"Inconsistent faces file {path}")
+        labels = numbers[mask]
+    offsets = np.zeros(nb_faces + 1, dtype=np.int64)
+    np.cumsum(sizes, out=offsets[1:])
+    return offsets, labels
+
+
+def compute_faces_geometry(points, offsets, labels):
+    """Compute the face centres and the face area vectors
+
+    The faces are decomposed in triangles around their estimated centres (as
+    in OpenFOAM). Returns ``(centres, areas)`` with shapes ``(nfaces, 3)``.
+
+    """
+    nb_faces = offsets.size - 1
+    sizes = np.diff(offsets)
+    face_ids = np.repeat(np.arange(nb_faces), sizes)
+    # index of the next point of each face (cyclic)
+    next_ = np.arange(1, labels.size + 1)
+    next_[offsets[1:] - 1] = offsets[:-1]
+
+    def sum_per_face(values):
+        result = np.empty((nb_faces, 3))
+        for index in range(3):
+            result[:, index] = np.bincount(
+                face_ids, weights=values[:, index], minlength=nb_faces
+            )
+        return result
+
+    p0 = points[labels]
+    p1 = p0[next_]
+    centres_estimated = sum_per_face(p0) / sizes[:, np.newaxis]
+    c_est = centres_estimated[face_ids]
+    normals = np.cross(p1 - p0, c_est - p0)
+    sum_normals = sum_per_face(normals)
+    norms = np.linalg.norm(sum_normals, axis=1)
+    norms[norms == 0] = 1.0
+    directions = sum_normals / norms[:, np.newaxis]
+    areas_triangles = np.einsum("ij,ij->i", normals, directions[face_ids])
+    sum_areas = np.bincount(face_ids, weights=areas_triangles, minlength=nb_faces)
+    sum_areas_centres = sum_per_face(
+        areas_triangles[:, np.newaxis] * (p0 + p1 + c_est)
+    )
+    degenerated = sum_areas < 1e-300
+    sum_areas[degenerated] = 1.0
+    centres = sum_areas_centres / (3 * sum_areas[:, np.newaxis])
+    centres[degenerated] = centres_estimated[degenerated]
+    return centres, 0.5 * sum_normals
+
+
+def compute_cells_geometry(face_centres, face_areas, owner, neighbour, nb_cells):
+    """Compute the cell centres and volumes
+
+    The cells are decomposed in pyramids over their faces (as in OpenFOAM).
+    Returns ``(centres, volumes)``.
+
+    """
+    nb_internal_faces = neighbour.size
+
+    def sum_per_cell(values_owner, values_neighbour):
+        return np.bincount(
+            owner, weights=values_owner, minlength=nb_cells
+        ) + np.bincount(neighbour, weights=values_neighbour, minlength=nb_cells)
+
+    nb_faces_cells = sum_per_cell(np.ones(owner.size), np.ones(nb_internal_faces))
+    centres_estimated = (
+        np.stack(
+            [
+                sum_per_cell(
+                    face_centres[:, index],
+                    face_centres[:nb_internal_faces, index],
+                )
+                for index in range(3)
+            ],
+            axis=1,
+        )
+        / nb_faces_cells[:, np.newaxis]
+    )
+
+    # 3 times the volumes of the pyramids
+    vol3_owner = np.einsum(
+        "ij,ij->i", face_areas, face_centres - centres_estimated[owner]
+    )
+    internal_areas = face_areas[:nb_internal_faces]
+    internal_centres = face_centres[:nb_internal_faces]
+    vol3_neighbour = np.einsum(
+        "ij,ij->i",
+        internal_areas,
+        centres_estimated[neighbour] - internal_centres,
+    )
+    centres_owner = 0.75 * face_centres + 0.25 * centres_estimated[owner]
+    centres_neighbour = (
+        0.75 * internal_centres + 0.25 * centres_estimated[neighbour]
+    )
+    vol3 = sum_per_cell(vol3_owner, vol3_neighbour)
+    centres = np.stack(
+        [
+            sum_per_cell(
+                vol3_owner * centres_owner[:, index],
+                vol3_neighbour * centres_neighbour[:, index],
+            )
+            for index in range(3)
+        ],
+        axis=1,
+    )
+    small = np.abs(vol3) < 1e-300
+    centres[~small] /= vol3[~small, np.newaxis]
+    centres[small] = centres_estimated[small]
+    return centres, vol3 / 3
+
+
+class PolyMesh:
+    """Mesh read from a ``polyMesh`` directory
+
+    Parameters
+    ----------
+
+    path_dir : str or Path
+        Path of the ``polyMesh`` directory (for example
+        ``path_run / "constant/polyMesh"``).
+
+    The files are read and the geometry is computed only when needed.
+
+    """
+
+    def __init__(self, path_dir):
+        self.path_dir = Path(path_dir)
+
+    @cached_property
+    def points(self):
+        return read_list_file(self.path_dir / "points", "vector")
+
+    @cached_property
+    def faces(self):
+        """Compact representation of the faces ``(offsets, labels)``"""
+        return read_faces_file(self.path_dir / "faces")
+
+    @cached_property
+    def owner(self):
+        return read_list_file(self.path_dir / "owner", "label").astype(np.intp)
+
+    @cached_property
+    def neighbour(self):
+        return read_list_file(self.path_dir / "neighbour", "label").astype(
+            np.intp
+        )
+
+    @cached_property
+    def boundary(self):
+        return read_boundary_file(self.path_dir / "boundary")
+
+    @cached_property
+    def patches(self):
+        """Dict ``{name: Patch}`` of the boundary patches"""
+        return read_patches(self.path_dir / "boundary")
+
+    def _get_patch(self, name):
+        try:
+            return self.patches[name]
+        except KeyError:
+            raise ValueError(
+                f"No patch {name!r} (patches: {list(self.patches)})"
+            ) from None
+
+    def get_patch_faces(self, name):
+        """Get the faces of a patch in the compact representation"""
+        faces = self._get_patch(name).faces
+        offsets, labels = self.faces
+        offsets_patch = offsets[faces.start : faces.stop + 1]
+        labels = labels[offsets_patch[0] : offsets_patch[-1]]
+        return offsets_patch - offsets_patch[0], labels
+
+    def get_patch_cells(self, name):
+        """Get the indices of the cells adjacent to the faces of a patch"""
+        return self.owner[self._get_patch(name).faces]
+
+    def get_patch_geometry(self, name):
+        """Get the face centres and the (outward) face area vectors of a patch
+
+        Only the faces of the patch are processed.
+
+        """
+        if "_faces_geometry" in self.__dict__:
+            faces = self._get_patch(name).faces
+            return self.face_centres[faces], self.face_areas[faces]
+        return compute_faces_geometry(self.points, *self.get_patch_faces(name))
+
+    @property
+    def nb_faces(self):
+        return self.owner.size
+
+    @property
+    def nb_internal_faces(self):
+        return self.neighbour.size
+
+    @cached_property
+    def nb_cells(self):
+        nb_cells = int(self.owner.max()) + 1
+        if self.neighbour.size:
+            nb_cells = max(nb_cells, int(self.neighbour.max()) + 1)
+        return nb_cells
+
+    @cached_property
+    def _faces_geometry(self):
+        return compute_faces_geometry(self.points, *self.faces)
+
+    @property
+    def face_centres(self):
+        return self._faces_geometry[0]
+
+    @property
+    def face_areas(self):
+        """Face area vectors (oriented from the owner to the neighbour)"""
+        return self._faces_geometry[1]
+
+    @cached_property
+    def _cells_geometry(self):
+        return compute_cells_geometry(
+            self.face_centres,
+            self.face_areas,
+            self.owner,
+            self.neighbour,
+            self.nb_cells,
+        )
+
+    @property
+    def cell_centres(self):
+        return self._cells_geometry[0]
+
+    @property
+    def cell_volumes(self):
+        return self._cells_geometry[1]
@@ -21,6 +21,7 @@ from invoke import task
 from invoke.exceptions import Exit
 
 from fluidsimfoam.foam_input_files import parse
+from fluidsimfoam.foam_input_files.blockmesh.mesher import write_polymesh
 
 from .context import Context
 
@@ -35,9 +36,46 @@ def clean(context):
         path.unlink()
 
 
-@task
-def block_mesh(context):
-    """Run ``blockMesh``"""
+USE_PYTHON_BLOCK_MESH = True
+"""Default for the option ``--no-python-mesher`` of the task ``block_mesh``
+"""
+
+
+def _write_polymesh_without_block_mesh():
+    """Write the polyMesh files in Python if the blockMeshDict is supported
+
+    See :mod:`fluidsimfoam.foam_input_files.blockmesh.mesher`.
+
+    """
+    path_dict = Path("system/blockMeshDict")
+    path_called = Path(".data_fluidsim/blockMesh_called")
+    if not path_dict.exists() or path_called.exists():
+        return False
+    try:
+        write_polymesh(path_dict, "constant/polyMesh")
+    except NotImplementedError as error:
+        # unsupported (or not parsable) blockMeshDict
+        print(f"Python mesher not used ({error})")
+        return False
+    path_called.parent.mkdir(exist_ok=True)
+    path_called.touch()
+    print("polyMesh written without blockMesh")
+    return True
+
+
+@task(help={"no_python_mesher": "Always use blockMesh"})
+def block_mesh(context, no_python_mesher=False):
+    """Run ``blockMesh`` (or write the polyMesh files in Python if possible)
+
+    The Python mesher (:mod:`fluidsimfoam.foam_input_files.blockmesh.mesher`)
+    is used for single-block rectilinear meshes, except with the option
+    ``--no-python-mesher`` (for example ``invoke block-mesh --no-python-mesher
+    polymesh``) or if ``USE_PYTHON_BLOCK_MESH`` is False.
+
+    """
+    use_python_mesher = USE_PYTHON_BLOCK_MESH and not no_python_mesher
+    if use_python_mesher and _write_polymesh_without_block_mesh():
+        return
     context.run_appl_once("blockMesh")
 
 
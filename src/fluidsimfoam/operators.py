@@ -1,9 +1,84 @@
-"""Base class for the ``sim.oper`` object"""
+"""Base class for the ``sim.oper`` object
 
-import shutil
-from subprocess import PIPE, run
+The reductions over homogeneous directions (:meth:`Operators.average_over` and
+:meth:`Operators.integrate`) group the cells by their coordinates along the
+other directions. The grouping indices and the weights are computed only once
+per mesh and then applied to any field with ``np.bincount``.
 
-from fluidsimfoam.foam_input_files.fields import VolVectorField
+"""
+
+from subprocess import PIPE
+
+import numpy as np
+
+from fluidsimfoam.foam_input_files.fields import (
+    VolVectorField,
+    read_field_file,
+    resolve_path,
+)
+from fluidsimfoam.foam_input_files.geometry_cache import (
+    geometry_cache,
+    get_signature,
+)
+from fluidsimfoam.foam_input_files.polymesh import PolyMesh, get_points_coords
+
+_axes = "xyz"
+_polymesh_files = ("points", "faces", "owner", "neighbour")
+
+
+class _Grouping:
+    """Groups of cells with the same coordinates along some directions"""
+
+    def __init__(self, inverse, coords, weights):
+        self.inverse = inverse
+        self.coords = coords
+        self.weights = weights
+        self.nb_groups = len(coords[0])
+        self.sum_weights = np.bincount(
+            inverse, weights=weights, minlength=self.nb_groups
+        )
+
+    def sum(self, values):
+        """Weighted sums over the groups (first axis: cells)"""
+        values = np.asarray(values, dtype=float)
+        if values.shape[0] != self.inverse.size:
+            raise ValueError(
+                f"{values.shape[0] = } != number of cells ({self.inverse.size})"
+            )
+        if values.ndim == 1:
+            return np.bincount(
+                self.inverse,
+                weights=self._weigh(values),
+                minlength=self.nb_groups,
+            )
+        values_2d = values.reshape(values.shape[0], -1)
+        result = np.empty((self.nb_groups, values_2d.shape[1]))
+        for index in range(values_2d.shape[1]):
+            result[:, index] = np.bincount(
+                self.inverse,
+                weights=self._weigh(values_2d[:, index]),
+                minlength=self.nb_groups,
+            )
+        return result.reshape((self.nb_groups,) + values.shape[1:])
+
+    def _weigh(self, values):
+        if self.weights is None:
+            return values
+        return values * self.weights
+
+    def average(self, values):
+        sums = self.sum(values)
+        sum_weights = self.sum_weights.reshape(
+            (self.nb_groups,) + (1,) * (sums.ndim - 1)
+        )
+        return sums / sum_weights
+
+
+def _check_directions(directions):
+    directions = "".join(sorted(set(directions)))
+    if not directions or any(letter not in _axes for letter in directions):
+        raise ValueError(f"Unsupported {directions = } (letters in 'xyz')")
+    return directions
 
 
 class Operators:
@@ -13,28 +88,311 @@ class Operators:
         if hasattr(sim.output.input_files, "block_mesh_dict"):
             assert (sim.output.path_run / "system/blockMeshDict").exists()
 
+        self._mesh_key = None
+        self._groupings = {}
+        self._polymesh = None
+        self._grid = None
+
+    @property
+    def path_cache(self):
+        """Directory where the arrays computed from the mesh are saved"""
+        return self.sim.path_run / ".data_fluidsim/mesh"
+
+    def _get_paths_polymesh(self):
+        path_dir = self.sim.path_run / "constant/polyMesh"
+        return [path_dir / name for name in _polymesh_files]
+
+    def get_polymesh(self):
+        """Get the mesh (:class:`fluidsimfoam.foam_input_files.polymesh.PolyMesh`)
+
+        If needed, the mesh is created with the invoke task ``polymesh``.
+
+        """
+        self._check_mesh_key()
+        if self._polymesh is not None:
+            return self._polymesh
+        path_dir = self.sim.path_run / "constant/polyMesh"
+        path_points = resolve_path(path_dir / "points")
+        if not path_points.exists():
+            self.sim.make.exec("polymesh", stdout=PIPE)
+            path_points = resolve_path(path_points)
+        if not path_points.exists():
+            raise RuntimeError(f"{path_points} does not exists")
+        self._polymesh = PolyMesh(path_dir)
+        return self._polymesh
+
+    def _get_cells_centres(self):
+        path_c = self.sim.path_run / "0/C"
+        if resolve_path(path_c).exists():
+            return geometry_cache.get(
+                "C",
+                [path_c],
+                lambda: VolVectorField.from_path(
+                    path_c, skip_boundary_field=True
+                ).get_array(),
+            )
+        # the mesh is created if needed
+        polymesh = self.get_polymesh()
+        return geometry_cache.get(
+            "cell_centres",
+            self._get_paths_polymesh(),
+            lambda: polymesh.cell_centres,
+            path_dir=self.path_cache,
+        )
+
     def get_cells_coords(self):
+        """Get the coordinates of the cell centres
+
+        The file ``0/C`` is used if it exists. Otherwise, the cell centres are
+        computed from the polyMesh files. The arrays are cached (see
+        :mod:`fluidsimfoam.foam_input_files.geometry_cache`) and the computed
+        ones are saved in ``.data_fluidsim/mesh``.
+
+        """
+        centres = self._get_cells_centres()
+        return centres[:, 0], centres[:, 1], centres[:, 2]
+
+    def get_cells_volumes(self):
+        """Get the cell volumes
+
+        The file ``0/V`` (written by ``postProcess -func writeCellVolumes``) is
+        used if it exists. Otherwise, the volumes are computed from the
+        polyMesh files (and saved in ``.data_fluidsim/mesh``).
+
+        """
+        path = self.sim.path_run / "0/V"
+        if resolve_path(path).exists():
+            return geometry_cache.get(
+                "V", [path], lambda: read_field_file(path).get_array(copy=True)
+            )
+        path_points = self.sim.path_run / "constant/polyMesh/points"
+        if not resolve_path(path_points).exists():
+            raise ValueError(
+                f"Neither {path} nor {path_points} exist. The cell "
+                "volumes cannot be computed."
+            )
+        return geometry_cache.get(
+            "cell_volumes",
+            self._get_paths_polymesh(),
+            lambda: self.get_polymesh().cell_volumes,
+            path_dir=self.path_cache,
+        )
+
+    def _check_mesh_key(self):
+        """Clear the cached data if the mesh files have changed"""
+        key = get_signature(
+            [self.sim.path_run / "0/C", self.sim.path_run / "0/V"]
+            + self._get_paths_polymesh()
+        )
+        if key != self._mesh_key:
+            self._mesh_key = key
+            self._groupings.clear()
+            self._polymesh = None
+            self._grid = None
+
+    def _get_grouping(self, directions, weights, decimals):
+        self._check_mesh_key()
+        key = (directions, weights, decimals)
+        try:
+            return self._groupings[key]
+        except KeyError:
+            pass
+
+        coords = self.get_cells_coords()
+        kept = [
+            coords[index]
+            for index, axis in enumerate(_axes)
+            if axis not in directions
+        ]
+        if kept:
+            # coordinates are rounded to group cells with the same coordinates
+            rounded = []
+            for coord in kept:
+                extent = np.ptp(coord) or 1.0
+                rounded.append(np.round(coord / extent, decimals))
+            _, index_first, inverse = np.unique(
+                np.stack(rounded, axis=1),
+                axis=0,
+                return_index=True,
+                return_inverse=True,
+            )
+            inverse = inverse.ravel()
+            coords_groups = [coord[index_first] for coord in kept]
+        else:
+            inverse = np.zeros(coords[0].size, dtype=np.intp)
+            coords_groups = [np.empty(1)]
+
+        if weights is None:
+            weights_cells = None
+        elif weights == "volume":
+            weights_cells = self.get_cells_volumes()
+        else:
+            raise ValueError(f"Unsupported {weights = }")
+
+        grouping = self._groupings[key] = _Grouping(
+            inverse, coords_groups, weights_cells
+        )
+        return grouping
+
+    def _get_paths_cells_centres(self):
         path_c = self.sim.path_run / "0/C"
+        if resolve_path(path_c).exists():
+            return [path_c]
+        return self._get_paths_polymesh()
 
-        if not path_c.exists():
-            path_polymesh = self.sim.path_run / "constant/polyMesh/points"
+    def _get_block_shape(self):
+        """Shape ``(nz, ny, nx)`` given by the parameters of blockMeshDict"""
+        try:
+            params = self.sim.params.block_mesh_dict
+            return (int(params.nz), int(params.ny), int(params.nx))
+        except AttributeError:
+            return None
 
-            if not path_polymesh.exists():
-                self.sim.make.exec("polymesh", stdout=PIPE)
+    def _compute_grid_indices(self):
+        x, y, z = self.get_cells_coords()
+        nb_cells = x.size
 
-            if not path_polymesh.exists():
-                raise RuntimeError(f"{path_polymesh} does not exists")
+        shape = self._get_block_shape()
+        if shape is not None and np.prod(shape) == nb_cells:
+            # cells ordered as by blockMesh for one block (x fastest)
+            x_3d, y_3d, z_3d = (coord.reshape(shape) for coord in (x, y, z))
+            if (
+                _is_constant_along(x_3d, (0, 1))
+                and _is_constant_along(y_3d, (0, 2))
+                and _is_constant_along(z_3d, (1, 2))
+                and np.all(np.diff(x_3d[0, 0]) > 0)
+                and np.all(np.diff(y_3d[0, :, 0]) > 0)
+                and np.all(np.diff(z_3d[:, 0, 0]) > 0)
+            ):
+                return np.arange(nb_cells).reshape(shape)
+
+        indices_axes = []
+        for coord in (z, y, x):
+            extent = np.ptp(coord) or 1.0
+            _, inverse = np.unique(
+                np.round(coord / extent, 8), return_inverse=True
+            )
+            indices_axes.append(inverse.ravel())
+        shape = tuple(int(indices.max()) + 1 for indices in indices_axes)
+        if np.prod(shape) != nb_cells:
+            raise ValueError("The mesh is not a structured rectilinear mesh")
+        grid_indices = np.full(shape, -1)
+        grid_indices[tuple(indices_axes)] = np.arange(nb_cells)
+        if np.any(grid_indices < 0):
+            raise ValueError("The mesh is not a structured rectilinear mesh")
+        return grid_indices
+
+    def get_grid_indices(self):
+        """Get the indices of the cells of a structured mesh
+
+        Returns an array of shape ``(nz, ny, nx)`` containing the index of the
+        cell at each position of the grid (C order, x fastest). A
+        ``ValueError`` is raised if the mesh is not structured and
+        rectilinear. The array is computed once per mesh and saved in
+        ``.data_fluidsim/mesh``.
+
+        """
+        self._check_mesh_key()
+        if self._grid is None:
+            grid_indices = geometry_cache.get(
+                "grid_indices",
+                self._get_paths_cells_centres(),
+                self._compute_grid_indices,
+                path_dir=self.path_cache,
+            )
+            is_identity = np.array_equal(
+                grid_indices.ravel(), np.arange(grid_indices.size)
+            )
+            self._grid = (grid_indices, is_identity)
+        return self._grid[0]
 
-            path_postProcess = shutil.which("postProcess")
+    def as_grid(self, values):
+        """Get values at the cells as a structured array
 
-            if path_postProcess is None:
-                raise RuntimeError("OpenFOAM not available")
+        The result has the shape ``(nz, ny, nx[, ncomp])``. It is a view (no
+        copy) if the cells are already in the order of the grid (for example
+        for a mesh produced by blockMesh with one block).
 
-            run(
-                ["postProcess", "-func", "writeCellCentres"],
-                cwd=self.sim.path_run,
-                stdout=PIPE,
+        """
+        values = np.asarray(_as_array(values))
+        grid_indices = self.get_grid_indices()
+        _, is_identity = self._grid
+        shape = grid_indices.shape
+        if values.shape[0] != grid_indices.size:
+            raise ValueError(
+                f"{values.shape[0] = } != number of cells ({grid_indices.size})"
             )
+        if is_identity:
+            return values.reshape(shape + values.shape[1:])
+        return values[grid_indices]
+
+    def get_reduced_coords(self, directions, decimals=8):
+        """Coordinates of the groups of cells used by :meth:`average_over`
+
+        Returns one array per direction not in ``directions`` (only an array
+        if there is only one such direction).
+
+        """
+        directions = _check_directions(directions)
+        coords = self._get_grouping(directions, None, decimals).coords
+        if len(coords) == 1:
+            return coords[0]
+        return tuple(coords)
+
+    def average_over(self, values, directions, weights=None, decimals=8):
+        """Average over homogeneous directions
+
+        Parameters
+        ----------
+
+        values : array or field object
+            Values at the cells (first axis).
+        directions : str
+            Directions of the average (for example ``"xz"``).
+        weights : None or "volume"
+            Weights of the average (``"volume"``: cell volumes, see
+            :meth:`get_cells_volumes`).
+        decimals : int
+            The coordinates (divided by the extent of the mesh) are rounded to
+            this number of decimals to group the cells.
+
+        The coordinates of the groups are given by :meth:`get_reduced_coords`.
+
+        """
+        directions = _check_directions(directions)
+        grouping = self._get_grouping(directions, weights, decimals)
+        return grouping.average(_as_array(values))
+
+    def integrate(self, values, directions="xyz", decimals=8):
+        """Integrate over some directions
+
+        For ``directions="xyz"``, the volume integral is returned. Otherwise,
+        the integral over the homogeneous directions is computed as the volume
+        weighted average multiplied by the extent of the mesh along these
+        directions (computed from ``constant/polyMesh/points``), which is exact
+        for meshes extruded along these directions.
+
+        """
+        directions = _check_directions(directions)
+        grouping = self._get_grouping(directions, "volume", decimals)
+        values = _as_array(values)
+        if directions == _axes:
+            return grouping.sum(values)[0]
+        path_points = self.sim.path_run / "constant/polyMesh/points"
+        points = get_points_coords(resolve_path(path_points))
+        measure = 1.0
+        for index, axis in enumerate(_axes):
+            if axis in directions:
+                measure *= np.ptp(points[index])
+        return measure * grouping.average(values)
+
+
+def _is_constant_along(arr, axis, rtol=1e-8):
+    extent = np.ptp(arr) or 1.0
+    return np.all(np.ptp(arr, axis=axis) <= rtol * extent)
+
 
-        field = VolVectorField.from_path(path_c, skip_boundary_field=True)
-        return field.get_components()
+def _as_array(values):
+    if hasattr(values, "get_array"):
+        return values.get_array()
+    return values
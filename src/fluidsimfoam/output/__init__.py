@@ -3,9 +3,16 @@
 .. autosummary::
    :toctree:
 
+   archive
    base
    fields
    log
+   log_parser
+   reconstruct
+   sampling
+   statistics
+   time_index
+   time_series
    dataframe_from_paths
 
 """
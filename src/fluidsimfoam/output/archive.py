@@ -0,0 +1,324 @@
+"""Export a case to a HDF5 archive and read it
+
+The archive (one HDF5 file, written with h5py) contains:
+
+- ``/mesh``: cell centres (if ``0/C`` exists), points and boundary patches,
+- ``/times``: the saved times (shared by all fields),
+- ``/fields/<name>``: dataset ``values`` (shape ``(ntimes, ncells[, ncomp])``,
+  chunked by time and compressed, NaN where the field is not available),
+- attributes ``params_simul.xml`` and ``info_solver.xml`` (xml text),
+- ``/log``: arrays extracted from the log file.
+
+h5py is an optional dependency (``pip install h5py``).
+
+"""
+
+from numbers import Number
+from pathlib import Path
+
+import numpy as np
+
+from fluidsimfoam.foam_input_files.ast import DimensionSet, NonuniformList
+from fluidsimfoam.foam_input_files.fields import (
+    classes,
+    read_field_file,
+    resolve_path,
+)
+from fluidsimfoam.foam_input_files.polymesh import (
+    PolyMesh,
+    read_boundary_file,
+    read_list_file,
+)
+from fluidsimfoam.log import logger
+
+
+def _import_h5py():
+    try:
+        import h5py
+    except ImportError as error:
+        raise ImportError(
+            "h5py is needed to export or read archives " "(`pip install h5py`)."
+        ) from error
+    return h5py
+
+
+def _export_mesh(group, path_run):
+    path_mesh = path_run / "constant/polyMesh"
+    path_c = resolve_path(path_run / "0/C")
+    if path_c.exists():
+        cell_centres = read_field_file(path_c).get_array()
+    elif all(
+        resolve_path(path_mesh / name).exists()
+        for name in ("points", "faces", "owner", "neighbour")
+    ):
+        # computed from the polyMesh files
+        cell_centres = PolyMesh(path_mesh).cell_centres
+    else:
+        cell_centres = None
+    if cell_centres is not None:
+        group.create_dataset(
+            "cell_centres", data=cell_centres, compression="gzip"
+        )
+    path_points = resolve_path(path_mesh / "points")
+    if path_points.exists():
+        group.create_dataset(
+            "points",
+            data=read_list_file(path_points, "vector"),
+            compression="gzip",
+        )
+    path_boundary = resolve_path(path_mesh / "boundary")
+    if path_boundary.exists():
+        group_patches = group.create_group("patches")
+        for name, patch in read_boundary_file(path_boundary).items():
+            group_patches.create_group(name).attrs.update(patch)
+
+
+def _get_nb_cells(path_run):
+    """Get the number of cells from the mesh (None if not available)"""
+    path_mesh = path_run / "constant/polyMesh"
+    if resolve_path(path_mesh / "owner").exists():
+        return PolyMesh(path_mesh).nb_cells
+    path_c = resolve_path(path_run / "0/C")
+    if path_c.exists():
+        return read_field_file(path_c).get_array().shape[0]
+    return None
+
+
+def _export_field(group, fields, name, times, nb_cells=None):
+    """Write the values of a field, time after time (bounded memory)
+
+    The dataset ``values`` has one row per time (NaN where the field is not
+    available). Returns the boolean array of the written rows (None if the
+    field is not exported).
+
+    """
+    dataset = None
+    saved = np.zeros(len(times), dtype=bool)
+    # uniform values read while the shape is not known
+    pending = []
+    for index, time in enumerate(times):
+        try:
+            field = fields._read_field_time(name, time)
+        except (FileNotFoundError, ValueError):
+            continue
+        arr = field.get_array()
+        if arr.dtype.hasobject:
+            # codeStream
+            continue
+        if dataset is None:
+            if isinstance(field.tree["internalField"], NonuniformList):
+                shape = arr.shape
+            elif nb_cells is not None:
+                shape = (nb_cells,) + arr.shape
+            else:
+                pending.append((index, arr))
+                continue
+            group_field = group.create_group(name)
+            group_field.attrs["class"] = field.tree.info["class"]
+            group_field.attrs["dimensions"] = list(field.tree["dimensions"])
+            dataset = group_field.create_dataset(
+                "values",
+                shape=(len(times),) + shape,
+                maxshape=(None,) + shape,
+                chunks=(1,) + shape,
+                dtype=float,
+                fillvalue=np.nan,
+                compression="gzip",
+            )
+            pending.append((index, arr))
+        else:
+            pending = [(index, arr)]
+        for index_pending, arr_pending in pending:
+            try:
+                values = np.broadcast_to(arr_pending, dataset.shape[1:])
+            except ValueError:
+                logger.warning(
+                    f"Field {name} at time {times[index_pending]} not "
+                    f"exported (shape {arr_pending.shape})"
+                )
+                continue
+            dataset[index_pending] = values
+            saved[index_pending] = True
+        pending = []
+    if dataset is None:
+        return None
+    return saved
+
+
+def _keep_rows(dataset, kept):
+    """Remove the rows of a dataset, row after row (bounded memory)"""
+    indices = np.flatnonzero(kept)
+    for index_new, index_old in enumerate(indices):
+        if index_new != index_old:
+            dataset[index_new] = dataset[index_old]
+    dataset.resize(indices.size, axis=0)
+
+
+def _export_log(group, log):
+    try:
+        data = log._load_times()
+    except (AttributeError, IndexError, RuntimeError, TypeError, ValueError):
+        return
+    for key, value in data.items():
+        group.create_dataset(key, data=value)
+
+
+def export_archive(output, path=None, names=None):
+    """Export a case to a HDF5 archive
+
+    Parameters
+    ----------
+
+    output :
+        The ``sim.output`` object.
+    path : str or Path
+        Path of the archive (default ``path_run/<name of path_run>.h5``).
+    names : sequence of str
+        Names of the fields (default ``output.name_variables``).
+
+    """
+    h5py = _import_h5py()
+    path_run = output.path_run
+    if path is None:
+        path = path_run / (path_run.name + ".h5")
+    path = Path(path)
+    if names is None:
+        names = output.name_variables
+
+    fields = output.fields
+    times = fields.get_saved_times()
+
+    with h5py.File(path, "w") as file:
+        file.attrs["path_run"] = str(path_run)
+        _export_mesh(file.create_group("mesh"), path_run)
+        nb_cells = _get_nb_cells(path_run)
+        group_fields = file.create_group("fields")
+        saved_fields = {}
+        for name in names:
+            saved = _export_field(group_fields, fields, name, times, nb_cells)
+            if saved is None:
+                logger.warning(f"Field {name} not exported")
+            else:
+                saved_fields[name] = saved
+        # the times shared by all fields: the times at which at least one
+        # field has been written
+        kept = np.zeros(len(times), dtype=bool)
+        for saved in saved_fields.values():
+            kept |= saved
+        if not kept.all():
+            for name in saved_fields:
+                _keep_rows(group_fields[name]["values"], kept)
+        file.create_dataset("times", data=np.array(times, dtype=float)[kept])
+        for file_name in ("params_simul.xml", "info_solver.xml"):
+            for path_xml in (
+                path_run / file_name,
+                path_run / ".data_fluidsim" / file_name,
+            ):
+                if path_xml.exists():
+                    file.attrs[file_name] = path_xml.read_text()
+                    break
+        _export_log(file.create_group("log"), output.log)
+    return path
+
+
+def _select_indices(times, time_approx="last", index=None, tmin=None, tmax=None):
+    if times.size == 0:
+        raise ValueError("No saved times in the archive")
+    if tmin is not None or tmax is not None:
+        mask = np.ones(times.size, dtype=bool)
+        if tmin is not None:
+            mask &= times >= tmin
+        if tmax is not None:
+            mask &= times <= tmax
+        return np.flatnonzero(mask).tolist()
+    if index is not None:
+        return [range(times.size)[index]]
+    if isinstance(time_approx, str) and time_approx == "last":
+        return [times.size - 1]
+    if isinstance(time_approx, Number):
+        return [int(np.abs(times - time_approx).argmin())]
+    raise ValueError(f"Unsupported {time_approx = }")
+
+
+class ArchiveReader:
+    """Read a HDF5 archive produced by :func:`export_archive`
+
+    The file is opened only during the calls of the methods.
+
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._h5py = _import_h5py()
+
+    def _open(self):
+        return self._h5py.File(self.path, "r")
+
+    def get_field_names(self):
+        with self._open() as file:
+            return list(file["fields"])
+
+    def get_saved_times(self):
+        """Get the saved times (shared by all fields)"""
+        with self._open() as file:
+            return file["times"][...].tolist()
+
+    def get_time_series(self, name, times=None, tmin=None, tmax=None):
+        """Get the times and the values of a field"""
+        with self._open() as file:
+            group = file["fields"][name]
+            times_saved = file["times"][...]
+            if times is not None:
+                indices = [
+                    _select_indices(times_saved, time)[0] for time in times
+                ]
+            elif tmin is None and tmax is None:
+                indices = list(range(times_saved.size))
+            else:
+                indices = _select_indices(times_saved, tmin=tmin, tmax=tmax)
+            # h5py needs increasing indices without duplicates
+            indices_unique, inverse = np.unique(indices, return_inverse=True)
+            values = group["values"][indices_unique.tolist()]
+            return times_saved[indices], values[inverse]
+
+    def read_field(
+        self, name, time_approx="last", index=None, tmin=None, tmax=None
+    ):
+        """Read a field (same arguments as ``sim.output.fields.read_field``)"""
+        with self._open() as file:
+            group = file["fields"][name]
+            times = file["times"][...]
+            indices = _select_indices(times, time_approx, index, tmin, tmax)
+            cls = classes[group.attrs["class"]]
+            dimension = DimensionSet([int(n) for n in group.attrs["dimensions"]])
+            fields = []
+            for idx in indices:
+                field = cls(name, dimension)
+                field.set_values(group["values"][idx])
+                field.time = float(times[idx])
+                fields.append(field)
+
+        if tmin is not None or tmax is not None:
+            return fields
+        return fields[0]
+
+    def get_mesh_array(self, key):
+        """Get a mesh array (``"cell_centres"`` or ``"points"``)"""
+        with self._open() as file:
+            return file["mesh"][key][...]
+
+    def get_patches(self):
+        """Get a dict ``{patch_name: dict}`` (as in ``polyMesh/boundary``)"""
+        with self._open() as file:
+            return {
+                name: dict(group.attrs)
+                for name, group in file["mesh/patches"].items()
+            }
+
+    def get_log_data(self):
+        with self._open() as file:
+            return {key: dataset[...] for key, dataset in file["log"].items()}
+
+    def get_params_xml(self):
+        with self._open() as file:
+            return file.attrs["params_simul.xml"]
@@ -95,6 +95,22 @@ class Output(OutputCore):
     @classmethod
     def _set_info_solver_classes(cls, classes):
         """Set the classes for info_solver.classes.Output"""
+        classes._set_child(
+            "TimeIndex",
+            dict(
+                module_name="fluidsimfoam.output.time_index",
+                class_name="TimeIndex",
+            ),
+        )
+
+        classes._set_child(
+            "Statistics",
+            dict(
+                module_name="fluidsimfoam.output.statistics",
+                class_name="Statistics",
+            ),
+        )
+
         classes._set_child(
             "Log",
             dict(
@@ -312,5 +328,29 @@ class Output(OutputCore):
             doc="""TODO""",
         )
 
+    def export_archive(self, path=None, names=None):
+        """Export the case (mesh, fields, parameters, log) to a HDF5 file
+
+        See :func:`fluidsimfoam.output.archive.export_archive`.
+
+        """
+        from fluidsimfoam.output.archive import export_archive
+
+        return export_archive(self, path=path, names=names)
+
     def _compute_mean_values(self, tmin, tmax):
-        return {}
+        """Statistics used by ``get_dataframe_from_paths``
+
+        See :meth:`fluidsimfoam.output.statistics.Statistics.get_mean_values`.
+        The spatial averages are weighted by the cell volumes if they are
+        available (file ``0/V`` or polyMesh files). An empty dict is returned
+        for cases without saved times.
+
+        """
+        if not self.fields.get_saved_times():
+            return {}
+        try:
+            weights = self.sim.oper.get_cells_volumes()
+        except ValueError:
+            weights = None
+        return self.statistics.get_mean_values(tmin, tmax, weights=weights)
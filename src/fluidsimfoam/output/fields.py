@@ -1,7 +1,9 @@
 """Class for the ``sim.output.fields`` object"""
 
 import math
+import re
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from numbers import Number
 from subprocess import PIPE, run
 
@@ -15,9 +17,16 @@ except ImportError:
 
 
 from fluidsimfoam.foam_input_files import read_field_file
+from fluidsimfoam.foam_input_files.ast import NonuniformList
+from fluidsimfoam.foam_input_files.fields import resolve_path
+from fluidsimfoam.output.reconstruct import Reconstructor
+from fluidsimfoam.output.sampling import Sampler, interpolate
+from fluidsimfoam.output.time_series import TimeSeriesStore
 
 components = {0: "x", 1: "y", 2: "z", None: ""}
 cam_positions = {"x": "yz", "y": "xz", "z": "xy"}
+# maximum size of the data read before appending to a time series store
+_max_nbytes_batch = 2**27
 
 
 def check_pyvista_importable():
@@ -33,10 +42,6 @@ def check_pyvista_importable():
         return True
 
 
-def is_time_name(name):
-    return all(c.isdigit() or c == "." for c in name)
-
-
 def find_nearest(arr, value):
     idx = np.searchsorted(arr, value, side="left")
     if idx > 0 and (
@@ -99,58 +104,550 @@ class Fields:
     def __init__(self, output):
         self.output = output
         self.sim = output.sim
+        self._reconstructor = None
+        self._archive = None
+        self._sampler = None
+
+    def use_archive(self, path):
+        """Read the fields from a HDF5 archive (``None`` to read the case)
+
+        See :func:`fluidsimfoam.output.archive.export_archive`. Only
+        :meth:`get_saved_times`, :meth:`read_field` and :meth:`get_time_series`
+        use the archive.
+
+        """
+        if path is None:
+            self._archive = None
+        else:
+            from fluidsimfoam.output.archive import ArchiveReader
+
+            self._archive = ArchiveReader(path)
 
     def get_saved_times(self):
+        if self._archive is not None:
+            return self._archive.get_saved_times()
         if self.sim.params.parallel.nsubdoms > 1:
-            str_glob = "processor0/*"
+            dirname = "processor0"
         else:
-            str_glob = "*"
+            dirname = None
+        return self.output.time_index.get_times(dirname).tolist()
 
-        return sorted(
-            float(path.name)
-            for path in self.output.path_run.glob(str_glob)
-            if is_time_name(path.name)
-        )
+    def _get_dirname_saved_times(self):
+        if self.sim.params.parallel.nsubdoms > 1:
+            return "processor0"
+        return None
+
+    def select_times(
+        self, time_approx="last", index=None, tmin=None, tmax=None, dirname=None
+    ):
+        """Select saved times
+
+        Parameters
+        ----------
+
+        time_approx : "last" or float
+            The nearest saved time is selected.
+        index : int
+            Index of the saved time (negative values are supported).
+        tmin, tmax : float
+            Range of times (all saved times ``tmin <= t <= tmax``).
+
+        Returns a list of times (floats equal to the times of the directories).
+
+        """
+        times = self.output.time_index.get_times(dirname)
+        if times.size == 0:
+            raise ValueError(f"No saved times in {self.output.path_run}")
+        if tmin is not None or tmax is not None:
+            if index is not None:
+                raise ValueError("index cannot be used with tmin or tmax")
+            mask = np.ones(times.size, dtype=bool)
+            if tmin is not None:
+                mask &= times >= tmin
+            if tmax is not None:
+                mask &= times <= tmax
+            return times[mask].tolist()
+        if index is not None:
+            return [float(times[index])]
+        if isinstance(time_approx, str) and time_approx == "last":
+            return [float(times[-1])]
+        if isinstance(time_approx, Number):
+            return [float(find_nearest(times, time_approx))]
+        raise ValueError(f"Unsupported {time_approx = }")
+
+    def get_path_dir_time(self, time_approx="last", dirname=None, index=None):
+        """Get the path of a time directory and the corresponding time"""
+        (time,) = self.select_times(time_approx, index=index, dirname=dirname)
+        path_dir = self.output.time_index.get_path(time, dirname)
+        return path_dir, time
+
+    @property
+    def reconstructor(self):
+        """Object used to reconstruct decomposed fields in memory"""
+        if self._reconstructor is None:
+            self._reconstructor = Reconstructor(self.output.path_run)
+        return self._reconstructor
+
+    def _read_field_time(self, name, time, lazy=False, cells=None):
+        """Read a field at a saved time
+
+        For decomposed cases, fields which are not reconstructed on disk are
+        reconstructed in memory (lazy is then ignored).
+
+        """
+        time_index = self.output.time_index
+        if self.sim.params.parallel.nsubdoms > 1:
+            try:
+                path_dir = time_index.get_path(time)
+            except ValueError:
+                path_dir = None
+            if path_dir is None or not resolve_path(path_dir / name).exists():
+                # exact name of the directory written by OpenFOAM
+                time_name = time_index.get_name(time, "processor0")
+                field = self.reconstructor.reconstruct_field(name, time_name)
+                if cells is not None:
+                    field.set_values(field.get_array()[cells])
+                    field.cells = cells
+                field.time = time
+                field.oper = self.sim.oper
+                return field
+
+        path_dir = time_index.get_path(time)
+        field = read_field_file(path_dir / name, lazy=lazy, cells=cells)
+        field.time = time
+        field.oper = self.sim.oper
+        return field
 
-    def get_path_dir_time(self, time_approx="last", dirname=None):
-        if time_approx != "last":
-            raise NotImplementedError
+    def read_field(
+        self,
+        name,
+        time_approx="last",
+        lazy=False,
+        cells=None,
+        index=None,
+        tmin=None,
+        tmax=None,
+    ):
+        """Read a field file
+
+        Parameters
+        ----------
+
+        name : str
+            Name of the field.
+        time_approx : "last" or float
+            The field at the nearest saved time is read.
+        lazy : bool
+            If True, the file is only scanned and the values are decoded when
+            they are accessed (see
+            :class:`fluidsimfoam.foam_input_files.fields.LazyField`).
+        cells : slice or array of indices
+            Read only the values of some cells.
+        index : int
+            Index of the saved time (negative values are supported).
+        tmin, tmax : float
+            Range of times. A list of fields is then returned.
+
+        """
+        if self._archive is not None:
+            result = self._archive.read_field(
+                name, time_approx, index=index, tmin=tmin, tmax=tmax
+            )
+            for field in result if isinstance(result, list) else [result]:
+                field.oper = self.sim.oper
+            return result
+        times = self.select_times(
+            time_approx,
+            index=index,
+            tmin=tmin,
+            tmax=tmax,
+            dirname=self._get_dirname_saved_times(),
+        )
+        fields = [
+            self._read_field_time(name, time, lazy=lazy, cells=cells)
+            for time in times
+        ]
+
+        if tmin is not None or tmax is not None:
+            return fields
+        return fields[0]
+
+    def read_patch(self, name, patch, time_approx="last", index=None):
+        """Read the entry of a patch in the boundaryField of a field
+
+        The keys of the boundaryField can be regular expressions (like
+        ``".*"``). For serial cases, the file is only scanned and only the
+        entry of the patch is decoded (see
+        :meth:`fluidsimfoam.foam_input_files.fields.LazyField.get_boundary`).
+        Returns a dict (for example with the keys ``"type"`` and ``"value"``,
+        nonuniform values being
+        :class:`fluidsimfoam.foam_input_files.ast.NonuniformList`).
 
-        if dirname is None:
-            str_glob = "*"
+        """
+        (time,) = self.select_times(
+            time_approx, index=index, dirname=self._get_dirname_saved_times()
+        )
+        field = self._read_field_time(name, time, lazy=True)
+        if hasattr(field, "get_boundary"):
+            boundary_names = field.boundary_names
+            get_entry = field.get_boundary
         else:
-            str_glob = dirname + "/*"
-
-        path_times = sorted(
-            (
-                path
-                for path in self.output.path_run.glob(str_glob)
-                if path.name[0].isdigit()
-            ),
-            key=lambda p: float(p.name),
+            boundary_field = field.tree["boundaryField"]
+            boundary_names = list(boundary_field)
+            get_entry = boundary_field.__getitem__
+
+        if patch in boundary_names:
+            return get_entry(patch)
+        # keys can be regular expressions (the last matching key is used)
+        for key in reversed(boundary_names):
+            if key.startswith('"') and re.fullmatch(key.strip('"'), patch):
+                return get_entry(key)
+        raise ValueError(
+            f"No patch {patch!r} in field {name} (patches: {boundary_names})"
         )
-        path_dir = path_times[-1]
-        last_time = float(path_dir.name)
-        return path_dir, last_time
 
-    def read_field(self, name, time_approx="last"):
-        if time_approx != "last":
-            raise NotImplementedError
+    def read_patch_values(
+        self, name, patch, key="value", time_approx="last", index=None
+    ):
+        """Get the values of a field on the faces of a patch
 
-        path_dir, last_time = self.get_path_dir_time(time_approx)
+        Returns an array of shape ``(nFaces[, ncomp])``. Uniform values are
+        broadcast. If the entry ``key`` does not exist (for example for
+        ``zeroGradient`` patches), the values of the cells adjacent to the
+        faces are returned.
 
-        if self.sim.params.parallel.nsubdoms > 1:
-            _, last_time_proc0 = self.get_path_dir_time(
-                time_approx, dirname="processor0"
+        """
+        entry = self.read_patch(name, patch, time_approx, index)
+        value = entry.get(key)
+        if isinstance(value, NonuniformList):
+            return value.array
+        polymesh = self.sim.oper.get_polymesh()
+        nb_faces = polymesh.patches[patch].nb_faces
+        if value is not None:
+            value = np.array(getattr(value, "value", value), dtype=float)
+            return np.broadcast_to(value, (nb_faces,) + value.shape)
+        cells = polymesh.get_patch_cells(patch)
+        if nb_faces == 0:
+            cells = slice(0, 0)
+        field = self.read_field(name, time_approx, index=index, cells=cells)
+        arr = field.get_array()
+        if not isinstance(field.tree["internalField"], NonuniformList):
+            arr = np.broadcast_to(arr, (nb_faces,) + arr.shape)
+        return arr
+
+    def _get_paths_dir_times(self, dirname=None):
+        """Get a dict {time: path} of the time directories (sorted by time)"""
+        return self.output.time_index.get_paths(dirname)
+
+    def read_fields(self, names, times="last", lazy=False, max_workers=None):
+        """Read several fields (and possibly several times) concurrently
+
+        The time directories are listed only once and the files are read in a
+        thread pool (decoding with Numpy releases the GIL). For decomposed
+        cases, the fields which are not reconstructed on disk are reconstructed
+        in memory.
+
+        Parameters
+        ----------
+
+        names : sequence of str
+            Names of the fields (for example ``["U", "p"]``).
+        times : "last", float or sequence of float
+            Times of the fields (exact times of saved time directories).
+        lazy : bool
+            Return lazy fields (see
+            :class:`fluidsimfoam.foam_input_files.fields.LazyField`).
+        max_workers : int
+            Number of threads.
+
+        Returns
+        -------
+
+        A dict ``{name: field}`` for one time and a dict ``{time: {name:
+        field}}`` for a sequence of times.
+
+        """
+        if isinstance(names, str):
+            names = [names]
+        single_time = isinstance(times, (str, Number))
+        if single_time:
+            times = [times]
+
+        dirname = self._get_dirname_saved_times()
+        times = [
+            self.select_times(dirname=dirname)[0]
+            if time == "last"
+            else float(time)
+            for time in times
+        ]
+        saved_times = self.output.time_index.get_times(dirname)
+        for time in times:
+            if time not in saved_times:
+                raise ValueError(f"No time directory for time {time}")
+
+        def read(time_name):
+            time, name = time_name
+            return self._read_field_time(name, time, lazy=lazy)
+
+        tasks = [(time, name) for time in times for name in names]
+        with ThreadPoolExecutor(max_workers) as executor:
+            fields = list(executor.map(read, tasks))
+
+        result = {time: {} for time in times}
+        for (time, name), field in zip(tasks, fields):
+            result[time][name] = field
+        if single_time:
+            return result[time]
+        return result
+
+    def _get_source_stats(self, name, time):
+        """Get the modification times and sizes of the files of a field"""
+        time_index = self.output.time_index
+        paths = []
+        try:
+            path = resolve_path(time_index.get_path(time) / name)
+        except ValueError:
+            path = None
+        if path is not None and path.exists():
+            paths.append(path)
+        else:
+            time_name = time_index.get_name(time, "processor0")
+            for dirname in time_index.get_processor_dirnames():
+                paths.append(
+                    resolve_path(
+                        self.output.path_run / dirname / time_name / name
+                    )
+                )
+        stats = [path.stat() for path in paths]
+        return [[stat.st_mtime_ns, stat.st_size] for stat in stats]
+
+    def get_time_series(
+        self, name, times=None, tmin=None, tmax=None, max_workers=None
+    ):
+        """Get the values of a field at several times
+
+        The values are cached in a memory mapped ``.npy`` file in the directory
+        ``.data_fluidsim/time_series``. The cache is keyed by the modification
+        times and sizes of the field files, and only the newly saved times are
+        read and appended to the cache.
+
+        Parameters
+        ----------
+
+        name : str
+            Name of the field.
+        times : sequence of float
+            Saved times (default: all saved times, or the times in the range
+            ``[tmin, tmax]``).
+        tmin, tmax : float
+            Range of times.
+        max_workers : int
+            Number of threads used to read the new files.
+
+        Returns
+        -------
+
+        times : np.ndarray
+            The times (sorted).
+        values : np.ndarray
+            Array of shape ``(ntimes, ncells[, ncomp])``. It is a read-only
+            memory mapped array when possible.
+
+        """
+        if self._archive is not None:
+            return self._archive.get_time_series(
+                name, times=times, tmin=tmin, tmax=tmax
             )
-            if last_time_proc0 != last_time:
-                self.reconstruct_par(fields=[name], time=last_time_proc0)
-            path_dir, last_time = self.get_path_dir_time(time_approx)
-            assert last_time == last_time_proc0
+        dirname = self._get_dirname_saved_times()
+        if times is None:
+            if tmin is None and tmax is None:
+                times = self.output.time_index.get_times(dirname).tolist()
+            else:
+                times = self.select_times(tmin=tmin, tmax=tmax, dirname=dirname)
+        times = sorted(float(time) for time in times)
+        if not times:
+            raise ValueError("No times selected")
 
-        field = read_field_file(path_dir / name)
-        field.time = float(path_dir.name)
-        return field
+        store = TimeSeriesStore(
+            self.output.path_run / ".data_fluidsim/time_series", name
+        )
+        rows = store.get_rows()
+        stats = {time: self._get_source_stats(name, time) for time in times}
+        if any(
+            time in rows and rows[time][1]["stats"] != stats[time]
+            for time in times
+        ):
+            # at least one file has been modified
+            store.reset()
+            rows = {}
+
+        new_times = [time for time in times if time not in rows]
+        if new_times:
+            self._append_time_series(
+                store, name, new_times, stats, dirname, max_workers
+            )
+            rows = store.get_rows()
+
+        data = store.get_data()
+        indices = [rows[time][0] for time in times]
+        start = indices[0]
+        if indices == list(range(start, start + len(indices))):
+            values = data[start : start + len(indices)]
+        else:
+            values = data[indices]
+        return np.array(times), values
+
+    def _append_time_series(
+        self, store, name, times, stats, dirname, max_workers
+    ):
+        """Read fields and append them to the store by bounded batches"""
+
+        def read(time):
+            field = self._read_field_time(name, time)
+            arr = field.get_array()
+            if arr.dtype.hasobject:
+                raise ValueError(
+                    f"No numerical values for field {name} at time {time} "
+                    "(codeStream?)"
+                )
+            return arr, isinstance(field.tree["internalField"], NonuniformList)
+
+        def flush(pending, batch_size):
+            # uniform fields are broadcasted
+            for index in range(0, len(pending), batch_size):
+                batch = pending[index : index + batch_size]
+                entries = [
+                    {
+                        "time": time,
+                        "time_name": self.output.time_index.get_name(
+                            time, dirname
+                        ),
+                        "stats": stats[time],
+                    }
+                    for time, _ in batch
+                ]
+                store.append(
+                    entries,
+                    np.stack([np.broadcast_to(arr, shape) for _, arr in batch]),
+                )
+
+        shape = None if store.shape is None else store.shape[1:]
+        # values read but not yet appended (only uniform values are kept
+        # while the shape is unknown)
+        pending = []
+        batch_size = 1
+        with ThreadPoolExecutor(max_workers) as executor:
+            index = 0
+            while index < len(times):
+                batch = times[index : index + batch_size]
+                index += len(batch)
+                for time, (arr, nonuniform) in zip(
+                    batch, executor.map(read, batch)
+                ):
+                    if nonuniform and shape is None:
+                        shape = arr.shape
+                    pending.append((time, arr))
+                if shape is None:
+                    continue
+                nbytes_time = max(1, int(np.prod(shape)) * 8)
+                batch_size = max(1, _max_nbytes_batch // nbytes_time)
+                flush(pending, batch_size)
+                pending = []
+        if pending:
+            raise ValueError(f"Field {name} is uniform at all saved times")
+
+    def get_sampler(self):
+        """Get the KD-tree over the cell centres (cached per mesh)
+
+        See :class:`fluidsimfoam.output.sampling.Sampler` (needs scipy).
+
+        """
+        oper = self.sim.oper
+        # the mesh can be created by get_cells_coords
+        coords = oper.get_cells_coords()
+        stats = [
+            resolve_path(path).stat() for path in oper._get_paths_cells_centres()
+        ]
+        key = [[stat.st_mtime_ns, stat.st_size] for stat in stats]
+        if self._sampler is None or self._sampler[0] != key:
+            self._sampler = (key, Sampler(coords))
+        return self._sampler[1]
+
+    def probe(self, points, name, times="last", tmin=None, tmax=None, k=1):
+        """Get the values of a field at points
+
+        Parameters
+        ----------
+
+        points : array_like
+            Coordinates of the points (shape ``(npoints, 3)``).
+        name : str
+            Name of the field.
+        times : "last", float or sequence of float
+            For a sequence, the values are taken from the time series (see
+            :meth:`get_time_series`).
+        tmin, tmax : float
+            Range of times (instead of ``times``).
+        k : int
+            Number of nearest cells used (inverse distance weighting). With
+            ``k=1``, the values of the nearest cells are returned.
+
+        Returns
+        -------
+
+        For one time, an array of shape ``(npoints[, ncomp])``. For several
+        times, the times and an array of shape ``(ntimes, npoints[, ncomp])``.
+
+        """
+        indices, weights = self.get_sampler().query(points, k=k)
+        if tmin is None and tmax is None and isinstance(times, (str, Number)):
+            cells, inverse = np.unique(indices, return_inverse=True)
+            inverse = inverse.reshape(indices.shape)
+            if self._archive is None:
+                field = self.read_field(name, times, cells=cells)
+                arr = field.get_array()
+            else:
+                field = self.read_field(name, times)
+                arr = field.get_array()[cells]
+            if arr.dtype.hasobject:
+                raise ValueError(f"Field {name} cannot be probed (codeStream?)")
+            if not isinstance(field.tree["internalField"], NonuniformList):
+                arr = np.broadcast_to(arr, (cells.size,) + arr.shape)
+            return interpolate(arr, inverse, weights)
+
+        if isinstance(times, str):
+            times = None
+        times, values = self.get_time_series(name, times, tmin, tmax)
+        return times, interpolate(values, indices, weights, axis=1)
+
+    def sample_line(
+        self,
+        point0,
+        point1,
+        nb_points,
+        name,
+        times="last",
+        tmin=None,
+        tmax=None,
+        k=1,
+    ):
+        """Sample a field along a line
+
+        Returns the coordinates of the points (shape ``(nb_points, 3)``) and
+        the result of :meth:`probe`.
+
+        Examples
+        --------
+
+        >>> points, values = sim.output.fields.sample_line(
+        ...     [0, 0, 0], [0, 1, 0], 100, "U")
+
+        """
+        coefs = np.linspace(0.0, 1.0, nb_points)[:, np.newaxis]
+        point0 = np.asarray(point0, dtype=float)
+        point1 = np.asarray(point1, dtype=float)
+        points = point0 + coefs * (point1 - point0)
+        return points, self.probe(points, name, times, tmin, tmax, k)
 
     def reconstruct_par(self, fields=None, latest_time=None, time=None):
         path_command = shutil.which("reconstructPar")
@@ -1,11 +1,10 @@
 """Class for the ``sim.output.log`` object"""
 
-import re
-
 import matplotlib.pyplot as plt
 import numpy as np
 
 from fluidsim_core.output.remaining_clock_time import RemainingClockTime
+from fluidsimfoam.output.log_parser import LogParser
 
 
 def get_log_tail(path_file, nbytes=1000):
@@ -34,6 +33,7 @@ class Log(RemainingClockTime):
     def __init__(self, output):
         self.output = output
         self._path_file = None
+        self._parser = None
 
     def _load_times(self):
         """Load remaining time data.
@@ -45,26 +45,22 @@ class Log(RemainingClockTime):
         - full_clock_time
 
         """
-        text = self.text
+        parser = self.parser
+        if parser is None:
+            raise RuntimeError("No log file found")
 
-        match = re.search(r"start_time = ([\d\.]+)\n", text)
-        if match is not None:
-            equation_time_start = float(match.groups()[0])
+        if parser.start_time is not None:
+            equation_time_start = parser.start_time
         else:
             equation_time_start = 0.0
 
-        match = re.search(r"end_time = ([\d\.]+)\n", text)
-        if match is not None:
-            eq_time_end = float(match.groups()[0])
+        if parser.end_time is not None:
+            eq_time_end = parser.end_time
         else:
             raise RuntimeError
 
-        eq_times = re.findall(r"\nTime = ([\d\.]+e?[-\d]*)", text)
-        clock_times = re.findall(r"\nExecutionTime = ([\d\.]+)", text)
-        eq_times = eq_times[: len(clock_times)]
-
-        eq_times = np.array([float(word) for word in eq_times])
-        clock_times = np.array([float(word) for word in clock_times])
+        clock_times = parser.execution_times
+        eq_times = parser.times[: len(clock_times)]
 
         estimation_clock_time_per_time_step = clock_times[-1] / len(clock_times)
 
@@ -129,6 +125,40 @@ class Log(RemainingClockTime):
     def path_file(self, path_log_file):
         self._path_file = path_log_file
 
+    @property
+    def parser(self):
+        """Incremental parser of the log file
+
+        The bytes appended to the file since the last access are parsed (see
+        :class:`fluidsimfoam.output.log_parser.LogParser`). The extracted data
+        are saved next to the log file (``<log file name>.npz``) and loaded
+        when the simulation is loaded again.
+
+        """
+        path_file = self.path_file
+        if path_file is None:
+            return None
+        if self._parser is None or self._parser.path != path_file:
+            self._parser = LogParser(path_file)
+        self._parser.update()
+        return self._parser
+
+    def get_time_steps(self):
+        """Get the data of the time steps extracted from the log file
+
+        See :meth:`fluidsimfoam.output.log_parser.LogParser.get_time_steps`.
+
+        """
+        return self.parser.get_time_steps()
+
+    def get_dataframe(self):
+        """Get the data of the time steps as a :class:`pandas.DataFrame`
+
+        See :meth:`fluidsimfoam.output.log_parser.LogParser.get_time_steps`.
+
+        """
+        return self.parser.get_dataframe()
+
     @property
     def text(self):
         if self.path_file is None:
@@ -167,46 +197,15 @@ class Log(RemainingClockTime):
     def get_last_residual(self, variable_name=None):
         if self.path_file is None:
             return None
-        text = self.get_log_tail(5000)
-
         variable_name = self._choose_variable_name(variable_name)
-        matches = list(
-            re.finditer(
-                r"\nTime = (?P<time>[\d\.]+e?-?[\d]*)"
-                rf"[\s\S]+?Solving for {variable_name}, "
-                r"Initial residual = (?P<initial>[\d\.]+e?-?[\d]*)",
-                text,
-            )
-        )
-
-        if not matches:
-            raise ValueError(f"No match found for {variable_name}, text=\n{text}")
-
-        match = matches[-1]
-        data = match.groupdict()
-        time = float(data["time"])
-        residual = float(data["initial"])
-        return time, residual
+        times, residuals = self.parser.get_first_residuals(variable_name)
+        if times.size == 0:
+            raise ValueError(f"No residual found for {variable_name}")
+        return float(times[-1]), float(residuals[-1])
 
     def plot_residuals(self, variable_name=None, tmin=0.0):
         variable_name = self._choose_variable_name(variable_name)
-        matches = list(
-            re.finditer(
-                r"\nTime = (?P<time>[\d\.]+e?-?[\d]*)"
-                rf"[\s\S]+?Solving for {variable_name}, "
-                r"Initial residual = (?P<initial>[\d\.]+e?-?[\d]*)",
-                self.text,
-            )
-        )
-
-        times = np.empty(len(matches))
-        residuals = np.empty_like(times)
-
-        for index, match in enumerate(matches):
-            data = match.groupdict()
-
-            times[index] = data["time"]
-            residuals[index] = data["initial"]
+        times, residuals = self.parser.get_first_residuals(variable_name)
 
         fig, ax = plt.subplots()
 
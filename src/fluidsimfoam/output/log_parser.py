@@ -0,0 +1,467 @@
+"""Incremental parser of the log files of the simulations
+
+The parser remembers the byte offset of the end of the last complete line
+parsed, so that each call of :meth:`LogParser.update` only reads and parses
+the bytes appended to the file since the previous call. The data are stored in
+growable Numpy arrays (columns), so that repeated queries during a long
+simulation cost a time proportional to the new output.
+
+The following lines are extracted (each row contains the index of the time
+step, see :attr:`LogParser.times`):
+
+- ``Time = ...`` (table ``time_steps``),
+- ``deltaT = ...`` (table ``delta_t``),
+- ``Courant Number mean: ... max: ...`` (table ``courant``),
+- ``ExecutionTime = ... s  ClockTime = ... s`` (table ``execution``),
+- ``time step continuity errors : sum local = ..., global = ..., cumulative =
+  ...`` (table ``continuity``),
+- ``Solving for X, Initial residual = ..., Final residual = ..., No Iterations
+  ...`` (one table per variable, ``solve_X``).
+
+The data can be saved in a compact ``.npz`` file (see :meth:`LogParser.save`)
+which is loaded when a parser is created for the same log file, so that only
+the end of the log file has to be parsed.
+
+"""
+
+import os
+import re
+from pathlib import Path
+
+import numpy as np
+
+_number = rb"[-+]?[\d\.]+(?:[eE][-+]?\d+)?"
+
+_pattern_log = re.compile(
+    rb"^(?:"
+    rb"Time = (?P<time>" + _number + rb")"
+    rb"|deltaT = (?P<delta_t>" + _number + rb")"
+    rb"|Courant Number mean: (?P<courant_mean>" + _number + rb")"
+    rb" max: (?P<courant_max>" + _number + rb")"
+    rb"|ExecutionTime = (?P<execution_time>" + _number + rb") s"
+    rb"(?:\s+ClockTime = (?P<clock_time>" + _number + rb"))?"
+    rb"|time step continuity errors : sum local = (?P<sum_local>"
+    + _number
+    + rb"), global = (?P<global_>"
+    + _number
+    + rb"), cumulative = (?P<cumulative>"
+    + _number
+    + rb")"
+    rb"|(?P<key>start_time|end_time) = (?P<value>" + _number + rb")"
+    rb"|[^\n]*?Solving for (?P<variable>\w+), "
+    rb"Initial residual = (?P<initial>" + _number + rb"), "
+    rb"Final residual = (?P<final>" + _number + rb"), "
+    rb"No Iterations (?P<nb_iterations>\d+)"
+    rb"|(?P<end>End)$"
+    rb")",
+    re.MULTILINE,
+)
+
+# names of the columns of the tables (the first column of the tables other
+# than time_steps is the index of the time step)
+_columns_tables = {
+    "time_steps": ("time",),
+    "delta_t": ("index_time", "delta_t"),
+    "courant": ("index_time", "mean", "max"),
+    "execution": ("index_time", "execution_time", "clock_time"),
+    "continuity": ("index_time", "sum_local", "global", "cumulative"),
+}
+_columns_solve = ("index_time", "initial", "final", "nb_iterations")
+_columns_int = ("index_time", "nb_iterations")
+
+_size_head = 4096
+_version_cache = 1
+
+
+class Column:
+    """Growable 1D array (appending values has an amortized constant cost)"""
+
+    def __init__(self, dtype=float):
+        self._data = np.empty(64, dtype=dtype)
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def extend(self, values):
+        values = np.asarray(values, dtype=self._data.dtype)
+        size_new = self.size + values.size
+        if size_new > self._data.size:
+            data = np.empty(max(size_new, 2 * self._data.size), self._data.dtype)
+            data[: self.size] = self._data[: self.size]
+            self._data = data
+        self._data[self.size : size_new] = values
+        self.size = size_new
+
+    @property
+    def array(self):
+        """View of the values (invalidated by the next call of extend)"""
+        return self._data[: self.size]
+
+
+def _create_table(names):
+    return {
+        name: Column(int if name in _columns_int else float) for name in names
+    }
+
+
+def _first_positions(indices):
+    # the indices are sorted
+    return np.flatnonzero(np.diff(indices, prepend=-1))
+
+
+def _last_positions(indices):
+    return np.flatnonzero(np.diff(indices, append=np.iinfo(indices.dtype).max))
+
+
+class LogParser:
+    """Incremental parser of a log file
+
+    Parameters
+    ----------
+
+    path : str or Path
+        Path of the log file.
+    path_cache : str, Path or False
+        Path of the ``.npz`` file where the data are saved (by default
+        ``<log file name>.npz`` in the directory of the log file). If False,
+        the data are not saved.
+    chunk_size : int
+        Maximum number of bytes read and parsed at once.
+
+    When a cache file is used, it is saved by :meth:`update` when the parsed
+    size has doubled since the last save and at the end of the simulation
+    (line ``End``).
+
+    """
+
+    def __init__(self, path, path_cache=None, chunk_size=2**26):
+        self.path = Path(path)
+        if path_cache is None:
+            path_cache = self.path.with_name(self.path.name + ".npz")
+        elif path_cache is not False:
+            path_cache = Path(path_cache)
+        self.path_cache = path_cache
+        self.chunk_size = chunk_size
+        self.reset()
+        if self.path_cache:
+            self._load()
+
+    def reset(self):
+        """Forget the parsed data"""
+        self.offset = 0
+        self._offset_saved = 0
+        self.start_time = None
+        self.end_time = None
+        self.finished = False
+        self._step_open = False
+        self._tables = {
+            name: _create_table(names) for name, names in _columns_tables.items()
+        }
+
+    def update(self):
+        """Parse the complete lines appended since the last call
+
+        Returns the number of bytes parsed. If the file has been truncated, it
+        is parsed again from the beginning.
+
+        """
+        try:
+            size = self.path.stat().st_size
+        except FileNotFoundError:
+            return 0
+        if size < self.offset:
+            self.reset()
+        offset_start = self.offset
+        with open(self.path, "rb") as file:
+            while self.offset < size:
+                file.seek(self.offset)
+                chunk = file.read(min(self.chunk_size, size - self.offset))
+                end = chunk.rfind(b"\n") + 1
+                if end == 0:
+                    if len(chunk) < self.chunk_size:
+                        # incomplete last line
+                        break
+                    # very long line without a newline: skip it
+                    end = len(chunk)
+                else:
+                    self._parse(chunk, end)
+                self.offset += end
+        if (
+            self.path_cache
+            and self.offset > self._offset_saved
+            and (self.finished or self.offset >= 2 * self._offset_saved)
+        ):
+            self.save()
+        return self.offset - offset_start
+
+    def _parse(self, data, end):
+        rows = {name: [] for name in self._tables}
+        index_time = len(self._tables["time_steps"]["time"]) - 1
+        # index of the time step for the lines written before "Time = "
+        # (for example deltaT for solvers with adjustable time step)
+        index_next = index_time if self._step_open else index_time + 1
+        for match in _pattern_log.finditer(data, 0, end):
+            groups = match.groupdict()
+            if groups["time"] is not None:
+                index_time += 1
+                index_next = index_time
+                rows["time_steps"].append((float(groups["time"]),))
+            elif groups["initial"] is not None:
+                if index_time < 0:
+                    # solved before the time loop
+                    continue
+                name = "solve_" + groups["variable"].decode()
+                rows.setdefault(name, []).append(
+                    (
+                        index_time,
+                        float(groups["initial"]),
+                        float(groups["final"]),
+                        int(groups["nb_iterations"]),
+                    )
+                )
+            elif groups["sum_local"] is not None:
+                if index_time < 0:
+                    continue
+                rows["continuity"].append(
+                    (
+                        index_time,
+                        float(groups["sum_local"]),
+                        float(groups["global_"]),
+                        float(groups["cumulative"]),
+                    )
+                )
+            elif groups["courant_mean"] is not None:
+                rows["courant"].append(
+                    (
+                        index_next,
+                        float(groups["courant_mean"]),
+                        float(groups["courant_max"]),
+                    )
+                )
+            elif groups["delta_t"] is not None:
+                rows["delta_t"].append((index_next, float(groups["delta_t"])))
+            elif groups["execution_time"] is not None:
+                clock_time = groups["clock_time"]
+                rows["execution"].append(
+                    (
+                        index_time,
+                        float(groups["execution_time"]),
+                        np.nan if clock_time is None else float(clock_time),
+                    )
+                )
+                index_next = index_time + 1
+            elif groups["key"] == b"start_time":
+                self.start_time = float(groups["value"])
+            elif groups["key"] == b"end_time":
+                self.end_time = float(groups["value"])
+            else:
+                self.finished = True
+        self._step_open = index_next == index_time
+
+        for name, rows_table in rows.items():
+            if not rows_table:
+                continue
+            try:
+                table = self._tables[name]
+            except KeyError:
+                table = self._tables[name] = _create_table(_columns_solve)
+            for column, values in zip(table.values(), zip(*rows_table)):
+                column.extend(values)
+
+    def save(self):
+        """Save the data in the ``.npz`` file"""
+        if not self.path_cache:
+            raise ValueError("No cache file (path_cache is False)")
+        with open(self.path, "rb") as file:
+            head = file.read(min(self.offset, _size_head))
+        arrays = {
+            "version": _version_cache,
+            "offset": self.offset,
+            "head": np.frombuffer(head, dtype=np.uint8),
+            "start_time": np.nan if self.start_time is None else self.start_time,
+            "end_time": np.nan if self.end_time is None else self.end_time,
+            "finished": self.finished,
+            "step_open": self._step_open,
+        }
+        for name_table, table in self._tables.items():
+            for name, column in table.items():
+                arrays[f"{name_table}/{name}"] = column.array
+        path_tmp = self.path_cache.with_name(self.path_cache.name + ".tmp.npz")
+        try:
+            np.savez(path_tmp, **arrays)
+            os.replace(path_tmp, self.path_cache)
+        except OSError:
+            # for example read-only directory
+            return
+        self._offset_saved = self.offset
+
+    def _load(self):
+        try:
+            with np.load(self.path_cache) as data:
+                arrays = dict(data)
+        except (OSError, ValueError):
+            return
+        try:
+            if int(arrays.pop("version")) != _version_cache:
+                return
+            offset = int(arrays.pop("offset"))
+            head = arrays.pop("head").tobytes()
+            with open(self.path, "rb") as file:
+                if file.read(len(head)) != head:
+                    return
+            if self.path.stat().st_size < offset:
+                return
+        except (KeyError, OSError):
+            return
+
+        self.offset = self._offset_saved = offset
+        for key in ("start_time", "end_time"):
+            value = float(arrays.pop(key))
+            setattr(self, key, None if np.isnan(value) else value)
+        self.finished = bool(arrays.pop("finished"))
+        self._step_open = bool(arrays.pop("step_open"))
+        for key, arr in arrays.items():
+            name_table, name = key.split("/")
+            if name_table not in self._tables:
+                self._tables[name_table] = _create_table(_columns_solve)
+            self._tables[name_table][name].extend(arr)
+
+    @property
+    def times(self):
+        """Equation times of the time steps (``Time = ...`` lines)"""
+        return self._tables["time_steps"]["time"].array
+
+    @property
+    def execution_times(self):
+        """Execution times at the end of the time steps"""
+        return self._tables["execution"]["execution_time"].array
+
+    @property
+    def clock_times(self):
+        """Clock times at the end of the time steps"""
+        return self._tables["execution"]["clock_time"].array
+
+    @property
+    def variables(self):
+        """Names of the solved variables (``Solving for ...`` lines)"""
+        return [
+            name.removeprefix("solve_")
+            for name in self._tables
+            if name.startswith("solve_")
+        ]
+
+    def get_table(self, name):
+        """Get a table (dict of arrays)
+
+        ``name`` is ``"time_steps"``, ``"delta_t"``, ``"courant"``,
+        ``"execution"``, ``"continuity"`` or ``"solve_<variable>"``.
+
+        """
+        try:
+            table = self._tables[name]
+        except KeyError:
+            raise ValueError(
+                f"No table {name} (tables: {list(self._tables)})"
+            ) from None
+        return {key: column.array for key, column in table.items()}
+
+    def get_solves(self, variable):
+        """Get the data of all the solves of a variable
+
+        Returns a dict of arrays with the keys ``index_time`` (indices of the
+        time steps, see :attr:`times`), ``initial`` and ``final`` (residuals)
+        and ``nb_iterations``. There can be several solves per time step (for
+        example for PISO correctors).
+
+        """
+        try:
+            table = self._tables["solve_" + variable]
+        except KeyError:
+            raise ValueError(
+                f"No residual for {variable} (variables: {self.variables})"
+            ) from None
+        return {key: column.array for key, column in table.items()}
+
+    def get_residuals(self, variable):
+        """Get the initial residuals of all the solves of a variable
+
+        Returns ``(indices_time, residuals)``, where ``indices_time`` are the
+        indices of the time steps (see :attr:`times`) of the solves.
+
+        """
+        solves = self.get_solves(variable)
+        return solves["index_time"], solves["initial"]
+
+    def get_first_residuals(self, variable):
+        """Get the initial residual of the first solve of each time step
+
+        Returns ``(times, residuals)``.
+
+        """
+        indices, residuals = self.get_residuals(variable)
+        positions = _first_positions(indices)
+        return self.times[indices[positions]], residuals[positions]
+
+    def get_time_steps(self):
+        """Get the data of the time steps (dict of arrays of the same size)
+
+        The keys are ``time``, ``delta_t``, ``courant_mean``, ``courant_max``,
+        ``execution_time``, ``clock_time``, ``continuity_sum_local``,
+        ``continuity_global`` and ``continuity_cumulative`` (last values of
+        the time steps) and, for each variable, ``<variable>_initial`` (first
+        solve of the time step), ``<variable>_final`` (last solve),
+        ``<variable>_nb_iterations`` (sum over the solves) and
+        ``<variable>_nb_solves``. Missing values are NaN.
+
+        """
+        times = self.times
+        nb_steps = times.size
+        result = {"time": times.copy()}
+
+        def gather(indices, values, positions):
+            arr = np.full(nb_steps, np.nan)
+            indices = indices[positions]
+            # lines after the last "Time = " line (next time step)
+            valid = indices < nb_steps
+            arr[indices[valid]] = values[positions][valid]
+            return arr
+
+        for name_table, prefix in (
+            ("delta_t", ""),
+            ("courant", "courant_"),
+            ("execution", ""),
+            ("continuity", "continuity_"),
+        ):
+            table = self.get_table(name_table)
+            indices = table.pop("index_time")
+            positions = _last_positions(indices)
+            for key, values in table.items():
+                result[prefix + key] = gather(indices, values, positions)
+
+        for variable in self.variables:
+            solves = self.get_solves(variable)
+            indices = solves["index_time"]
+            result[f"{variable}_initial"] = gather(
+                indices, solves["initial"], _first_positions(indices)
+            )
+            result[f"{variable}_final"] = gather(
+                indices, solves["final"], _last_positions(indices)
+            )
+            result[f"{variable}_nb_iterations"] = np.bincount(
+                indices, solves["nb_iterations"], minlength=nb_steps
+            )[:nb_steps].astype(int)
+            result[f"{variable}_nb_solves"] = np.bincount(
+                indices, minlength=nb_steps
+            )[:nb_steps]
+        return result
+
+    def get_dataframe(self):
+        """Get the data of the time steps as a :class:`pandas.DataFrame`
+
+        See :meth:`get_time_steps`.
+
+        """
+        import pandas as pd
+
+        return pd.DataFrame(self.get_time_steps())
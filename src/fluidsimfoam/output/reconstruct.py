@@ -0,0 +1,222 @@
+"""In-memory reconstruction of decomposed fields
+
+Fields of decomposed cases (``processor*`` directories) are reconstructed
+without running ``reconstructPar``, using the addressing files written by
+``decomposePar`` in ``processor*/constant/polyMesh``:
+
+- ``cellProcAddressing``: global index of each local cell,
+- ``faceProcAddressing``: (signed, 1-based) global index of each local face,
+- ``boundaryProcAddressing``: global index of each local patch (-1 for
+  processor patches).
+
+"""
+
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from pathlib import Path
+
+import numpy as np
+
+from fluidsimfoam.foam_input_files.ast import NonuniformList
+from fluidsimfoam.foam_input_files.fields import read_field_file
+from fluidsimfoam.foam_input_files.polymesh import (
+    read_boundary_file,
+    read_list_file,
+)
+from fluidsimfoam.output.time_index import get_processor_dirnames
+
+
+def _read_processor_field(path, copy=False):
+    return read_field_file(path, skip_boundary_field=False, copy=copy)
+
+
+class Reconstructor:
+    """Reconstruct decomposed fields in memory
+
+    Parameters
+    ----------
+
+    path_run : str or Path
+        Path of the case.
+    max_workers : int
+        Number of workers used to read the processor files.
+    use_processes : bool
+        Use a process pool instead of a thread pool.
+
+    The addressing arrays are read only once and cached.
+
+    """
+
+    def __init__(self, path_run, max_workers=None, use_processes=False):
+        self.path_run = Path(path_run)
+        self.max_workers = max_workers
+        self.use_processes = use_processes
+        self._addressing = {}
+        self._boundaries = None
+
+    def get_processor_dirnames(self):
+        """Get the names of the processor directories (sorted by rank)"""
+        return get_processor_dirnames(self.path_run)
+
+    def get_addressing(self, name):
+        """Get the addressing arrays (one per processor)
+
+        ``name`` is for example ``"cellProcAddressing"``.
+
+        """
+        try:
+            return self._addressing[name]
+        except KeyError:
+            pass
+        arrays = [
+            read_list_file(
+                self.path_run / dirname / "constant/polyMesh" / name, "label"
+            )
+            for dirname in self.get_processor_dirnames()
+        ]
+        if not arrays:
+            raise ValueError(f"No processor directories in {self.path_run}")
+        self._addressing[name] = arrays
+        return arrays
+
+    def _get_processor_boundaries(self):
+        if self._boundaries is None:
+            self._boundaries = [
+                read_boundary_file(
+                    self.path_run / dirname / "constant/polyMesh/boundary"
+                )
+                for dirname in self.get_processor_dirnames()
+            ]
+        return self._boundaries
+
+    def _create_executor(self):
+        if self.use_processes:
+            return ProcessPoolExecutor(self.max_workers)
+        return ThreadPoolExecutor(self.max_workers)
+
+    def read_processor_fields(self, name, time_name):
+        """Read the fields of all processors (in a pool)"""
+        paths = [
+            self.path_run / dirname / time_name / name
+            for dirname in self.get_processor_dirnames()
+        ]
+        # data have to be copied to be sent between processes
+        read = partial(_read_processor_field, copy=self.use_processes)
+        with self._create_executor() as executor:
+            return list(executor.map(read, paths))
+
+    def reconstruct_field(self, name, time_name):
+        """Reconstruct a field
+
+        ``time_name`` is the name of the time directory in the processor
+        directories. Returns a field object (not written on disk).
+
+        """
+        fields = self.read_processor_fields(name, time_name)
+        cell_addressing = self.get_addressing("cellProcAddressing")
+        if len(cell_addressing) != len(fields):
+            raise ValueError("Incompatible number of processor directories")
+
+        field = fields[0]
+        arrays = [np.asarray(field_proc.get_array()) for field_proc in fields]
+        uniforms = [
+            not isinstance(field_proc.tree["internalField"], NonuniformList)
+            for field_proc in fields
+        ]
+        if not (
+            all(uniforms)
+            and all(np.array_equal(arr_proc, arrays[0]) for arr_proc in arrays)
+        ):
+            # processors with uniform internalField (all local values equal)
+            # are broadcast to their cells
+            shape_components = next(
+                (
+                    arr_proc.shape[1:]
+                    for arr_proc, uniform in zip(arrays, uniforms)
+                    if not uniform
+                ),
+                arrays[0].shape,
+            )
+            nb_cells = sum(addressing.size for addressing in cell_addressing)
+            arr = np.empty((nb_cells,) + shape_components)
+            for addressing, arr_proc in zip(cell_addressing, arrays):
+                arr[addressing] = arr_proc
+            field.set_values(arr)
+
+        self._reconstruct_boundary_field(fields)
+        field.tree.info.pop("location", None)
+        field.path = None
+        field.time = float(time_name)
+        return field
+
+    def _reconstruct_boundary_field(self, fields):
+        try:
+            boundary_fields = [field.tree["boundaryField"] for field in fields]
+        except KeyError:
+            return
+        boundary_addressing = self.get_addressing("boundaryProcAddressing")
+        boundaries = self._get_processor_boundaries()
+
+        # global patch index -> name and {key: [(index_proc, patch, value)]}
+        patch_names = {}
+        values_patches = {}
+        for index_proc, boundary_field in enumerate(boundary_fields):
+            for index_local, (patch_name, patch) in enumerate(
+                boundaries[index_proc].items()
+            ):
+                index_global = int(boundary_addressing[index_proc][index_local])
+                if index_global < 0:
+                    continue
+                patch_names[index_global] = patch_name
+                entry = boundary_field.get(patch_name)
+                if not isinstance(entry, dict):
+                    continue
+                for key, value in entry.items():
+                    values_patches.setdefault(index_global, {}).setdefault(
+                        key, []
+                    ).append((index_proc, patch, value))
+
+        boundary_field = boundary_fields[0]
+        for patch_name in list(boundary_field):
+            if patch_name not in patch_names.values():
+                # processor patches
+                del boundary_field[patch_name]
+
+        face_addressing = None
+        for index_global, values_keys in values_patches.items():
+            entry = boundary_field[patch_names[index_global]]
+            for key, procs_values in values_keys.items():
+                nonuniform_lists = [
+                    value
+                    for _, _, value in procs_values
+                    if isinstance(value, NonuniformList)
+                ]
+                if not nonuniform_lists:
+                    continue
+                if face_addressing is None:
+                    face_addressing = self.get_addressing("faceProcAddressing")
+                list_faces = []
+                list_values = []
+                for index_proc, patch, value in procs_values:
+                    nb_faces = patch["nFaces"]
+                    if nb_faces == 0:
+                        continue
+                    start = patch["startFace"]
+                    faces = face_addressing[index_proc][start : start + nb_faces]
+                    list_faces.append(np.abs(faces) - 1)
+                    if isinstance(value, NonuniformList):
+                        values = value.array
+                    else:
+                        # uniform value on this processor
+                        values = np.broadcast_to(
+                            np.array(getattr(value, "value", value), dtype=float),
+                            (nb_faces,) + nonuniform_lists[0].array.shape[1:],
+                        )
+                    list_values.append(values)
+                faces = np.concatenate(list_faces)
+                values = np.concatenate(list_values)
+                # the faces of a patch are contiguous in the global mesh
+                values = values[np.argsort(faces, kind="stable")]
+                entry[key] = NonuniformList(
+                    values, name=key, dtype=nonuniform_lists[0]._dtype
+                )
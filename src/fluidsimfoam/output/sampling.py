@@ -0,0 +1,79 @@
+"""Probing and line sampling of the fields without pyvista
+
+A KD-tree (``scipy.spatial.cKDTree``) is built over the cell centres and
+cached. Queries return the values at the nearest cells (or values interpolated
+with inverse distance weighting between the ``k`` nearest cells). For several
+times, the values are taken from the cached time series (see
+:meth:`fluidsimfoam.output.fields.Fields.get_time_series`).
+
+scipy is an optional dependency (``pip install scipy``).
+
+"""
+
+import numpy as np
+
+
+def _import_ckdtree():
+    try:
+        from scipy.spatial import cKDTree
+    except ImportError as error:
+        raise ImportError(
+            "scipy is needed to probe the fields (`pip install scipy`)."
+        ) from error
+    return cKDTree
+
+
+class Sampler:
+    """Nearest cells of points (KD-tree over the cell centres)
+
+    Parameters
+    ----------
+
+    coords : tuple of arrays
+        Coordinates of the cell centres ``(x, y, z)``.
+
+    """
+
+    def __init__(self, coords):
+        cKDTree = _import_ckdtree()
+        self.centres = np.stack([np.asarray(coord) for coord in coords], axis=1)
+        self.tree = cKDTree(self.centres)
+
+    def query(self, points, k=1):
+        """Get the indices of the nearest cells and the weights
+
+        Returns ``(indices, weights)`` with shapes ``(npoints, k)``. For
+        ``k > 1``, the weights are inverse distance weights (normalized).
+
+        """
+        points = np.atleast_2d(np.asarray(points, dtype=float))
+        if points.shape[-1] != 3:
+            raise ValueError(f"{points.shape = } (should be (npoints, 3))")
+        distances, indices = self.tree.query(points, k=k)
+        indices = indices.reshape(points.shape[0], k)
+        if k == 1:
+            return indices, np.ones(indices.shape)
+        distances = distances.reshape(points.shape[0], k)
+        with np.errstate(divide="ignore"):
+            weights = 1.0 / distances
+        # points at a cell centre
+        exact = np.isinf(weights)
+        rows = exact.any(axis=1)
+        weights[rows] = exact[rows]
+        weights /= weights.sum(axis=1, keepdims=True)
+        return indices, weights
+
+
+def interpolate(values, indices, weights, axis=0):
+    """Compute the values at the points from the values at the cells
+
+    ``values`` contains the cells along ``axis`` (for example shape ``(ncells,
+    ncomp)`` with ``axis=0`` or ``(ntimes, ncells)`` with ``axis=1``) and
+    ``indices`` and ``weights`` are given by :meth:`Sampler.query`. The
+    cells axis is replaced by the points axis.
+
+    """
+    values = np.asarray(values)
+    selected = np.take(values, indices, axis=axis)
+    weights = weights.reshape(weights.shape + (1,) * (values.ndim - axis - 1))
+    return (selected * weights).sum(axis=axis + 1)
@@ -0,0 +1,185 @@
+"""Temporal statistics of the fields (``sim.output.statistics``)
+
+The saved times are visited one at a time and the statistics of each cell are
+accumulated with the Welford algorithm, so that the memory used does not depend
+on the number of saved times.
+
+"""
+
+import numpy as np
+
+from fluidsimfoam.foam_input_files.ast import NonuniformList
+
+_component_names = {
+    3: ("x", "y", "z"),
+    6: ("xx", "xy", "xz", "yy", "yz", "zz"),
+    9: ("xx", "xy", "xz", "yx", "yy", "yz", "zx", "zy", "zz"),
+}
+
+
+class WelfordAccumulator:
+    """Running mean, variance, minimum and maximum of arrays
+
+    The arrays passed to :meth:`update` have to have the same shape (or be
+    broadcastable to the shape of the first non-uniform array).
+
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = None
+        self._m2 = None
+        self.min = None
+        self.max = None
+
+    def update(self, arr):
+        arr = np.asarray(arr, dtype=float)
+        self.count += 1
+        if self.count == 1:
+            self.mean = arr.copy()
+            self._m2 = np.zeros_like(arr)
+            self.min = arr.copy()
+            self.max = arr.copy()
+            return
+        if arr.shape == self.mean.shape:
+            delta = arr - self.mean
+            self.mean += delta / self.count
+            self._m2 += delta * (arr - self.mean)
+            np.minimum(self.min, arr, out=self.min)
+            np.maximum(self.max, arr, out=self.max)
+        else:
+            # uniform values (for example for the initial time)
+            delta = arr - self.mean
+            self.mean = self.mean + delta / self.count
+            self._m2 = self._m2 + delta * (arr - self.mean)
+            self.min = np.minimum(self.min, arr)
+            self.max = np.maximum(self.max, arr)
+
+    @property
+    def variance(self):
+        """Population variance (``None`` if no values have been added)"""
+        if self.count == 0:
+            return None
+        return self._m2 / self.count
+
+
+def _spatial_mean(arr, weights):
+    if arr.shape[0] == 1:
+        # uniform field
+        return arr[0]
+    return np.average(arr, axis=0, weights=weights)
+
+
+class Statistics:
+    """Temporal statistics of the fields
+
+    Parameters
+    ----------
+
+    output :
+        The ``sim.output`` object.
+
+    """
+
+    def __init__(self, output):
+        self.output = output
+
+    def _get_weights(self, weights):
+        if weights is None:
+            return None
+        if isinstance(weights, str):
+            if weights != "volume":
+                raise ValueError(f"Unsupported {weights = }")
+            return self.output.sim.oper.get_cells_volumes()
+        return np.asarray(weights, dtype=float)
+
+    def compute(self, names=None, tmin=None, tmax=None):
+        """Compute the temporal statistics of fields (for each cell)
+
+        Parameters
+        ----------
+
+        names : sequence of str
+            Names of the fields (default ``output.name_variables``).
+        tmin, tmax : float
+            Range of times (default: all saved times).
+
+        Returns a dict ``{name: WelfordAccumulator}``. Fields which cannot be
+        read (missing or ``codeStream``) are skipped for the corresponding
+        times.
+
+        """
+        if names is None:
+            names = self.output.name_variables
+        elif isinstance(names, str):
+            names = [names]
+        fields = self.output.fields
+        if tmin is None and tmax is None:
+            times = fields.get_saved_times()
+        else:
+            times = fields.select_times(
+                tmin=tmin, tmax=tmax, dirname=fields._get_dirname_saved_times()
+            )
+
+        accumulators = {name: WelfordAccumulator() for name in names}
+        for time in times:
+            for name, accumulator in accumulators.items():
+                try:
+                    field = fields._read_field_time(name, time)
+                except (FileNotFoundError, ValueError):
+                    continue
+                arr = field.get_array()
+                if arr.dtype.hasobject:
+                    # codeStream
+                    continue
+                if not isinstance(field.tree["internalField"], NonuniformList):
+                    # uniform value, broadcast over the cells
+                    arr = arr.reshape((1,) + arr.shape)
+                accumulator.update(arr)
+        return accumulators
+
+    def get_mean_values(self, tmin=None, tmax=None, names=None, weights=None):
+        """Compute spatially averaged statistics
+
+        Parameters
+        ----------
+
+        tmin, tmax : float
+            Range of times (default: all saved times).
+        names : sequence of str
+            Names of the fields (default ``output.name_variables``).
+        weights : None, "volume" or array
+            Weights of the spatial averages (``"volume"``: cell volumes, see
+            :meth:`fluidsimfoam.operators.Operators.get_cells_volumes`).
+
+        Returns a dict of floats with the keys ``<name>_mean`` (spatial mean of
+        the temporal mean), ``<name>_std`` (square root of the spatial mean of
+        the temporal variance), ``<name>_min`` and ``<name>_max``. For vectors
+        and tensors, the component is added to the name (``U_x_mean``).
+
+        """
+        weights = self._get_weights(weights)
+        accumulators = self.compute(names, tmin, tmax)
+        result = {}
+        for name, accumulator in accumulators.items():
+            if accumulator.count == 0:
+                continue
+            values = {
+                "mean": _spatial_mean(accumulator.mean, weights),
+                "std": np.sqrt(_spatial_mean(accumulator.variance, weights)),
+                "min": accumulator.min.min(axis=0),
+                "max": accumulator.max.max(axis=0),
+            }
+            shape_components = accumulator.mean.shape[1:]
+            nb_components = shape_components[0] if shape_components else 1
+            for key, value in values.items():
+                value = np.atleast_1d(value)
+                if nb_components == 1:
+                    result[f"{name}_{key}"] = float(value[0])
+                    continue
+                for component, number in zip(
+                    _component_names[nb_components], value
+                ):
+                    result[f"{name}_{component}_{key}"] = float(number)
+            result[f"{name}_nb_times"] = accumulator.count
+        return result
@@ -0,0 +1,153 @@
+"""Class for the ``sim.output.time_index`` object
+
+The time directories of a case are listed only once. The index is then
+refreshed incrementally, only when the modification time of the parent
+directory changes (which happens when an entry is created or removed).
+
+"""
+
+import os
+from pathlib import Path
+
+import numpy as np
+
+
+def is_time_name(name):
+    return all(c.isdigit() or c == "." for c in name)
+
+
+def get_processor_dirnames(path_run):
+    """Get the names of the processor directories (sorted by rank)"""
+    return sorted(
+        (
+            path.name
+            for path in Path(path_run).glob("processor*")
+            if path.name[len("processor") :].isdigit()
+        ),
+        key=lambda name: int(name[len("processor") :]),
+    )
+
+
+class _DirIndex:
+    """Sorted times and exact directory names of one directory"""
+
+    def __init__(self):
+        self.mtime_ns = None
+        self.times_from_names = {}
+        self.times = np.empty(0)
+        self.names = []
+
+    def update(self, path_dir):
+        try:
+            mtime_ns = path_dir.stat().st_mtime_ns
+        except FileNotFoundError:
+            mtime_ns = None
+        if mtime_ns == self.mtime_ns and mtime_ns is not None:
+            return
+        self.mtime_ns = mtime_ns
+
+        if mtime_ns is None:
+            names = set()
+        else:
+            names = {
+                name
+                for name in os.listdir(path_dir)
+                if name[0].isdigit() and is_time_name(name)
+            }
+
+        old = self.times_from_names
+        # only the new names are parsed
+        new = {
+            name: float(name)
+            for name in names.difference(old)
+            if (path_dir / name).is_dir()
+        }
+        if not new and len(old) == len(names.intersection(old)):
+            return
+        times_from_names = {name: old[name] for name in names if name in old}
+        times_from_names.update(new)
+        self.times_from_names = times_from_names
+        self.names = sorted(times_from_names, key=times_from_names.__getitem__)
+        self.times = np.array(
+            [times_from_names[name] for name in self.names], dtype=float
+        )
+        self.times.flags.writeable = False
+
+
+class TimeIndex:
+    """Cached index of the time directories of a case
+
+    Parameters
+    ----------
+
+    output :
+        The ``sim.output`` object (or the path of a case).
+
+    The methods take an argument ``dirname`` to get the time directories
+    saved in a sub-directory of the case (for example ``"processor0"`` for
+    decomposed cases).
+
+    """
+
+    def __init__(self, output):
+        if isinstance(output, (str, Path)):
+            self.output = None
+            self.path_run = Path(output)
+        else:
+            self.output = output
+            self.path_run = Path(output.path_run)
+        self._indices = {}
+
+    def _get_path_dir(self, dirname=None):
+        if dirname is None:
+            return self.path_run
+        return self.path_run / dirname
+
+    def _get_index(self, dirname=None):
+        try:
+            index = self._indices[dirname]
+        except KeyError:
+            index = self._indices[dirname] = _DirIndex()
+        index.update(self._get_path_dir(dirname))
+        return index
+
+    def get_times(self, dirname=None):
+        """Get the sorted saved times (read-only array)"""
+        return self._get_index(dirname).times
+
+    def get_names(self, dirname=None):
+        """Get the names of the time directories (sorted by time)"""
+        return list(self._get_index(dirname).names)
+
+    def get_name(self, time, dirname=None):
+        """Get the exact name of the directory of a saved time"""
+        index = self._get_index(dirname)
+        idx = np.searchsorted(index.times, time)
+        if idx == len(index.times) or index.times[idx] != time:
+            raise ValueError(f"No time directory for time {time}")
+        return index.names[idx]
+
+    def get_path(self, time, dirname=None):
+        """Get the path of the directory of a saved time"""
+        return self._get_path_dir(dirname) / self.get_name(time, dirname)
+
+    def get_paths(self, dirname=None):
+        """Get a dict ``{time: path}`` (sorted by time)"""
+        index = self._get_index(dirname)
+        path_dir = self._get_path_dir(dirname)
+        return {
+            time: path_dir / name
+            for time, name in zip(index.times.tolist(), index.names)
+        }
+
+    def get_last(self, dirname=None):
+        """Get the last saved time and the path of its directory"""
+        index = self._get_index(dirname)
+        if not index.names:
+            raise ValueError(f"No time directory in {self.path_run}")
+        path_dir = self._get_path_dir(dirname)
+        return float(index.times[-1]), path_dir / index.names[-1]
+
+    def get_processor_dirnames(self):
+        """Get the names of the processor directories (decomposed cases)"""
+        return get_processor_dirnames(self.path_run)
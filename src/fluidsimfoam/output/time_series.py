@@ -0,0 +1,141 @@
+"""On-disk store for time series of fields
+
+The values of a field at different times are stored in a ``.npy`` file, which
+is memory mapped for reading. A JSON file contains the times, the names of the
+time directories and the modification times and sizes of the source files, so
+that the store can be invalidated when a source file changes. New times are
+appended at the end of the ``.npy`` file (the header is rewritten in place).
+
+"""
+
+import io
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+
+_nb_rows_copy = 16
+
+
+def _make_npy_header(dtype, shape):
+    file = io.BytesIO()
+    np.lib.format.write_array_header_1_0(
+        file,
+        {
+            "descr": np.lib.format.dtype_to_descr(np.dtype(dtype)),
+            "fortran_order": False,
+            "shape": tuple(shape),
+        },
+    )
+    return file.getvalue()
+
+
+class TimeSeriesStore:
+    """Store of the values of one field at different times
+
+    Parameters
+    ----------
+
+    path_dir : str or Path
+        Directory of the store (created if needed).
+    name : str
+        Name of the field.
+
+    """
+
+    def __init__(self, path_dir, name):
+        self.path_dir = Path(path_dir)
+        self.name = name
+        self.path_data = self.path_dir / f"{name}.npy"
+        self.path_info = self.path_dir / f"{name}.json"
+        self.entries = []
+        self.shape = None
+        self.dtype = None
+        self._load_info()
+
+    def _load_info(self):
+        if not (self.path_info.exists() and self.path_data.exists()):
+            return
+        try:
+            info = json.loads(self.path_info.read_text())
+        except json.JSONDecodeError:
+            return
+        self.entries = info["entries"]
+        self.shape = tuple(info["shape"])
+        self.dtype = np.dtype(info["dtype"])
+
+    def _save_info(self):
+        info = {
+            "entries": self.entries,
+            "shape": list(self.shape),
+            "dtype": self.dtype.str,
+        }
+        path_tmp = self.path_info.with_name(self.path_info.name + ".tmp")
+        path_tmp.write_text(json.dumps(info))
+        os.replace(path_tmp, self.path_info)
+
+    def get_rows(self):
+        """Get a dict ``{time: (row, entry)}``"""
+        return {
+            entry["time"]: (row, entry) for row, entry in enumerate(self.entries)
+        }
+
+    def get_data(self):
+        """Get the stored data (memory mapped, read-only)"""
+        if not self.entries:
+            return None
+        return np.load(self.path_data, mmap_mode="r")
+
+    def reset(self):
+        self.entries = []
+        self.shape = None
+        self.dtype = None
+        self.path_data.unlink(missing_ok=True)
+        self.path_info.unlink(missing_ok=True)
+
+    def append(self, entries, arr):
+        """Append values (``arr.shape[0] == len(entries)``)"""
+        arr = np.ascontiguousarray(arr)
+        if self.entries and (
+            arr.shape[1:] != self.shape[1:] or arr.dtype != self.dtype
+        ):
+            # for example the mesh has changed
+            self.reset()
+        self.path_dir.mkdir(parents=True, exist_ok=True)
+
+        if not self.entries:
+            self.shape = arr.shape
+            self.dtype = arr.dtype
+            np.save(self.path_data, arr)
+            self.entries = list(entries)
+            self._save_info()
+            return
+
+        header_old = _make_npy_header(self.dtype, self.shape)
+        shape = (self.shape[0] + arr.shape[0],) + self.shape[1:]
+        header = _make_npy_header(self.dtype, shape)
+        if len(header) == len(header_old):
+            nbytes_old = int(np.prod(self.shape)) * self.dtype.itemsize
+            with open(self.path_data, "r+b") as file:
+                file.seek(len(header_old) + nbytes_old)
+                file.write(memoryview(arr).cast("B"))
+                file.truncate()
+                file.seek(0)
+                file.write(header)
+        else:
+            # rare: the header does not have enough padding, the file is
+            # rewritten (copied by chunks to bound the memory)
+            data = self.get_data()
+            path_tmp = self.path_data.with_name(self.path_data.name + ".tmp.npy")
+            with open(path_tmp, "wb") as file:
+                file.write(header)
+                for row in range(0, data.shape[0], _nb_rows_copy):
+                    chunk = np.ascontiguousarray(data[row : row + _nb_rows_copy])
+                    file.write(memoryview(chunk).cast("B"))
+                file.write(memoryview(arr).cast("B"))
+            del data
+            os.replace(path_tmp, self.path_data)
+        self.shape = shape
+        self.entries.extend(entries)
+        self._save_info()
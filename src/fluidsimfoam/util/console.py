@@ -275,3 +275,20 @@ https://foss.heptapod.net/fluiddyn/fluidsimfoam/-/tree/branch/default/doc/exampl
 
     """
     )
+
+
+def export_archive():
+    parser = argparse.ArgumentParser(
+        prog="fluidsimfoam-export",
+        description="Export a simulation to a HDF5 archive",
+    )
+    parser.add_argument("path_run", nargs="?", default=".")
+    parser.add_argument("-o", "--output", help="path of the archive")
+    parser.add_argument(
+        "-n", "--names", nargs="+", help="names of the fields to be exported"
+    )
+    args = parser.parse_args()
+
+    sim = fluidsimfoam.load(args.path_run)
+    path = sim.output.export_archive(args.output, names=args.names)
+    print(f"Archive saved in {path}")
@@ -1,3 +1,4 @@
+from io import BytesIO, StringIO
 from textwrap import dedent
 
 import numpy as np
@@ -7,6 +8,7 @@ from fluidsimfoam.foam_input_files.ast import (
     Dict,
     FoamInputFile,
     List,
+    NonuniformList,
     Value,
     foam_units2str,
     str2foam_units,
@@ -162,3 +164,32 @@ def test_list():
     assert l_scalar.dump().strip() == scalar_dumped.strip()
     assert l_vector.dump().strip() == vector_dumped.strip()
     assert l_tensor.dump().strip() == tensor_dumped.strip()
+
+
+def test_dump_to_chunks(monkeypatch):
+    monkeypatch.setattr(NonuniformList, "_chunk_size", 3)
+    monkeypatch.setattr(List, "_chunk_size", 3)
+    tree = FoamInputFile(info={"format": "ascii"})
+    tree.set_child("l_vector", np.arange(30.0).reshape((10, 3)))
+    tree.set_child("l_scalar", List(list(range(7)), name="l_scalar"))
+    tree.set_child("dict", {})
+    tree["dict"].set_child("value", np.arange(4.0))
+
+    code = tree.dump()
+    assert "(27.0 28.0 29.0)\n);" in code
+    assert "    1\n    2\n    3\n    4" in code
+
+    text_file = StringIO()
+    tree.dump_to(text_file)
+    assert text_file.getvalue() == code
+
+    binary_file = BytesIO()
+    tree.dump_to(binary_file)
+    assert binary_file.getvalue().decode() == code
+
+    tree.info["format"] = "binary"
+    with pytest.raises(ValueError):
+        tree.dump_to(StringIO())
+    binary_file = BytesIO()
+    tree.dump_to(binary_file)
+    assert np.arange(30.0).tobytes() in binary_file.getvalue()
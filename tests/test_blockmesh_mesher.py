@@ -0,0 +1,143 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from fluidsimfoam.foam_input_files import BlockMeshDictRectilinear, read_header
+from fluidsimfoam.foam_input_files.blockmesh import SimpleGrading
+from fluidsimfoam.foam_input_files.blockmesh.mesher import (
+    compute_grading_nodes,
+    create_polymesh,
+    write_polymesh,
+)
+from fluidsimfoam.foam_input_files.polymesh import PolyMesh
+
+path_data = Path(__file__).absolute().parent / "data_blockmesh"
+
+
+def check_orientation(mesh):
+    """Face normals go from the owner to the neighbour (or outside)"""
+    face_centres = mesh.face_centres
+    owner_vectors = face_centres - mesh.cell_centres[mesh.owner]
+    assert ((mesh.face_areas * owner_vectors).sum(axis=1) > 0).all()
+    internal = slice(0, mesh.nb_internal_faces)
+    neighbour_vectors = face_centres[internal] - mesh.cell_centres[mesh.neighbour]
+    assert ((mesh.face_areas[internal] * neighbour_vectors).sum(axis=1) < 0).all()
+
+
+def test_tgv(tmp_path):
+    path_dir = tmp_path / "polyMesh"
+    write_polymesh(path_data / "blockmesh_tgv", path_dir)
+    assert read_header(path_dir / "faces")["format"] == "binary"
+
+    mesh = PolyMesh(path_dir)
+    nx = 40
+    lx = 6.28318530718
+    assert mesh.nb_cells == nx**3
+    assert mesh.nb_internal_faces == 3 * nx**2 * (nx - 1)
+    assert np.allclose(mesh.cell_volumes, (lx / nx) ** 3)
+    assert np.allclose(
+        mesh.cell_centres[1] - mesh.cell_centres[0], [lx / nx, 0, 0]
+    )
+    check_orientation(mesh)
+
+    # upper-triangular order of the internal faces
+    owner = mesh.owner[: mesh.nb_internal_faces]
+    keys = owner.astype(np.int64) * mesh.nb_cells + mesh.neighbour
+    assert (np.diff(keys) > 0).all()
+
+    patches = mesh.patches
+    assert list(patches) == [
+        "upperBoundary",
+        "lowerBoundary",
+        "leftBoundary",
+        "rightBoundary",
+        "frontBoundary",
+        "backBoundary",
+    ]
+    patch = patches["upperBoundary"]
+    assert patch.type == "cyclic"
+    assert patch.nb_faces == nx**2
+    assert patch.info["neighbourPatch"] == "lowerBoundary"
+
+    # faces of cyclic patches match after translation
+    centres_upper = mesh.face_centres[patch.faces]
+    centres_lower = mesh.face_centres[patches["lowerBoundary"].faces]
+    assert np.allclose(centres_upper - centres_lower, [0, lx, 0])
+
+
+def test_rectilinear_graded(tmp_path):
+    bmd = BlockMeshDictRectilinear(
+        lx=2.0, ly=1.0, lz=0.5, nx=8, ny=6, nz=1, scale=0.1
+    )
+    bmd.block.grading = SimpleGrading(4, [(0.5, 0.5, 2), (0.5, 0.5, 0.5)], 1)
+    bmd.add_boundary("wall", "bottom", bmd.block.face("s"))
+    bmd.add_boundary("patch", "outlet", bmd.block.face("e"))
+
+    mesh = bmd.write_polymesh(tmp_path / "polyMesh")
+    assert mesh["faces"].shape[1] == 4
+    polymesh = PolyMesh(tmp_path / "polyMesh")
+    assert polymesh.nb_cells == 48
+    assert np.isclose(polymesh.cell_volumes.sum(), 0.2 * 0.1 * 0.05)
+    check_orientation(polymesh)
+
+    x = np.unique(polymesh.points[:, 0])
+    dx = np.diff(x)
+    assert np.isclose(dx[-1] / dx[0], 4)
+    assert np.isclose(x[-1], 0.2)
+    y = np.unique(polymesh.points[:, 1])
+    assert np.isclose(y[3], 0.05)
+
+    patches = polymesh.patches
+    assert list(patches) == ["bottom", "outlet", "defaultFaces"]
+    assert patches["bottom"].info["inGroups"] == "1(wall)"
+    assert patches["outlet"].nb_faces == 6
+    assert patches["defaultFaces"].type == "empty"
+    assert patches["defaultFaces"].nb_faces == 2 * 48 + 8 + 6 * 1
+
+
+def test_grading_nodes():
+    assert np.allclose(compute_grading_nodes(4, 1), np.linspace(0, 1, 5))
+    nodes = compute_grading_nodes(10, [(0.2, 0.3, 4), (0.8, 0.7, 1)])
+    assert nodes.size == 11
+    assert np.isclose(nodes[3], 0.2)
+    sizes = np.diff(nodes)
+    assert np.isclose(sizes[2] / sizes[0], 4)
+    assert np.allclose(sizes[3:], 0.8 / 7)
+
+
+def test_cbox():
+    mesh = create_polymesh(path_data / "blockmesh_cbox")
+    assert [patch[:3] for patch in mesh["patches"]] == [
+        ("frontAndBack", "wall", 160),
+        ("topAndBottom", "wall", 2 * 80**2),
+        ("hot", "wall", 80),
+        ("cold", "wall", 80),
+    ]
+    assert mesh["neighbour"].size == 2 * 80 * 79
+
+
+def test_not_supported():
+    with pytest.raises(NotImplementedError):
+        create_polymesh(path_data / "blockmesh_phill")
+
+
+def test_cavity_patches():
+    # deprecated syntax "patches (type name (faces) ...)"
+    mesh = create_polymesh(path_data / "blockmesh_cavity_patches")
+    assert [patch[:3] for patch in mesh["patches"]] == [
+        ("movingWall", "wall", 20),
+        ("fixedWalls", "wall", 60),
+        ("frontAndBack", "empty", 800),
+    ]
+
+
+def test_unsupported_keyword(tmp_path):
+    path = tmp_path / "blockMeshDict"
+    path.write_text(
+        (path_data / "blockmesh_tgv").read_text()
+        + "\ngeometry\n{\n    sphere\n    {\n        type sphere;\n"
+        "        origin (0 0 0);\n        radius 1;\n    }\n}\n"
+    )
+    with pytest.raises(NotImplementedError, match="geometry"):
+        create_polymesh(path)
@@ -1,11 +1,19 @@
+import gzip
 from textwrap import dedent
 
 import numpy as np
+import pytest
 
+from fluidsimfoam.foam_input_files.ast import ARCH_BINARY, NonuniformList, Value
 from fluidsimfoam.foam_input_files.fields import (
+    PointVectorField,
+    SurfaceScalarField,
     VolScalarField,
+    VolSymmTensorField,
     VolTensorField,
     VolVectorField,
+    create_array_from_ascii_data,
+    read_field_file,
 )
 
 code_p = dedent(
@@ -405,3 +413,333 @@ def test_tensor():
     field = VolTensorField("tensor", "")
     arr = np.ones((10, 9))
     field.set_values(arr)
+
+
+def make_code_binary(cls_name, arr, arch="LSB;label=32;scalar=64"):
+    dtype = {3: "vector", 6: "symmTensor", 9: "tensor"}.get(
+        arr.shape[-1] if arr.ndim > 1 else 1
+    )
+    if dtype is None:
+        dtype = "scalar"
+    header = dedent(
+        f"""
+        FoamFile
+        {{
+            version     2.0;
+            format      binary;
+            arch        "{arch}";
+            class       {cls_name};
+            object      foo;
+        }}
+
+        dimensions      [0 1 -1 0 0 0 0];
+
+        internalField   nonuniform List<{dtype}> {len(arr)}
+        ("""
+    ).lstrip()
+    footer = dedent(
+        """)
+        ;
+
+        boundaryField
+        {
+            wall
+            {
+                type            noSlip;
+            }
+        }
+        """
+    )
+    return header.encode() + arr.tobytes() + footer.encode()
+
+
+@pytest.mark.parametrize(
+    "arch", ["LSB;label=32;scalar=64", "MSB;label=32;scalar=32"]
+)
+def test_binary_zero_copy(tmp_path, arch):
+    endianess = "<" if arch.startswith("LSB") else ">"
+    dtype = endianess + ("f8" if arch.endswith("64") else "f4")
+    arr = np.arange(30, dtype=dtype).reshape((10, 3))
+    path = tmp_path / "U"
+    path.write_bytes(make_code_binary("volVectorField", arr, arch))
+
+    field = read_field_file(path)
+    values = field.get_array()
+    assert values.shape == (10, 3)
+    assert not values.flags.writeable
+    assert np.array_equal(values, arr)
+
+    field = read_field_file(path, skip_boundary_field=False, copy=True)
+    values = field.get_array()
+    assert values.flags.writeable
+    assert values.dtype.isnative
+    assert np.array_equal(values, arr)
+    assert field.tree["boundaryField"]["wall"]["type"] == "noSlip"
+
+
+@pytest.mark.parametrize(
+    "arch", ["LSB;label=32;scalar=32", "MSB;label=32;scalar=64"]
+)
+def test_binary_overwrite_arch(tmp_path, arch):
+    endianess = "<" if arch.startswith("LSB") else ">"
+    dtype = endianess + ("f8" if arch.endswith("64") else "f4")
+    arr = np.arange(30, dtype=dtype).reshape((10, 3))
+    path = tmp_path / "U"
+    path.write_bytes(make_code_binary("volVectorField", arr, arch))
+
+    field = read_field_file(path, skip_boundary_field=False)
+    field.overwrite()
+    field = read_field_file(path, skip_boundary_field=False)
+    assert field.tree.info["arch"] == ARCH_BINARY
+    assert np.array_equal(field.get_array(), arr)
+    assert field.tree["boundaryField"]["wall"]["type"] == "noSlip"
+
+
+def test_binary_label_list():
+    arr = np.arange(4)
+    parts = NonuniformList(arr, "value", "label").make_parts_binary()
+    assert bytes(parts[1]) == arr.astype(np.int32).tobytes()
+
+
+def test_create_array_from_ascii_data():
+    arr = create_array_from_ascii_data(b"\n(1 2 3)\n(4 5 6e-3)\n", "vector", 2)
+    assert np.array_equal(arr, [[1, 2, 3], [4, 5, 6e-3]])
+
+    arr = create_array_from_ascii_data(b"1 2\n3", "scalar", 3)
+    assert np.array_equal(arr, [1, 2, 3])
+
+    arr = create_array_from_ascii_data(b"", "scalar", 0)
+    assert arr.size == 0
+
+    with pytest.raises(ValueError):
+        create_array_from_ascii_data(b"(1 2 3)\n(4 5 6)", "vector", 3)
+
+
+def test_ascii_inline_list():
+    code = code_cx.replace(
+        code_cx[code_cx.index("internalField") : code_cx.index("boundaryField")],
+        "internalField   nonuniform List<scalar> 3(0.1 0.2 0.3);\n\n",
+    )
+    field = VolScalarField.from_code(code)
+    assert np.array_equal(field.get_array(), [0.1, 0.2, 0.3])
+
+
+def test_binary_dump(tmp_path):
+    arr = np.arange(30.0).reshape((10, 3))
+    field = VolVectorField("U", "m/s", values=arr)
+    field.set_boundary("wall", "noSlip")
+    code = field.dump(format="binary")
+    assert isinstance(code, bytes)
+    assert b'arch        "' in code
+    assert arr.tobytes() in code
+
+    field.path = path = tmp_path / "U"
+    field.overwrite()
+    field = read_field_file(path, skip_boundary_field=False)
+    assert field.tree.info["format"] == "binary"
+    assert np.array_equal(field.get_array(), arr)
+    assert field.tree["boundaryField"]["wall"]["type"] == "noSlip"
+
+    # overwrite a field whose values are a view of the same file
+    field.overwrite()
+    assert np.array_equal(read_field_file(path).get_array(), arr)
+
+    field.overwrite(format="ascii")
+    field = read_field_file(path)
+    assert field.tree.info["format"] == "ascii"
+    assert np.array_equal(field.get_array(), arr)
+
+    field = VolScalarField("p", "m^2/s^2", values=[1.0, 2.0])
+    field.path = path
+    field.overwrite(format="binary")
+    assert np.array_equal(read_field_file(path).get_array(), [1.0, 2.0])
+
+
+def test_lazy_field(tmp_path):
+    path = tmp_path / "C"
+    path.write_text(code_cells_centers)
+    field = read_field_file(path, lazy=True)
+    assert field.boundary_names == [
+        "upperBoundary",
+        "lowerBoundary",
+        "leftBoundary",
+        "rightBoundary",
+        "frontBoundary",
+        "backBoundary",
+    ]
+    assert field.get_boundary_type("lowerBoundary") == "cyclic"
+    assert field.get_boundary_types()["upperBoundary"] == "calculated"
+    # nothing decoded before access
+    assert field._internal_field is None
+    expected = VolVectorField.from_code(code_cells_centers).get_array()
+    assert np.array_equal(field.get_array(), expected)
+    assert field.get_boundary("upperBoundary")["type"] == "calculated"
+    assert np.array_equal(field.load().get_array(), expected)
+
+    arr = np.arange(12.0).reshape(4, 3)
+    path = tmp_path / "U"
+    path.write_bytes(make_code_binary("volVectorField", arr))
+    field = read_field_file(path, lazy=True)
+    assert field.get_boundary_types() == {"wall": "noSlip"}
+    assert np.array_equal(field.get_array(), arr)
+
+    path = tmp_path / "p"
+    path.write_text(code_p.format("", "    uniform 2.0;"))
+    field = read_field_file(path, lazy=True)
+    assert field.boundary_names == []
+    assert field.get_array() == 2.0
+
+
+def test_boundary_nonuniform_lists(tmp_path):
+    field = VolVectorField.from_code(code_cells_centers)
+    value = field.tree["boundaryField"]["upperBoundary"]["value"]
+    assert isinstance(value, NonuniformList)
+    expected = np.array([[50, 8000, 0.005], [150, 8000, 0.005]])
+    assert np.array_equal(value.array, expected)
+
+    field2 = VolVectorField.from_code(field.dump())
+    value2 = field2.tree["boundaryField"]["upperBoundary"]["value"]
+    assert np.array_equal(value2.array, expected)
+
+    path = tmp_path / "C"
+    field.path = path
+    field.overwrite(format="binary")
+    field = read_field_file(path, skip_boundary_field=False)
+    value = field.tree["boundaryField"]["upperBoundary"]["value"]
+    assert np.array_equal(value.array, expected)
+    assert field.tree["boundaryField"]["lowerBoundary"]["type"] == "cyclic"
+
+    field = read_field_file(path, lazy=True)
+    assert np.array_equal(field.get_boundary("upperBoundary")["value"], expected)
+
+
+def test_gzip(tmp_path):
+    arr = np.arange(12.0).reshape(4, 3)
+    path = tmp_path / "U"
+    path.write_bytes(make_code_binary("volVectorField", arr))
+    field = read_field_file(path, skip_boundary_field=False)
+    field.overwrite(compress=True)
+    assert not path.exists()
+    assert field.path == tmp_path / "U.gz"
+    assert gzip.decompress(field.path.read_bytes()) == field.dump()
+
+    # "U" is resolved as "U.gz"
+    field = read_field_file(path, skip_boundary_field=False)
+    assert np.array_equal(field.get_array(), arr)
+    assert field.tree["boundaryField"]["wall"]["type"] == "noSlip"
+    assert np.array_equal(read_field_file(path, lazy=True).get_array(), arr)
+
+    field.overwrite(format="ascii")
+    assert field.path.name == "U.gz"
+    field.overwrite(compress=False)
+    assert path.exists() and not (tmp_path / "U.gz").exists()
+    assert np.array_equal(read_field_file(path).get_array(), arr)
+
+
+@pytest.mark.parametrize("binary", [True, False])
+def test_read_cells(tmp_path, binary):
+    arr = np.arange(30.0).reshape(10, 3)
+    path = tmp_path / "U"
+    if binary:
+        path.write_bytes(make_code_binary("volVectorField", arr))
+    else:
+        field = VolVectorField("U", "m/s")
+        field.set_values(arr)
+        field.path = path
+        field.overwrite()
+
+    for cells in (
+        slice(2, 5),
+        slice(8, 1, -3),
+        slice(None, None, 4),
+        slice(5, 5),
+        [7, 0, 3],
+        np.array([9]),
+    ):
+        field = read_field_file(path, cells=cells)
+        assert np.array_equal(field.get_array(), arr[cells]), cells
+
+    with pytest.raises(ValueError):
+        field.overwrite()
+
+
+code_phi = dedent(
+    """
+    FoamFile
+    {
+        version     2.0;
+        format      ascii;
+        class       surfaceScalarField;
+        location    "0.1";
+        object      phi;
+    }
+
+    dimensions      [0 3 -1 0 0 0 0];
+
+    internalField   nonuniform List<scalar> 4(0.1 -0.2 0.3 4e-05);
+
+    boundaryField
+    {
+        inlet
+        {
+            type            calculated;
+            value           nonuniform List<scalar> 2(-0.5 -0.5);
+        }
+        walls
+        {
+            type            calculated;
+            value           uniform 0;
+        }
+    }
+    """
+)
+
+
+def test_other_classes(tmp_path):
+    path = tmp_path / "phi"
+    path.write_text(code_phi)
+    field = read_field_file(path, skip_boundary_field=False)
+    assert isinstance(field, SurfaceScalarField)
+    assert np.array_equal(field.get_array(), [0.1, -0.2, 0.3, 4e-05])
+    inlet = field.tree["boundaryField"]["inlet"]
+    assert np.array_equal(inlet["value"], [-0.5, -0.5])
+
+    arr = np.arange(24.0).reshape(4, 6)
+    path = tmp_path / "Taub"
+    path.write_bytes(make_code_binary("volSymmTensorField", arr))
+    field = read_field_file(path, skip_boundary_field=False)
+    assert isinstance(field, VolSymmTensorField)
+    assert np.array_equal(field.get_array(), arr)
+    field.overwrite(format="ascii")
+    assert "List<symmTensor>" in path.read_text()
+    assert np.array_equal(read_field_file(path).get_array(), arr)
+
+    field = PointVectorField("pointDisplacement", "m")
+    field.set_values(np.zeros((5, 3)))
+    field = PointVectorField.from_code(field.dump(format="binary"))
+    assert field.get_array().shape == (5, 3)
+
+    with pytest.raises(ValueError):
+        VolSymmTensorField("Taub", "m^2.s^-2").set_values(np.zeros((4, 9)))
+
+
+@pytest.mark.parametrize(
+    "cls, value",
+    [
+        (VolScalarField, 2.0),
+        (VolVectorField, [1.0, 2.0, 3.0]),
+        (VolSymmTensorField, [1.0, 2.0, 3.0, 4.0, 5.0, 6.0]),
+        (VolTensorField, list(range(9))),
+    ],
+)
+def test_get_array_uniform_created(cls, value):
+    field = cls("f", "")
+    if cls in (VolScalarField, VolVectorField):
+        field.set_values(value)
+    else:
+        # set_values only supports nonuniform tensors
+        code = "(" + " ".join(str(number) for number in value) + ")"
+        field.tree.children["internalField"] = Value(code, name="uniform")
+    arr = field.get_array()
+    assert arr.dtype == float
+    assert np.array_equal(arr, value)
@@ -0,0 +1,67 @@
+import os
+
+import numpy as np
+
+from fluidsimfoam.foam_input_files.geometry_cache import GeometryCache
+
+
+def test_geometry_cache(tmp_path):
+    path = tmp_path / "points"
+    path.write_text("0")
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return np.arange(10.0) + int(path.read_text())
+
+    cache = GeometryCache()
+    arr = cache.get("arr", [path], compute)
+    assert cache.get("arr", [path], compute) is arr
+    assert len(calls) == 1
+
+    # modification of the source file
+    path.write_text("10")
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000))
+    arr = cache.get("arr", [path], compute)
+    assert len(calls) == 2
+    assert arr[0] == 10.0
+
+
+def test_geometry_cache_persistence(tmp_path):
+    path = tmp_path / "points"
+    path.write_text("0")
+    path_dir = tmp_path / ".data_fluidsim/mesh"
+
+    def compute():
+        return np.ones(4)
+
+    GeometryCache().get("arr", [path], compute, path_dir=path_dir)
+    assert (path_dir / "arr.npy").exists()
+
+    def compute_fail():
+        raise RuntimeError
+
+    # new cache (for example new process): the array is loaded
+    arr = GeometryCache().get("arr", [path], compute_fail, path_dir=path_dir)
+    assert isinstance(arr, np.memmap)
+    assert np.all(arr == 1.0)
+
+
+def test_geometry_cache_lru(tmp_path):
+    paths = []
+    for index in range(3):
+        path = tmp_path / f"file{index}"
+        path.write_text(str(index))
+        paths.append(path)
+
+    cache = GeometryCache(max_nbytes=2 * 800)
+    for path in paths[:2]:
+        cache.get("arr", [path], lambda: np.zeros(100))
+    # the first array becomes the most recently used
+    cache.get("arr", [paths[0]], lambda: np.zeros(100))
+    cache.get("arr", [paths[2]], lambda: np.zeros(100))
+    assert len(cache) == 2
+    assert cache.nbytes == 1600
+    keys = [key[2][0][0] for key in cache._arrays]
+    assert keys == [str(paths[0]), str(paths[2])]
@@ -0,0 +1,216 @@
+from types import SimpleNamespace
+
+import matplotlib
+import numpy as np
+
+from fluidsimfoam.output.log import Log
+from fluidsimfoam.output.log_parser import LogParser
+
+matplotlib.use("Agg")
+
+
+def format_time_step(time, index):
+    residual = 10.0 ** -(index + 1)
+    return (
+        f"Time = {time:g}\n\n"
+        "Courant Number mean: 0.1 max: 0.5\n"
+        f"smoothSolver:  Solving for Ux, Initial residual = {residual:g}, "
+        "Final residual = 1e-07, No Iterations 3\n"
+        f"smoothSolver:  Solving for Uy, Initial residual = {2 * residual:g}, "
+        "Final residual = 1e-07, No Iterations 3\n"
+        f"DICPCG:  Solving for p, Initial residual = {3 * residual:g}, "
+        "Final residual = 1e-07, No Iterations 20\n"
+        "time step continuity errors : sum local = 1e-09, global = 1e-19, "
+        "cumulative = 1e-19\n"
+        f"DICPCG:  Solving for p, Initial residual = {4 * residual:g}, "
+        "Final residual = 1e-07, No Iterations 15\n"
+        "time step continuity errors : sum local = 1e-09, global = 1e-19, "
+        "cumulative = 2e-19\n"
+        f"ExecutionTime = {0.5 * (index + 1):g} s  "
+        f"ClockTime = {index + 1} s\n\n"
+    )
+
+
+def create_log_text(nb_time_steps, index_start=0, delta_t=0.01):
+    return "".join(
+        format_time_step(delta_t * (index + 1), index)
+        for index in range(index_start, index_start + nb_time_steps)
+    )
+
+
+header = (
+    "start_time = 0\nend_time = 0.1\n"
+    "/*---------------------------------------------------------------*\\\n"
+    "Create time\n\nCreate mesh for time = 0\n\n"
+    "Starting time loop\n\n"
+)
+
+
+def test_log_parser(tmp_path):
+    path = tmp_path / "log_2023-01-01_00-00-00.txt"
+    path.write_text(header + create_log_text(3))
+
+    parser = LogParser(path)
+    assert parser.update() == path.stat().st_size
+    assert parser.start_time == 0.0
+    assert parser.end_time == 0.1
+    assert np.allclose(parser.times, [0.01, 0.02, 0.03])
+    assert np.allclose(parser.execution_times, [0.5, 1.0, 1.5])
+    assert parser.variables == ["Ux", "Uy", "p"]
+
+    indices, residuals = parser.get_residuals("p")
+    assert indices.tolist() == [0, 0, 1, 1, 2, 2]
+    assert np.allclose(residuals[:2], [0.3, 0.4])
+
+    times, residuals = parser.get_first_residuals("p")
+    assert np.allclose(times, [0.01, 0.02, 0.03])
+    assert np.allclose(residuals, [0.3, 0.03, 0.003])
+
+    # nothing new
+    assert parser.update() == 0
+
+    # appended text, with an incomplete last line
+    text = create_log_text(2, index_start=3)
+    with open(path, "a") as file:
+        file.write(text + "Time = 0.0")
+    size_parsed = parser.update()
+    assert size_parsed == len(text.encode())
+    assert parser.offset == path.stat().st_size - len("Time = 0.0")
+    assert np.allclose(parser.times, [0.01, 0.02, 0.03, 0.04, 0.05])
+    assert parser.get_residuals("Ux")[0].tolist() == [0, 1, 2, 3, 4]
+
+    with open(path, "a") as file:
+        file.write("6\n")
+    parser.update()
+    assert parser.times.size == 6
+    assert parser.execution_times.size == 5
+
+    # truncated (for example overwritten) file
+    path.write_text(header + create_log_text(1))
+    parser.update()
+    assert parser.times.tolist() == [0.01]
+
+
+def test_log_parser_small_chunks(tmp_path):
+    path = tmp_path / "log.txt"
+    text = header + create_log_text(20)
+    path.write_text(text)
+    parser = LogParser(path, path_cache=False, chunk_size=1000)
+    parser.update()
+    parser_ref = LogParser(path, path_cache=False)
+    parser_ref.update()
+    assert np.array_equal(parser.times, parser_ref.times)
+    for variable in parser_ref.variables:
+        for arr, arr_ref in zip(
+            parser.get_residuals(variable), parser_ref.get_residuals(variable)
+        ):
+            assert np.array_equal(arr, arr_ref)
+
+
+def test_log_parser_time_steps(tmp_path):
+    path = tmp_path / "log.txt"
+    path.write_text(header + create_log_text(3))
+    parser = LogParser(path)
+    parser.update()
+
+    solves = parser.get_solves("p")
+    assert solves["nb_iterations"].tolist() == [20, 15] * 3
+    assert np.allclose(solves["final"], 1e-7)
+
+    data = parser.get_time_steps()
+    assert np.allclose(data["time"], [0.01, 0.02, 0.03])
+    assert np.allclose(data["p_initial"], [0.3, 0.03, 0.003])
+    assert data["p_nb_iterations"].tolist() == [35] * 3
+    assert data["p_nb_solves"].tolist() == [2] * 3
+    assert np.allclose(data["courant_max"], 0.5)
+    assert np.allclose(data["clock_time"], [1, 2, 3])
+    assert np.allclose(data["continuity_cumulative"], 2e-19)
+    assert np.isnan(data["delta_t"]).all()
+
+    df = parser.get_dataframe()
+    assert len(df) == 3
+    assert np.allclose(df["Ux_initial"], [0.1, 0.01, 0.001])
+
+
+def test_log_parser_delta_t_before_time(tmp_path):
+    # solvers with adjustable time step (like pimpleFoam)
+    path = tmp_path / "log.txt"
+    text = "Starting time loop\n\n"
+    for index in range(3):
+        text += (
+            f"Courant Number mean: 0.1 max: {0.1 * (index + 1):g}\n"
+            f"deltaT = {0.001 * (index + 1):g}\n"
+            f"Time = {0.001 * (index + 1):g}\n\n"
+            "DILUPBiCGStab:  Solving for Ux, Initial residual = 0.01, "
+            "Final residual = 1e-06, No Iterations 2\n"
+            f"ExecutionTime = {index + 1} s  ClockTime = {index + 1} s\n\n"
+        )
+    path.write_text(text + "End\n")
+    parser = LogParser(path, path_cache=False)
+    parser.update()
+    assert parser.finished
+    data = parser.get_time_steps()
+    assert np.allclose(data["delta_t"], [0.001, 0.002, 0.003])
+    assert np.allclose(data["courant_max"], [0.1, 0.2, 0.3])
+
+
+def test_log_parser_cache(tmp_path):
+    path = tmp_path / "log.txt"
+    path.write_text(header + create_log_text(4))
+    parser = LogParser(path)
+    parser.update()
+    path_cache = tmp_path / "log.txt.npz"
+    assert path_cache.exists()
+
+    parser_loaded = LogParser(path)
+    assert parser_loaded.offset == parser.offset
+    assert parser_loaded.update() == 0
+    assert parser_loaded.end_time == 0.1
+    assert np.array_equal(parser_loaded.times, parser.times)
+    for key, arr in parser.get_time_steps().items():
+        assert np.array_equal(
+            parser_loaded.get_time_steps()[key], arr, equal_nan=True
+        )
+
+    # only the appended text is parsed after loading
+    text = create_log_text(2, index_start=4)
+    with open(path, "a") as file:
+        file.write(text)
+    parser_loaded = LogParser(path)
+    assert parser_loaded.update() == len(text)
+    assert parser_loaded.times.size == 6
+    assert parser_loaded.get_residuals("p")[0][-1] == 5
+
+    # the cache of another file is not used
+    path.write_text("start_time = 1\n" + create_log_text(4))
+    parser_other = LogParser(path)
+    assert parser_other.offset == 0
+    parser_other.update()
+    assert parser_other.start_time == 1.0
+
+
+def test_log(tmp_path):
+    path = tmp_path / "log_2023-01-01_00-00-00.txt"
+    path.write_text(header + create_log_text(6))
+    output = SimpleNamespace(path_run=tmp_path, name_variables=["p", "U"])
+    log = Log(output)
+    assert log.path_file == path
+
+    data = log._load_times()
+    assert np.allclose(data["equation_times"], [0.01, 0.02, 0.03, 0.04, 0.05])
+    assert np.allclose(data["remaining_eq_times"], 0.1 - data["equation_times"])
+    assert data["full_clock_time"] == 3.0
+
+    times, residuals = log.plot_residuals(tmin=0.015)
+    assert np.allclose(times, [0.02, 0.03, 0.04, 0.05, 0.06])
+    assert np.allclose(residuals, 3 * 10.0 ** -np.arange(2, 7))
+
+    assert log.time_last == 0.06
+    time, residual = log.get_last_residual()
+    assert time == 0.06
+    assert np.isclose(residual, 3e-6)
+    assert log.get_dataframe()["time"].size == 6
+
+    with open(path, "a") as file:
+        file.write(create_log_text(1, index_start=6))
+    assert log.parser.times.size == 7
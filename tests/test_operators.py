@@ -0,0 +1,319 @@
+import shutil
+
+import numpy as np
+import pytest
+from fluidsimfoam_tgv import Simul
+from test_polymesh import create_box_mesh, write_polymesh
+
+from fluidsimfoam.foam_input_files import VolScalarField, VolVectorField
+
+nx, ny, nz = 4, 3, 2
+lx, ly, lz = 2.0, 3.0, 0.5
+
+points_template = """FoamFile
+{{
+    version     2.0;
+    format      ascii;
+    class       vectorField;
+    location    "constant/polyMesh";
+    object      points;
+}}
+
+{nb_points}
+(
+{points}
+)
+"""
+
+
+def write_mesh_files(path_run):
+    """Write 0/C, 0/V and polyMesh/points of a rectilinear mesh"""
+    # non-uniform in y
+    y_nodes = ly * np.array([0.0, 0.2, 0.5, 1.0])
+    x_nodes = np.linspace(0, lx, nx + 1)
+    z_nodes = np.linspace(0, lz, nz + 1)
+
+    def centres(nodes):
+        return 0.5 * (nodes[1:] + nodes[:-1])
+
+    z, y, x = np.meshgrid(
+        centres(z_nodes), centres(y_nodes), centres(x_nodes), indexing="ij"
+    )
+    dz, dy, dx = np.meshgrid(
+        np.diff(z_nodes), np.diff(y_nodes), np.diff(x_nodes), indexing="ij"
+    )
+    field = VolVectorField("C", "m")
+    field.set_values(x.ravel(), y.ravel(), z.ravel())
+    field.path = path_run / "0/C"
+    field.overwrite()
+    field = VolScalarField("V", "m^3")
+    field.set_values((dx * dy * dz).ravel())
+    field.path = path_run / "0/V"
+    field.overwrite()
+
+    z, y, x = np.meshgrid(z_nodes, y_nodes, x_nodes, indexing="ij")
+    points = "\n".join(
+        f"({xx} {yy} {zz})" for xx, yy, zz in zip(x.ravel(), y.ravel(), z.ravel())
+    )
+    path = path_run / "constant/polyMesh/points"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(points_template.format(nb_points=x.size, points=points))
+    return y_nodes
+
+
+@pytest.fixture
+def sim():
+    params = Simul.create_default_params()
+    params.output.sub_directory = "tests_fluidsimfoam/tgv"
+    params.init_fields.type = "codestream"
+    sim = Simul(params)
+    write_mesh_files(sim.path_run)
+    return sim
+
+
+def test_average_over(sim):
+    oper = sim.oper
+    x, y, z = oper.get_cells_coords()
+    y_reduced = oper.get_reduced_coords("xz")
+    assert y_reduced.shape == (ny,)
+    assert np.all(np.diff(y_reduced) > 0)
+
+    values = y + 10 * x
+    mean = oper.average_over(values, "xz")
+    assert np.allclose(mean, y_reduced + 10 * lx / 2)
+
+    # the grouping is cached
+    grouping = oper._groupings[("xz", None, 8)]
+    oper.average_over(values, "zx")
+    assert oper._groupings[("xz", None, 8)] is grouping
+
+    vectors = np.stack([x, y, z], axis=1)
+    mean = oper.average_over(vectors, "x")
+    y_reduced, z_reduced = oper.get_reduced_coords("x")
+    assert mean.shape == (ny * nz, 3)
+    assert np.allclose(mean[:, 1], y_reduced)
+    assert np.allclose(mean[:, 2], z_reduced)
+
+    # volume weighted average over all directions
+    mean = oper.average_over(y, "xyz", weights="volume")
+    assert np.allclose(mean, ly / 2)
+
+    with pytest.raises(ValueError):
+        oper.average_over(values, "xa")
+    with pytest.raises(ValueError):
+        oper.average_over(values[:-1], "x")
+
+
+def test_integrate(sim):
+    oper = sim.oper
+    x, y, z = oper.get_cells_coords()
+    assert np.isclose(oper.integrate(np.ones_like(x)), lx * ly * lz)
+    assert np.isclose(oper.integrate(y), lx * lz * ly**2 / 2)
+    assert np.allclose(oper.integrate(np.ones_like(x), "xz"), lx * lz)
+
+
+def test_probe(sim):
+    pytest.importorskip("scipy")
+    x, y, z = sim.oper.get_cells_coords()
+    for index, time in enumerate(["0.1", "0.2", "0.3"]):
+        path_dir = sim.path_run / time
+        path_dir.mkdir()
+        field = VolScalarField("p", "m^2.s^-2")
+        field.set_values(index + x + 10 * y)
+        field.path = path_dir / "p"
+        field.overwrite(format="binary")
+        field = VolVectorField("U", "m/s")
+        field.set_values(np.stack([x, y, index + z], axis=1))
+        field.path = path_dir / "U"
+        field.overwrite()
+
+    fields = sim.output.fields
+    points = np.stack([x[:5], y[:5], z[:5]], axis=1) + 1e-3
+    values = fields.probe(points, "p")
+    assert np.allclose(values, 2 + x[:5] + 10 * y[:5])
+    assert fields.get_sampler() is fields.get_sampler()
+
+    # at the cell centres, the inverse distance interpolation is exact
+    values = fields.probe(points - 1e-3, "U", times=0.1, k=4)
+    assert values.shape == (5, 3)
+    assert np.allclose(values[:, 2], z[:5])
+
+    times, values = fields.probe(points, "p", tmin=0.2)
+    assert times.tolist() == [0.2, 0.3]
+    assert values.shape == (2, 5)
+    assert np.allclose(values[0], 1 + x[:5] + 10 * y[:5])
+
+    points, (times, values) = fields.sample_line(
+        [0.1, 0, 0.1], [0.1, ly, 0.1], 7, "U", times=[0.1, 0.3]
+    )
+    assert points.shape == (7, 3)
+    assert values.shape == (2, 7, 3)
+    assert np.allclose(values[1, :, 2], 2 + lz / 4)
+    assert np.all(np.diff(values[0, :, 1]) >= 0)
+
+
+def use_polymesh_only(path_run):
+    """Replace 0/C, 0/V and polyMesh/points by a full polyMesh"""
+    for name in ("C", "V"):
+        (path_run / "0" / name).unlink()
+    shutil.rmtree(path_run / "constant/polyMesh")
+    x_nodes = np.linspace(0, lx, nx + 1)
+    y_nodes = ly * np.array([0.0, 0.2, 0.5, 1.0])
+    z_nodes = np.linspace(0, lz, nz + 1)
+    write_polymesh(
+        path_run / "constant/polyMesh",
+        *create_box_mesh(x_nodes, y_nodes, z_nodes),
+        binary=True,
+    )
+
+
+def test_probe_without_c(sim):
+    pytest.importorskip("scipy")
+    use_polymesh_only(sim.path_run)
+    x, y, z = sim.oper.get_cells_coords()
+    assert not (sim.path_run / "0/C").exists()
+    path_dir = sim.path_run / "0.1"
+    path_dir.mkdir()
+    field = VolScalarField("p", "m^2.s^-2")
+    field.set_values(x + 10 * y)
+    field.path = path_dir / "p"
+    field.overwrite()
+
+    fields = sim.output.fields
+    points = np.stack([x[:5], y[:5], z[:5]], axis=1) + 1e-3
+    assert np.allclose(fields.probe(points, "p"), x[:5] + 10 * y[:5])
+    assert fields.get_sampler() is fields.get_sampler()
+    assert not (sim.path_run / "0/C").exists()
+
+
+def test_coords_from_polymesh(sim):
+    path_run = sim.path_run
+    x_c, y_c, z_c = sim.oper.get_cells_coords()
+    volumes = sim.oper.get_cells_volumes()
+    use_polymesh_only(path_run)
+    x, y, z = sim.oper.get_cells_coords()
+    assert np.allclose(x, x_c)
+    assert np.allclose(y, y_c)
+    assert np.allclose(z, z_c)
+    assert np.allclose(sim.oper.get_cells_volumes(), volumes)
+    assert (sim.oper.path_cache / "cell_centres.npy").exists()
+    assert (sim.oper.path_cache / "cell_volumes.npy").exists()
+    assert np.isclose(sim.oper.integrate(np.ones_like(x)), lx * ly * lz)
+
+
+def test_as_grid(sim):
+    oper = sim.oper
+    x, y, z = oper.get_cells_coords()
+    grid_indices = oper.get_grid_indices()
+    assert grid_indices.shape == (nz, ny, nx)
+    assert (oper.path_cache / "grid_indices.npy").exists()
+    x_grid = oper.as_grid(x)
+    assert np.shares_memory(x_grid, x)
+    assert np.all(np.diff(x_grid, axis=2) > 0)
+    assert np.ptp(x_grid, axis=(0, 1)).max() == 0
+
+    # cells in another order
+    permutation = np.random.default_rng(0).permutation(x.size)
+    field = VolVectorField("C", "m")
+    field.set_values(x[permutation], y[permutation], z[permutation])
+    field.path = sim.path_run / "0/C"
+    field.overwrite()
+    x, y, z = oper.get_cells_coords()
+    vectors = np.stack([x, y, z], axis=1)
+    grid = oper.as_grid(vectors)
+    assert grid.shape == (nz, ny, nx, 3)
+    assert np.all(np.diff(grid[..., 0], axis=2) > 0)
+    assert np.all(np.diff(grid[..., 1], axis=1) > 0)
+    assert np.all(np.diff(grid[..., 2], axis=0) > 0)
+
+    path_dir = sim.path_run / "0.1"
+    path_dir.mkdir()
+    field = VolScalarField("p", "m^2.s^-2")
+    field.set_values(z)
+    field.path = path_dir / "p"
+    field.overwrite(format="binary")
+    for lazy in (False, True):
+        field = sim.output.fields.read_field("p", lazy=lazy)
+        assert np.array_equal(field.as_grid(), grid[..., 2])
+    with pytest.raises(ValueError):
+        sim.output.fields.read_field("p", cells=slice(2)).as_grid()
+
+
+def test_grid_block_shape(sim):
+    params = sim.params.block_mesh_dict
+    params.nx, params.ny, params.nz = nx, ny, nz
+    grid_indices = sim.oper._compute_grid_indices()
+    assert np.array_equal(grid_indices.ravel(), np.arange(nx * ny * nz))
+
+    params.nx, params.ny = ny, nx
+    grid_indices = sim.oper._compute_grid_indices()
+    assert grid_indices.shape == (nz, ny, nx)
+
+
+field_p_patches = """FoamFile
+{
+    version     2.0;
+    format      ascii;
+    class       volScalarField;
+    object      p;
+}
+
+dimensions      [0 2 -2 0 0 0 0];
+
+internalField   nonuniform List<scalar> 24(%s);
+
+boundaryField
+{
+    bottom
+    {
+        type            fixedValue;
+        value           nonuniform List<scalar> 12(%s);
+    }
+    top
+    {
+        type            fixedValue;
+        value           uniform 2;
+    }
+    ".*"
+    {
+        type            zeroGradient;
+    }
+}
+"""
+
+
+def test_read_patch(sim):
+    path_run = sim.path_run
+    shutil.rmtree(path_run / "constant/polyMesh")
+    x_nodes = np.linspace(0, lx, nx + 1)
+    y_nodes = ly * np.array([0.0, 0.2, 0.5, 1.0])
+    z_nodes = np.linspace(0, lz, nz + 1)
+    write_polymesh(
+        path_run / "constant/polyMesh",
+        *create_box_mesh(x_nodes, y_nodes, z_nodes),
+    )
+    path_dir = path_run / "0.1"
+    path_dir.mkdir()
+    (path_dir / "p").write_text(
+        field_p_patches
+        % (
+            " ".join(str(float(index)) for index in range(24)),
+            " ".join(str(-float(index)) for index in range(12)),
+        )
+    )
+    fields = sim.output.fields
+    entry = fields.read_patch("p", "bottom")
+    assert entry["type"] == "fixedValue"
+    values = fields.read_patch_values("p", "bottom")
+    assert np.array_equal(values, -np.arange(12.0))
+    values = fields.read_patch_values("p", "top")
+    assert values.shape == (nx * nz,)
+    assert np.all(values == 2.0)
+
+    # zeroGradient: values of the cells of the patch
+    polymesh = sim.oper.get_polymesh()
+    values = fields.read_patch_values("p", "left")
+    assert np.array_equal(values, polymesh.get_patch_cells("left"))
+    x, y, z = sim.oper.get_cells_coords()
+    assert np.allclose(x[values.astype(int)], lx / nx / 2)
+    assert fields.read_patch("p", "left")["type"] == "zeroGradient"
@@ -1,7 +1,16 @@
+import gzip
 import tempfile
 from pathlib import Path
 
-from fluidsimfoam.foam_input_files.polymesh import get_points_coords
+import numpy as np
+import pytest
+
+from fluidsimfoam.foam_input_files.polymesh import (
+    PolyMesh,
+    compute_faces_geometry,
+    get_points_coords,
+    read_faces_file,
+)
 
 example = r"""
 /*--------------------------------*- C++ -*----------------------------------*\
@@ -53,3 +62,236 @@ def test_get_cells_coords():
     assert x.max() > 0.6
     assert y.max() == 0.0
     assert z.max() == 0.0
+
+
+def test_get_cells_coords_gz(tmp_path):
+    path = tmp_path / "points"
+    with gzip.open(path.with_name("points.gz"), "wt") as file:
+        file.write(example)
+
+    x, y, z = get_points_coords(path)
+    assert x.size == 10
+    assert x.max() > 0.6
+
+
+hex_faces = {
+    "left": (0, 4, 7, 3),
+    "right": (1, 2, 6, 5),
+    "bottom": (0, 1, 5, 4),
+    "top": (3, 7, 6, 2),
+    "back": (0, 3, 2, 1),
+    "front": (4, 5, 6, 7),
+}
+
+header_polymesh = """FoamFile
+{{
+    version     2.0;
+    format      {format};
+    arch        "LSB;label=32;scalar=64";
+    class       {cls};
+    location    "constant/polyMesh";
+    object      {name};
+}}
+
+"""
+
+
+def create_box_mesh(x_nodes, y_nodes, z_nodes):
+    """Create the lists of a hexahedral mesh (without OpenFOAM ordering)
+
+    Returns also a dict ``{patch_name: nb_faces}``.
+
+    """
+    nx, ny, nz = len(x_nodes) - 1, len(y_nodes) - 1, len(z_nodes) - 1
+    z, y, x = np.meshgrid(z_nodes, y_nodes, x_nodes, indexing="ij")
+    points = np.stack([x.ravel(), y.ravel(), z.ravel()], axis=1)
+
+    def index_point(i, j, k):
+        return i + (nx + 1) * (j + (ny + 1) * k)
+
+    faces = {}
+    for k in range(nz):
+        for j in range(ny):
+            for i in range(nx):
+                cell = i + nx * (j + ny * k)
+                vertices = [
+                    index_point(i + di, j + dj, k + dk)
+                    for dk in (0, 1)
+                    for dj, di in ((0, 0), (0, 1), (1, 1), (1, 0))
+                ]
+                for patch, face in hex_faces.items():
+                    face = tuple(vertices[index] for index in face)
+                    key = tuple(sorted(face))
+                    if key in faces:
+                        faces[key][2] = cell
+                    else:
+                        faces[key] = [face, cell, None, patch]
+    internal = sorted(
+        (value for value in faces.values() if value[2] is not None),
+        key=lambda value: (value[1], value[2]),
+    )
+    patch_names = list(hex_faces)
+    boundary = sorted(
+        (value for value in faces.values() if value[2] is None),
+        key=lambda value: patch_names.index(value[3]),
+    )
+    patches = {name: 0 for name in patch_names}
+    for value in boundary:
+        patches[value[3]] += 1
+    faces = [value[0] for value in internal + boundary]
+    owner = np.array([value[1] for value in internal + boundary])
+    neighbour = np.array([value[2] for value in internal])
+    return points, faces, owner, neighbour, patches
+
+
+def write_polymesh(
+    path_dir, points, faces, owner, neighbour, patches=None, binary=False
+):
+    path_dir.mkdir(parents=True)
+    format = "binary" if binary else "ascii"
+
+    if patches is not None:
+        code = header_polymesh.format(
+            format="ascii", cls="polyBoundaryMesh", name="boundary"
+        )
+        code += f"{len(patches)}\n(\n"
+        start = neighbour.size
+        for name, nb_faces in patches.items():
+            code += (
+                f"    {name}\n    {{\n        type wall;\n"
+                f"        inGroups 1(wall);\n        nFaces {nb_faces};\n"
+                f"        startFace {start};\n    }}\n"
+            )
+            start += nb_faces
+        (path_dir / "boundary").write_text(code + ")\n")
+
+    def write_list(name, cls, arr, dtype):
+        code = header_polymesh.format(format=format, cls=cls, name=name)
+        if binary:
+            data = np.ascontiguousarray(arr, dtype=dtype).tobytes()
+            return code.encode() + f"{len(arr)}\n(".encode() + data + b")\n"
+        if arr.ndim == 2:
+            lines = "\n".join("(" + " ".join(map(str, row)) + ")" for row in arr)
+        else:
+            lines = "\n".join(map(str, arr))
+        return (code + f"{len(arr)}\n(\n{lines}\n)\n").encode()
+
+    (path_dir / "points").write_bytes(
+        write_list("points", "vectorField", points, "<f8")
+    )
+    (path_dir / "owner").write_bytes(
+        write_list("owner", "labelList", owner, "<i4")
+    )
+    (path_dir / "neighbour").write_bytes(
+        write_list("neighbour", "labelList", neighbour, "<i4")
+    )
+    if binary:
+        offsets = np.cumsum([0] + [len(face) for face in faces])
+        labels = np.concatenate(faces)
+        code = header_polymesh.format(
+            format=format, cls="faceCompactList", name="faces"
+        ).encode()
+        for arr in (offsets, labels):
+            data = arr.astype("<i4").tobytes()
+            code += f"{len(arr)}\n(".encode() + data + b")\n"
+    else:
+        code = header_polymesh.format(format=format, cls="faceList", name="faces")
+        lines = "\n".join(
+            f"{len(face)}(" + " ".join(map(str, face)) + ")" for face in faces
+        )
+        code = (code + f"{len(faces)}\n(\n{lines}\n)\n").encode()
+    (path_dir / "faces").write_bytes(code)
+
+
+@pytest.mark.parametrize("binary", [False, True])
+def test_polymesh_geometry(tmp_path, binary):
+    x_nodes = np.array([0.0, 0.5, 1.5, 2.0])
+    y_nodes = np.array([0.0, 0.1, 0.3, 0.6, 1.0])
+    z_nodes = np.array([-1.0, 1.0])
+    points, faces, owner, neighbour, patches = create_box_mesh(
+        x_nodes, y_nodes, z_nodes
+    )
+    path_dir = tmp_path / "polyMesh"
+    write_polymesh(path_dir, points, faces, owner, neighbour, patches, binary)
+
+    mesh = PolyMesh(path_dir)
+    offsets, labels = mesh.faces
+    assert offsets.size == len(faces) + 1
+    assert np.array_equal(labels, np.concatenate(faces))
+    assert mesh.nb_cells == 12
+    assert mesh.nb_internal_faces == neighbour.size
+
+    z, y, x = np.meshgrid(
+        0.5 * (z_nodes[1:] + z_nodes[:-1]),
+        0.5 * (y_nodes[1:] + y_nodes[:-1]),
+        0.5 * (x_nodes[1:] + x_nodes[:-1]),
+        indexing="ij",
+    )
+    assert np.allclose(mesh.cell_centres[:, 0], x.ravel())
+    assert np.allclose(mesh.cell_centres[:, 1], y.ravel())
+    assert np.allclose(mesh.cell_centres[:, 2], z.ravel())
+    dz, dy, dx = np.meshgrid(
+        np.diff(z_nodes), np.diff(y_nodes), np.diff(x_nodes), indexing="ij"
+    )
+    assert np.allclose(mesh.cell_volumes, (dx * dy * dz).ravel())
+
+    # the face area vectors point from the owner to the neighbour
+    internal = slice(0, mesh.nb_internal_faces)
+    direction = mesh.cell_centres[neighbour] - mesh.cell_centres[owner[internal]]
+    assert np.all(np.einsum("ij,ij->i", direction, mesh.face_areas[internal]) > 0)
+    assert np.allclose(np.linalg.norm(mesh.face_areas[0]), 0.1 * 2.0)
+
+
+def test_faces_geometry_polygon():
+    # a square (0, 2)x(0, 2) with an additional point on an edge
+    points = np.array(
+        [[0, 0, 0], [1, 0, 0], [2, 0, 0], [2, 2, 0], [0, 2, 0]], float
+    )
+    centres, areas = compute_faces_geometry(
+        points, np.array([0, 5]), np.arange(5)
+    )
+    assert np.allclose(centres, [[1, 1, 0]])
+    assert np.allclose(areas, [[0, 0, 4]])
+
+
+def test_read_faces_file_mixed(tmp_path):
+    path = tmp_path / "faces"
+    path.write_text(
+        header_polymesh.format(format="ascii", cls="faceList", name="faces")
+        + "3\n(\n3(0 1 2)\n4(1 3 4 2)\n5(10 11 12 13 14)\n)\n"
+    )
+    offsets, labels = read_faces_file(path)
+    assert offsets.tolist() == [0, 3, 7, 12]
+    assert labels.tolist() == [0, 1, 2, 1, 3, 4, 2, 10, 11, 12, 13, 14]
+
+
+def test_patches(tmp_path):
+    x_nodes = np.array([0.0, 0.5, 1.5, 2.0])
+    y_nodes = np.array([0.0, 0.1, 0.3, 0.6, 1.0])
+    z_nodes = np.array([-1.0, 1.0])
+    path_dir = tmp_path / "polyMesh"
+    write_polymesh(path_dir, *create_box_mesh(x_nodes, y_nodes, z_nodes))
+    mesh = PolyMesh(path_dir)
+    patches = mesh.patches
+    assert list(patches) == ["left", "right", "bottom", "top", "back", "front"]
+    bottom = patches["bottom"]
+    assert bottom.type == "wall"
+    assert bottom.nb_faces == 3
+    assert bottom.info == {"inGroups": "1(wall)"}
+
+    centres, areas = mesh.get_patch_geometry("bottom")
+    assert np.allclose(centres[:, 1], 0.0)
+    assert np.allclose(np.sort(centres[:, 0]), [0.25, 1.0, 1.75])
+    order = np.argsort(centres[:, 0])
+    assert np.allclose(areas[order, 1], -2 * np.diff(x_nodes))
+    assert np.allclose(areas.sum(axis=0), [0, -4.0, 0])
+    assert np.all(mesh.get_patch_cells("bottom") < 3)
+
+    # same result once the geometry of all faces has been computed
+    assert mesh.face_centres.shape == (mesh.nb_faces, 3)
+    centres1, areas1 = mesh.get_patch_geometry("bottom")
+    assert np.allclose(centres1, centres)
+    assert np.allclose(areas1, areas)
+
+    with pytest.raises(ValueError):
+        mesh.get_patch_cells("walls")
@@ -0,0 +1,134 @@
+from textwrap import dedent
+
+import numpy as np
+import pytest
+from fluidsimfoam_tgv import Simul
+
+from fluidsimfoam.foam_input_files.fields import VolVectorField
+from fluidsimfoam.output.reconstruct import Reconstructor
+
+header = dedent(
+    """
+    FoamFile
+    {{
+        version     2.0;
+        format      ascii;
+        class       {cls};
+        object      {name};
+    }}
+
+    """
+)
+
+code_boundary = """
+2
+(
+    wall
+    {
+        type            wall;
+        nFaces          1;
+        startFace       1;
+    }
+    procBoundary{rank}to{neighbour}
+    {
+        type            processor;
+        nFaces          1;
+        startFace       2;
+        myProcNo        {rank};
+        neighbProcNo    {neighbour};
+    }
+)
+"""
+
+
+def write_label_list(path, arr):
+    code = header.format(cls="labelList", name=path.name)
+    code += f"{len(arr)}\n(\n" + "\n".join(str(v) for v in arr) + "\n)\n"
+    path.write_text(code)
+
+
+def make_decomposed_case(path_run, binary, uniform_rank=None):
+    # global cells of the processors
+    cells = [[0, 2], [3, 1]]
+    # global faces (1-based, signed) of the wall faces
+    wall_faces = [12, 11]
+    arr_global = np.arange(12.0).reshape(4, 3)
+    if uniform_rank is not None:
+        arr_global[cells[uniform_rank]] = 5.0
+    for rank in (0, 1):
+        path_mesh = path_run / f"processor{rank}/constant/polyMesh"
+        path_mesh.mkdir(parents=True)
+        write_label_list(path_mesh / "cellProcAddressing", cells[rank])
+        write_label_list(
+            path_mesh / "faceProcAddressing", [1, wall_faces[rank], 4]
+        )
+        write_label_list(path_mesh / "boundaryProcAddressing", [0, -1])
+        neighbour = 1 - rank
+        (path_mesh / "boundary").write_text(
+            header.format(cls="polyBoundaryMesh", name="boundary")
+            + code_boundary.replace("{rank}", str(rank)).replace(
+                "{neighbour}", str(neighbour)
+            )
+        )
+
+        field = VolVectorField("U", "m/s")
+        if rank == uniform_rank:
+            field.set_values([5.0, 5.0, 5.0])
+        else:
+            field.set_values(arr_global[cells[rank]])
+        field.set_boundary("wall", "calculated")
+        field.tree["boundaryField"]["wall"].set_child(
+            "value", np.full((1, 3), float(rank))
+        )
+        field.set_boundary(f"procBoundary{rank}to{neighbour}", "processor")
+        path_time = path_run / f"processor{rank}/0.10000001"
+        path_time.mkdir()
+        field.path = path_time / "U"
+        field.overwrite(format="binary" if binary else "ascii")
+    return arr_global
+
+
+@pytest.mark.parametrize("binary", [False, True])
+@pytest.mark.parametrize("use_processes", [False, True])
+def test_reconstruct(tmp_path, binary, use_processes):
+    arr_global = make_decomposed_case(tmp_path, binary)
+    reconstructor = Reconstructor(tmp_path, use_processes=use_processes)
+    field = reconstructor.reconstruct_field("U", "0.10000001")
+    assert field.time == 0.10000001
+    assert np.array_equal(field.get_array(), arr_global)
+    boundary_field = field.tree["boundaryField"]
+    assert list(boundary_field) == ["wall"]
+    # global faces 10 (processor1) and 11 (processor0)
+    assert np.array_equal(boundary_field["wall"]["value"], [[1.0] * 3, [0.0] * 3])
+
+    field.path = tmp_path / "U"
+    field.overwrite()
+    field = VolVectorField.from_path(tmp_path / "U")
+    assert np.array_equal(field.get_array(), arr_global)
+
+
+@pytest.mark.parametrize("uniform_rank", [0, 1])
+def test_reconstruct_uniform_processor(tmp_path, uniform_rank):
+    arr_global = make_decomposed_case(tmp_path, False, uniform_rank=uniform_rank)
+    path_field = tmp_path / f"processor{uniform_rank}/0.10000001/U"
+    assert "uniform (5" in path_field.read_text()
+    reconstructor = Reconstructor(tmp_path)
+    field = reconstructor.reconstruct_field("U", "0.10000001")
+    assert field.get_array().shape == (4, 3)
+    assert np.array_equal(field.get_array(), arr_global)
+
+
+def test_read_field_decomposed():
+    params = Simul.create_default_params()
+    params.output.sub_directory = "tests_fluidsimfoam/tgv"
+    params.init_fields.type = "codestream"
+    sim = Simul(params)
+    # as if the case was decomposed
+    sim.params.parallel.nsubdoms = 2
+    arr_global = make_decomposed_case(sim.path_run, binary=True)
+    field = sim.output.fields.read_field("U")
+    assert field.time == 0.10000001
+    assert np.array_equal(field.get_array(), arr_global)
+    assert not (sim.path_run / "0.10000001").exists()
+    fields = sim.output.fields.read_fields(["U"], times=[0.10000001])
+    assert np.array_equal(fields[0.10000001]["U"].get_array(), arr_global)
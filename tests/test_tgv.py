@@ -1,16 +1,21 @@
+import shutil
 from pathlib import Path
 from time import sleep
 
 import numpy as np
 import pytest
 from fluidsimfoam_tgv import Simul
+from test_polymesh import create_box_mesh, write_polymesh
 
 from fluidsimfoam import load
 from fluidsimfoam.foam_input_files import (
     FoamInputFile,
     VolScalarField,
     VolVectorField,
+    read_header,
 )
+from fluidsimfoam.foam_input_files.polymesh import PolyMesh
+from fluidsimfoam.output import fields as fields_module
 from fluidsimfoam.testing import check_saved_case, skipif_executable_not_available
 
 here = Path(__file__).absolute().parent
@@ -46,6 +51,17 @@ def test_init(sim_tgv):
     check_saved_case(path_saved_case, sim.path_run)
 
 
+def test_write_format_binary():
+    params = Simul.create_default_params()
+    params.output.sub_directory = "tests_fluidsimfoam/tgv"
+    params.init_fields.type = "codestream"
+    params.control_dict.write_format = "binary"
+    sim = Simul(params)
+    header = read_header(sim.path_run / "0/U")
+    assert header["format"] == "binary"
+    assert header["arch"].startswith('"')
+
+
 def test_list(sim_tgv):
     sim = sim_tgv
     sim.make.list()
@@ -100,7 +116,57 @@ def test_read_files_overwrite(sim_tgv):
     assert tree_control_dict.children["writePrecision"] == precision
 
 
-@skipif_executable_not_available("blockMesh")
+def write_time_dirs(sim, times, nb_cells=8):
+    """Write fake time directories (without running OpenFOAM)"""
+    for index, time in enumerate(times):
+        path_dir = sim.path_run / time
+        path_dir.mkdir()
+        field = VolScalarField("p", "m^2.s^-2")
+        field.set_values(np.full(nb_cells, float(index)))
+        field.path = path_dir / "p"
+        field.overwrite()
+        field = VolVectorField("U", "m/s")
+        field.set_values(np.full((nb_cells, 3), float(index)))
+        field.path = path_dir / "U"
+        field.overwrite(format="binary")
+
+
+def test_read_fields(sim_tgv):
+    sim = sim_tgv
+    write_time_dirs(sim, ["0.05", "0.1", "0.15"])
+    fields = sim.output.fields.read_fields(["p", "U"])
+    assert set(fields) == {"p", "U"}
+    assert fields["U"].time == 0.15
+    assert np.all(fields["U"].get_array() == 2.0)
+
+    fields = sim.output.fields.read_fields(["p", "U"], times=[0.05, 0.1])
+    assert list(fields) == [0.05, 0.1]
+    assert np.all(fields[0.1]["p"].get_array() == 1.0)
+
+    with pytest.raises(ValueError):
+        sim.output.fields.read_fields("p", times=0.2)
+
+
+def test_read_field_times(sim_tgv):
+    sim = sim_tgv
+    write_time_dirs(sim, ["0.05", "0.1", "0.15000001"])
+    fields = sim.output.fields
+
+    field = fields.read_field("p")
+    assert field.time == 0.15000001
+    assert np.all(field.get_array() == 2.0)
+    assert fields.read_field("p", time_approx=0.11).time == 0.1
+    assert fields.read_field("p", time_approx=0.15).time == 0.15000001
+    assert fields.read_field("p", index=0).time == 0.0
+    assert fields.read_field("U", index=-3).time == 0.05
+    path_dir, time = fields.get_path_dir_time(0.16)
+    assert path_dir.name == "0.15000001"
+
+    field_list = fields.read_field("U", tmin=0.05, tmax=0.12)
+    assert [field.time for field in field_list] == [0.05, 0.1]
+    assert np.all(field_list[1].get_array() == 1.0)
+
+
 def test_get_cells_coords():
     params = Simul.create_default_params()
     params.output.sub_directory = "tests_fluidsimfoam/tgv"
@@ -192,3 +258,183 @@ def test_run_exec_async():
     assert isinstance(arr, np.ndarray)
 
     sim.output.fields.get_saved_times()
+
+
+def test_get_time_series(sim_tgv):
+    sim = sim_tgv
+    write_time_dirs(sim, ["0.05", "0.1"])
+    fields = sim.output.fields
+    times, values = fields.get_time_series("U", tmin=0.01)
+    assert times.tolist() == [0.05, 0.1]
+    assert values.shape == (2, 8, 3)
+    assert np.all(values[1] == 1.0)
+    assert isinstance(values, np.memmap)
+
+    path_store = sim.path_run / ".data_fluidsim/time_series/U.npy"
+    inode = path_store.stat().st_ino
+    write_time_dirs(sim, ["0.15"])
+    times, values = fields.get_time_series("U", tmin=0.01)
+    assert times.tolist() == [0.05, 0.1, 0.15]
+    # the new values are appended in place (the file is not rewritten)
+    assert path_store.stat().st_ino == inode
+    assert np.all(values[2] == 0.0)
+    times, values = fields.get_time_series("U", times=[0.15, 0.05])
+    assert times.tolist() == [0.05, 0.15]
+    assert np.all(values[0] == 0.0)
+
+    # modified file: the cache is rebuilt
+    field = VolVectorField("U", "m/s")
+    field.set_values(np.full((8, 3), 5.0))
+    field.path = sim.path_run / "0.1/U"
+    field.overwrite(format="binary")
+    times, values = fields.get_time_series("U", times=[0.1])
+    assert np.all(values == 5.0)
+
+    # the initial fields are written with codeStream
+    with pytest.raises(ValueError):
+        fields.get_time_series("p")
+    times, values = fields.get_time_series("p", tmin=0.01)
+    assert values.shape == (3, 8)
+
+    # uniform fields are broadcasted
+    (sim.path_run / "0.2").mkdir()
+    field = VolVectorField("U", "m/s")
+    field.set_values([1.0, 2.0, 3.0])
+    field.path = sim.path_run / "0.2/U"
+    field.overwrite()
+    times, values = fields.get_time_series("U", tmin=0.01)
+    assert values.shape == (4, 8, 3)
+    assert np.all(values[-1] == [1.0, 2.0, 3.0])
+
+
+def test_get_time_series_batches(sim_tgv, monkeypatch):
+    # one time per batch
+    monkeypatch.setattr(fields_module, "_max_nbytes_batch", 1)
+    sim = sim_tgv
+    (sim.path_run / "0.05").mkdir()
+    field = VolScalarField("p", "m^2.s^-2")
+    field.set_values(2.0)
+    field.path = sim.path_run / "0.05/p"
+    field.overwrite()
+    write_time_dirs(sim, ["0.1", "0.15", "0.2"])
+    times, values = sim.output.fields.get_time_series("p", tmin=0.01)
+    assert times.tolist() == [0.05, 0.1, 0.15, 0.2]
+    assert values.shape == (4, 8)
+    assert np.all(values[0] == 2.0)
+    assert np.all(values[1:] == np.arange(3)[:, np.newaxis])
+
+
+def test_export_archive(sim_tgv):
+    pytest.importorskip("h5py")
+    sim = sim_tgv
+    write_time_dirs(sim, ["0.05", "0.1", "0.15"])
+    # no 0/C: the cell centres are computed from the polyMesh files
+    nodes = np.linspace(0.0, 1.0, 3)
+    path_mesh = sim.path_run / "constant/polyMesh"
+    write_polymesh(path_mesh, *create_box_mesh(nodes, nodes, nodes))
+    path = sim.output.export_archive(names=["p", "U"])
+    assert path.exists()
+
+    fields = sim.output.fields
+    times, values = fields.get_time_series("U", tmin=0.05)
+    fields.use_archive(path)
+    assert fields.get_saved_times() == [0.05, 0.1, 0.15]
+    times_archive, values_archive = fields.get_time_series("U")
+    assert np.array_equal(times_archive, times)
+    assert np.array_equal(values_archive, values)
+    assert np.allclose(
+        fields._archive.get_mesh_array("cell_centres"),
+        PolyMesh(path_mesh).cell_centres,
+    )
+
+    # unsorted and duplicated times
+    times_archive, values_archive = fields.get_time_series(
+        "U", times=[0.15, 0.05, 0.16]
+    )
+    assert times_archive.tolist() == [0.15, 0.05, 0.15]
+    assert np.array_equal(values_archive, values[[2, 0, 2]])
+
+    field = fields.read_field("U", time_approx=0.11)
+    assert isinstance(field, VolVectorField)
+    assert field.time == 0.1
+    assert np.all(field.get_array() == 1.0)
+    assert [field.time for field in fields.read_field("p", tmin=0.1)] == [
+        0.1,
+        0.15,
+    ]
+    assert "<params" in fields._archive.get_params_xml()
+
+    fields.use_archive(None)
+    assert fields.read_field("p").path is not None
+
+
+def test_export_archive_uniform(sim_tgv):
+    pytest.importorskip("h5py")
+    sim = sim_tgv
+    write_time_dirs(sim, ["0.05", "0.1", "0.15"])
+    # the number of cells is taken from the mesh (here the cell centres)
+    field = VolVectorField("C", "m")
+    field.set_values(np.zeros((8, 3)))
+    field.path = sim.path_run / "0/C"
+    field.overwrite()
+    for time in ("0.05", "0.1", "0.15"):
+        field = VolScalarField("T", "K")
+        field.set_values(300.0)
+        field.path = sim.path_run / time / "T"
+        field.overwrite()
+    field = VolScalarField("p", "m^2.s^-2")
+    field.set_values(4.0)
+    field.path = sim.path_run / "0.05/p"
+    field.overwrite()
+    (sim.path_run / "0.15/U").unlink()
+
+    path = sim.output.export_archive(names=["p", "U", "T"])
+    fields = sim.output.fields
+    fields.use_archive(path)
+    assert fields.get_saved_times() == [0.05, 0.1, 0.15]
+    times, values = fields.get_time_series("p")
+    assert times.tolist() == [0.05, 0.1, 0.15]
+    assert np.all(values == np.array([4.0, 1.0, 2.0])[:, np.newaxis])
+    times, values = fields.get_time_series("T")
+    assert values.shape == (3, 8)
+    assert np.all(values == 300.0)
+    times, values = fields.get_time_series("U")
+    assert np.all(values[:2] == np.arange(2)[:, np.newaxis, np.newaxis])
+    assert np.isnan(values[2]).all()
+    fields.use_archive(None)
+
+
+def test_statistics(sim_tgv):
+    sim = sim_tgv
+    write_time_dirs(sim, ["0.05", "0.1", "0.15", "0.2"])
+    statistics = sim.output.statistics
+
+    accumulators = statistics.compute(["p", "U"], tmin=0.1)
+    accumulator = accumulators["U"]
+    assert accumulator.count == 3
+    assert accumulator.mean.shape == (8, 3)
+    assert np.allclose(accumulator.mean, 2.0)
+    assert np.allclose(accumulator.variance, np.var([1.0, 2.0, 3.0]))
+    assert np.all(accumulator.min == 1.0)
+    assert np.all(accumulator.max == 3.0)
+
+    result = sim.output._compute_mean_values(0.05, 0.2)
+    assert result["p_nb_times"] == 4
+    assert result["p_mean"] == 1.5
+    assert np.isclose(result["p_std"], np.std([0.0, 1.0, 2.0, 3.0]))
+    assert result["U_x_max"] == 3.0
+    assert result["U_z_min"] == 0.0
+
+    weights = np.arange(1.0, 9.0)
+    result = statistics.get_mean_values(names="p", tmin=0.2, weights=weights)
+    assert result["p_mean"] == 3.0
+
+    with pytest.raises(ValueError):
+        statistics.get_mean_values(weights="volume")
+
+
+def test_statistics_no_saved_times(sim_tgv):
+    sim = sim_tgv
+    shutil.rmtree(sim.path_run / "0")
+    assert sim.output.fields.get_saved_times() == []
+    assert sim.output._compute_mean_values(None, None) == {}
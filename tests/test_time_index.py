@@ -0,0 +1,38 @@
+import os
+
+import pytest
+
+from fluidsimfoam.output.time_index import TimeIndex
+
+
+def test_time_index(tmp_path):
+    for name in ("0", "0.1", "0.30000001", "1e-05", "constant"):
+        (tmp_path / name).mkdir()
+    (tmp_path / "0.2").write_text("not a directory")
+
+    index = TimeIndex(tmp_path)
+    assert index.get_times().tolist() == [0.0, 0.1, 0.30000001]
+    assert index.get_names() == ["0", "0.1", "0.30000001"]
+    assert index.get_name(0.30000001) == "0.30000001"
+    assert index.get_last() == (0.30000001, tmp_path / "0.30000001")
+    with pytest.raises(ValueError):
+        index.get_path(0.3)
+
+    # incremental refresh based on the modification time of the directory
+    (tmp_path / "0.5").mkdir()
+    os.utime(tmp_path, ns=(0, 1))
+    assert index.get_times().tolist() == [0.0, 0.1, 0.30000001, 0.5]
+    (tmp_path / "0.1").rmdir()
+    os.utime(tmp_path, ns=(0, 2))
+    assert list(index.get_paths()) == [0.0, 0.30000001, 0.5]
+
+    assert index.get_times("processor0").size == 0
+    for rank in (10, 2, 0, 1):
+        (tmp_path / f"processor{rank}/0.5").mkdir(parents=True)
+    assert index.get_processor_dirnames() == [
+        "processor0",
+        "processor1",
+        "processor2",
+        "processor10",
+    ]
+    assert index.get_path(0.5, "processor1") == tmp_path / "processor1/0.5"